@@ -0,0 +1,177 @@
+"""
+Async Green API client (httpx)
+Same surface as GreenAPIClient, for fetching many chats concurrently
+"""
+
+import asyncio
+import os
+import random
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+
+from green_api_client import GreenAPIClient, MAX_BACKOFF_SECONDS, RETRYABLE_STATUS_CODES, _env_number
+
+
+class AsyncGreenAPIClient:
+    """
+    asyncio client for Green API built on a single httpx.AsyncClient.
+
+    A semaphore caps the number of requests in flight, and the optional shared
+    rate limiter (TokenBucketRateLimiter) keeps all clients inside the quota.
+    """
+
+    def __init__(self, instance_id: str, token: str, api_url: str = "https://api.green-api.com",
+                 max_concurrency: Optional[int] = None, rate_limiter=None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 timeout: float = 30.0, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.instance_id = instance_id
+        self.token = token
+        self.base_url = f"{api_url}/waInstance{self.instance_id}"
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.transport = transport
+
+        # Max in-flight requests (GREENAPI_MAX_CONCURRENCY)
+        self.max_concurrency = max_concurrency or _env_number("GREENAPI_MAX_CONCURRENCY", 8)
+        self.max_retries = max_retries if max_retries is not None else _env_number("GREENAPI_MAX_RETRIES", 3)
+        self.backoff_base = backoff_base if backoff_base is not None else _env_number("GREENAPI_BACKOFF_BASE", 1.0, float)
+
+        # Created lazily inside the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def _backoff_seconds(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Exponential backoff with full jitter, never shorter than Retry-After"""
+        backoff = random.uniform(0, min(MAX_BACKOFF_SECONDS, self.backoff_base * (2 ** attempt)))
+        retry_after = GreenAPIClient._retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, MAX_BACKOFF_SECONDS))
+        return backoff
+
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                            idempotent: bool = True) -> Tuple[bool, Dict]:
+        """Make API request to Green API - same result format as GreenAPIClient._make_request"""
+        url = f"{self.base_url}/{endpoint}/{self.token}"
+        method = method.upper()
+        if method not in ("GET", "POST"):
+            return False, {"error": f"Unsupported HTTP method: {method}"}
+
+        client = self._get_client()
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                # The limiter blocks - wait for it in a worker thread, not on the event loop
+                await asyncio.to_thread(self.rate_limiter.acquire)
+
+            try:
+                async with self._semaphore:
+                    if method == "GET":
+                        response = await client.get(url)
+                    else:
+                        response = await client.post(url, json=data)
+
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in RETRYABLE_STATUS_CODES
+                )
+                if retryable and attempt < self.max_retries:
+                    # Sleep outside the semaphore so other requests can use the slot
+                    await asyncio.sleep(self._backoff_seconds(attempt, response))
+                    attempt += 1
+                    continue
+
+                response.raise_for_status()
+                return True, response.json()
+
+            except httpx.TimeoutException:
+                return False, {"error": "Request timeout - Green API server not responding"}
+            except httpx.TransportError:
+                return False, {"error": "Connection error - Unable to reach Green API server"}
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code == 401:
+                    return False, {"error": "Unauthorized - Invalid instance ID or token"}
+                elif status_code == 403:
+                    return False, {"error": "Forbidden - Check your API permissions"}
+                elif status_code == 404:
+                    return False, {"error": "Not found - Invalid API endpoint or instance"}
+                elif status_code == 429:
+                    return False, {"error": "Too many requests - Green API rate limit exceeded"}
+                else:
+                    return False, {"error": f"HTTP error {status_code}: {e.response.text}"}
+            except Exception as e:
+                return False, {"error": f"Unexpected error: {str(e)}"}
+
+    async def get_state_instance(self) -> Tuple[bool, Dict]:
+        """Get WhatsApp instance state"""
+        return await self._make_request("GET", "getStateInstance")
+
+    async def get_contacts(self) -> Tuple[bool, Dict]:
+        """Get WhatsApp contacts"""
+        return await self._make_request("GET", "getContacts")
+
+    async def get_chats(self) -> Tuple[bool, Dict]:
+        """Get WhatsApp chats"""
+        return await self._make_request("GET", "getChats")
+
+    async def get_chat_history(self, chat_id: str, count: int = 100) -> Tuple[bool, Dict]:
+        """Get chat history for a specific chat"""
+        data = {
+            "chatId": chat_id,
+            "count": count
+        }
+        return await self._make_request("POST", "getChatHistory", data)
+
+    async def get_chat_histories(self, chat_ids: Iterable[str], count: int = 100) -> Dict[str, Tuple[bool, Dict]]:
+        """
+        Fetch the history of many chats concurrently
+
+        Returns:
+            Dict of chat_id -> (success, response), in the order of chat_ids
+        """
+        chat_ids = list(chat_ids)
+        results = await asyncio.gather(*(self.get_chat_history(chat_id, count) for chat_id in chat_ids))
+        return dict(zip(chat_ids, results))
+
+
+def get_async_green_api_client(rate_limiter=None, **kwargs) -> AsyncGreenAPIClient:
+    """Create an async client from GREENAPI_ID_INSTANCE / GREENAPI_API_TOKEN"""
+    id_instance = os.getenv("GREENAPI_ID_INSTANCE")
+    api_token = os.getenv("GREENAPI_API_TOKEN")
+    if not id_instance or not api_token:
+        raise ValueError("GREENAPI_ID_INSTANCE and GREENAPI_API_TOKEN must be set")
+
+    return AsyncGreenAPIClient(
+        id_instance,
+        api_token,
+        api_url=os.getenv("GREENAPI_API_URL", "https://api.green-api.com"),
+        rate_limiter=rate_limiter,
+        **kwargs
+    )
@@ -7,6 +7,7 @@ Fetches entire chat history for all contacts after QR scan/authorization
 import os
 import sys
 import json
+import asyncio
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
@@ -16,6 +17,8 @@ sys.path.append(str(Path(__file__).parent))
 
 from chat_sync_manager import get_chat_sync_manager
 from green_api_client import get_green_api_client
+from async_green_api_client import get_async_green_api_client
+from rate_limiter import get_green_api_rate_limiter
 from database_manager import get_db_manager
 from dotenv import load_dotenv
 
@@ -33,6 +36,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of chats whose history is fetched concurrently before being saved
+CONCURRENT_FETCH_CHUNK = 20
+
 
 def enable_messages_history():
     """Enable messages history on Green API (requires manual API call)"""
@@ -50,9 +56,9 @@ def get_all_chats_with_recent_activity():
         client = get_green_api_client()
         
         logger.info("Fetching all chats from Green API...")
-        chats_response = client.get_chats()
+        success, chats_response = client.get_chats()
         
-        if not isinstance(chats_response, list):
+        if not success or not isinstance(chats_response, list):
             logger.error("Unexpected chats response format")
             return []
         
@@ -77,6 +83,66 @@ def get_all_chats_with_recent_activity():
         return []
 
 
+def _record_chat_result(results: dict, chat: dict, result: dict):
+    """Add one chat's sync result to the summary"""
+    phone = chat['phone']
+    
+    if result['success']:
+        results['successful_syncs'] += 1
+        results['total_messages_synced'] += result.get('messages_synced', 0)
+        
+        logger.info(f"✅ {phone}: {result.get('messages_synced', 0)} messages synced")
+    else:
+        results['failed_syncs'] += 1
+        logger.error(f"❌ {phone}: {result.get('error', 'Unknown error')}")
+    
+    results['chat_results'].append({
+        'phone': phone,
+        'chat_id': chat['chat_id'],
+        'success': result['success'],
+        'messages_synced': result.get('messages_synced', 0),
+        'error': result.get('error')
+    })
+
+
+async def _sync_chats_concurrently(chats_to_sync: list, messages_per_chat: int, sync_manager, results: dict):
+    """
+    Fetch chat histories concurrently (within the shared Green API quota)
+    and save each chunk to the database before fetching the next one
+    """
+    total = len(chats_to_sync)
+    
+    async with get_async_green_api_client(rate_limiter=get_green_api_rate_limiter()) as client:
+        for chunk_start in range(0, total, CONCURRENT_FETCH_CHUNK):
+            chunk = chats_to_sync[chunk_start:chunk_start + CONCURRENT_FETCH_CHUNK]
+            logger.info(f"[{chunk_start + 1}-{chunk_start + len(chunk)}/{total}] Fetching {len(chunk)} chats concurrently")
+            
+            histories = await client.get_chat_histories(
+                [chat['chat_id'] for chat in chunk], count=messages_per_chat
+            )
+            
+            for chat in chunk:
+                chat_id = chat['chat_id']
+                phone = chat['phone']
+                success, response = histories[chat_id]
+                
+                try:
+                    if not success:
+                        result = {'success': False, 'error': response.get('error', 'Unknown error')}
+                    else:
+                        messages = response if isinstance(response, list) else response.get('messages', [])
+                        result = sync_manager.sync_chat_history(
+                            chat_id=chat_id,
+                            contact_phone=phone,
+                            max_messages=messages_per_chat,
+                            messages=messages
+                        )
+                except Exception as e:
+                    result = {'success': False, 'error': f"Exception - {e}"}
+                
+                _record_chat_result(results, chat, result)
+
+
 def sync_all_chat_histories(max_contacts: int = 50, messages_per_chat: int = 1000):
     """
     Sync chat histories for all contacts
@@ -107,48 +173,7 @@ def sync_all_chat_histories(max_contacts: int = 50, messages_per_chat: int = 100
     }
     
     with get_chat_sync_manager() as sync_manager:
-        for i, chat in enumerate(chats_to_sync, 1):
-            chat_id = chat['chat_id']
-            phone = chat['phone']
-            
-            logger.info(f"[{i}/{len(chats_to_sync)}] Syncing chat: {phone}")
-            
-            try:
-                # Sync chat history
-                result = sync_manager.sync_chat_history(
-                    chat_id=chat_id,
-                    contact_phone=phone,
-                    max_messages=messages_per_chat
-                )
-                
-                if result['success']:
-                    results['successful_syncs'] += 1
-                    results['total_messages_synced'] += result.get('messages_synced', 0)
-                    
-                    logger.info(f"✅ {phone}: {result.get('messages_synced', 0)} messages synced")
-                else:
-                    results['failed_syncs'] += 1
-                    logger.error(f"❌ {phone}: {result.get('error', 'Unknown error')}")
-                
-                results['chat_results'].append({
-                    'phone': phone,
-                    'chat_id': chat_id,
-                    'success': result['success'],
-                    'messages_synced': result.get('messages_synced', 0),
-                    'error': result.get('error')
-                })
-                
-            except Exception as e:
-                results['failed_syncs'] += 1
-                logger.error(f"❌ {phone}: Exception - {e}")
-                
-                results['chat_results'].append({
-                    'phone': phone,
-                    'chat_id': chat_id,
-                    'success': False,
-                    'messages_synced': 0,
-                    'error': str(e)
-                })
+        asyncio.run(_sync_chats_concurrently(chats_to_sync, messages_per_chat, sync_manager, results))
     
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
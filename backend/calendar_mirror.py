@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מראה מקומית של יומן Google Calendar
+נשמרת ב-timebro_calendar.db ומתעדכנת בסנכרון מצטבר (syncToken) -
+רק אירועים שהשתנו מאז הסנכרון הקודם יורדים מ-Google
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from db_connections import get_connection
+from db_migrations import CALENDAR_SCHEMA, migrate_database
+from simple_timebro_calendar import CALENDAR_TIMEZONE
+
+
+class CalendarMirror:
+    """Local mirror of a Google Calendar kept current with incremental sync"""
+
+    def __init__(self, service, calendar_id: str, db_path: str = 'timebro_calendar.db', log=None):
+        """
+        Args:
+            service: Google Calendar API service
+            calendar_id: מזהה היומן לשיקוף
+            db_path: מסד הנתונים שבו נשמרת המראה
+            log: פונקציית לוג (message, level) - אופציונלי
+        """
+        self.service = service
+        self.calendar_id = calendar_id
+        self.db_path = db_path
+        self._log = log
+        self._init_tables()
+
+    def log(self, message, level="INFO"):
+        if self._log:
+            self._log(message, level)
+        else:
+            print(message)
+
+    def _init_tables(self):
+        """calendar_mirror_events ו-calendar_mirror_state מוגדרות ב-migrations/timebro_calendar/"""
+        migrate_database(self.db_path, self.log, schema=CALENDAR_SCHEMA)
+
+    @staticmethod
+    def _normalize_time(value: Optional[str]) -> Optional[str]:
+        """
+        המרת זמן RFC3339 (או תאריך של אירוע יום שלם) ל-UTC בפורמט אחיד למיון וסינון
+
+        תאריך של אירוע יום שלם, וזמן בלי timezone, הם בשעון היומן (CALENDAR_TIMEZONE) -
+        כך אירוע יום שלם מתחיל בחצות המקומית, באותו ציר זמן כמו אירועים עם שעה
+        """
+        if not value:
+            return None
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=CALENDAR_TIMEZONE)
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None, microsecond=0).isoformat()
+
+    @classmethod
+    def _event_time(cls, event: Dict, field: str) -> Optional[str]:
+        value = event.get(field, {})
+        return cls._normalize_time(value.get('dateTime', value.get('date')))
+
+    def _get_sync_token(self, conn) -> Optional[str]:
+        row = conn.execute(
+            "SELECT sync_token FROM calendar_mirror_state WHERE calendar_id = ?",
+            (self.calendar_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _list_changes(self, sync_token: Optional[str]):
+        """קריאת כל הדפים של events.list - מלא, או מצטבר כשיש syncToken"""
+        items = []
+        page_token = None
+        while True:
+            params = {
+                'calendarId': self.calendar_id,
+                'maxResults': 2500,
+                'singleEvents': True,
+                'pageToken': page_token
+            }
+            if sync_token:
+                params['syncToken'] = sync_token
+
+            result = self.service.events().list(**params).execute()
+            items.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items, result.get('nextSyncToken')
+
+    def sync(self) -> Dict:
+        """
+        עדכון המראה מול Google
+
+        Returns:
+            dict עם מספר האירועים שעודכנו/נמחקו והאם בוצע סנכרון מלא
+        """
+        conn = get_connection(self.db_path)
+        try:
+            sync_token = self._get_sync_token(conn)
+            full_sync = sync_token is None
+
+            try:
+                items, next_sync_token = self._list_changes(sync_token)
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                # ה-syncToken פג תוקף - סנכרון מלא מחדש
+                self.log("⚠️ syncToken פג תוקף - מבצע סנכרון מלא של היומן", "WARNING")
+                full_sync = True
+                items, next_sync_token = self._list_changes(None)
+
+            upserts = []
+            deletions = []
+            for event in items:
+                if event.get('status') == 'cancelled':
+                    deletions.append((self.calendar_id, event['id']))
+                    continue
+                upserts.append((
+                    self.calendar_id,
+                    event['id'],
+                    event.get('summary'),
+                    self._event_time(event, 'start'),
+                    self._event_time(event, 'end'),
+                    event.get('updated'),
+                    json.dumps(event, ensure_ascii=False)
+                ))
+
+            now = datetime.now().isoformat()
+            with conn:
+                if full_sync:
+                    conn.execute("DELETE FROM calendar_mirror_events WHERE calendar_id = ?", (self.calendar_id,))
+                conn.executemany(
+                    "DELETE FROM calendar_mirror_events WHERE calendar_id = ? AND event_id = ?",
+                    deletions
+                )
+                conn.executemany("""
+                    INSERT OR REPLACE INTO calendar_mirror_events
+                    (calendar_id, event_id, summary, start_time, end_time, updated, event_json)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, upserts)
+                conn.execute("""
+                    INSERT INTO calendar_mirror_state (calendar_id, sync_token, last_full_sync, last_sync)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(calendar_id) DO UPDATE SET
+                        sync_token = excluded.sync_token,
+                        last_full_sync = COALESCE(excluded.last_full_sync, last_full_sync),
+                        last_sync = excluded.last_sync
+                """, (self.calendar_id, next_sync_token, now if full_sync else None, now))
+
+            mode = "מלא" if full_sync else "מצטבר"
+            self.log(f"🔄 סנכרון {mode} של מראת היומן: {len(upserts)} עודכנו, {len(deletions)} נמחקו")
+            return {
+                'full_sync': full_sync,
+                'updated': len(upserts),
+                'deleted': len(deletions)
+            }
+        finally:
+            conn.close()
+
+    def get_events(self, time_min: Optional[str] = None, time_max: Optional[str] = None) -> List[Dict]:
+        """
+        קבלת אירועים מהמראה המקומית, ממוינים לפי זמן התחלה
+
+        Args:
+            time_min: זמן RFC3339 - אירועים שמסתיימים אחריו
+            time_max: זמן RFC3339 - אירועים שמתחילים לפניו
+        """
+        query = "SELECT event_json FROM calendar_mirror_events WHERE calendar_id = ?"
+        params = [self.calendar_id]
+
+        # אותה סמנטיקה כמו timeMin/timeMax של Google - חפיפה עם הטווח
+        if time_min:
+            query += " AND end_time > ?"
+            params.append(self._normalize_time(time_min))
+        if time_max:
+            query += " AND start_time < ?"
+            params.append(self._normalize_time(time_max))
+
+        query += " ORDER BY start_time"
+
+        conn = get_connection(self.db_path, read_only=True)
+        try:
+            return [json.loads(row[0]) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def forget_events(self, event_ids: Iterable[str]):
+        """הסרת אירועים שנמחקו מהמראה מיד, בלי להמתין לסנכרון הבא"""
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM calendar_mirror_events WHERE calendar_id = ? AND event_id = ?",
+                    [(self.calendar_id, event_id) for event_id in event_ids]
+                )
+        finally:
+            conn.close()
+
+
+def get_synced_calendar_events(service, calendar_id: str, time_min: Optional[str] = None,
+                               time_max: Optional[str] = None, db_path: str = 'timebro_calendar.db',
+                               log=None) -> List[Dict]:
+    """עדכון מצטבר של המראה והחזרת האירועים בטווח - תחליף ל-events.list מלא"""
+    mirror = CalendarMirror(service, calendar_id, db_path, log=log)
+    mirror.sync()
+    return mirror.get_events(time_min, time_max)
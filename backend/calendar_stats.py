@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מוני אירועי היומן (טבלת calendar_event_daily_counts ב-timebro_calendar.db)
+
+ספירה לכל יום מתעדכנת ע"י triggers (migrations/timebro_calendar/0006_calendar_event_counts.sql),
+ולוח הבקרה מסכם אותה בשליפה אחת. הטווחים נספרים לפי ימים שלמים (date(created_at)).
+כתיבה שעוקפת את ה-triggers עלולה להזיז מונה - recompute_calendar_event_counts מחשב הכל מחדש,
+ורץ גם בסינכרון ההתאמה היומי.
+
+הרצה ידנית:
+    python calendar_stats.py
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from db_connections import get_connection
+from db_migrations import CALENDAR_DB
+
+# תחילת התקופה של מונה august_2025_events
+AUGUST_2025 = '2025-08-01'
+
+RECOMPUTE_SQL = """
+    INSERT INTO calendar_event_daily_counts (day, events)
+    SELECT COALESCE(date(created_at), ''), COUNT(*) FROM calendar_events GROUP BY 1
+"""
+
+
+def read_calendar_event_stats(conn: sqlite3.Connection, now: Optional[datetime] = None) -> Dict[str, int]:
+    """סה"כ אירועים, אירועים מ-30 הימים האחרונים ומאוגוסט 2025"""
+    since = ((now or datetime.now()) - timedelta(days=30)).date().isoformat()
+    total, recent, august = conn.execute("""
+        SELECT COALESCE(SUM(events), 0),
+               COALESCE(SUM(CASE WHEN day >= ? THEN events END), 0),
+               COALESCE(SUM(CASE WHEN day >= ? THEN events END), 0)
+        FROM calendar_event_daily_counts
+    """, (since, AUGUST_2025)).fetchone()
+    return {
+        'total_calendar_events': total,
+        'recent_calendar_events': recent,
+        'august_2025_events': august,
+    }
+
+
+def recompute_calendar_event_counts(db_path: str = CALENDAR_DB, log=print) -> Dict[str, int]:
+    """חישוב הספירה היומית מחדש מטבלת calendar_events"""
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            before = read_calendar_event_stats(conn)
+            conn.execute("DELETE FROM calendar_event_daily_counts")
+            conn.execute(RECOMPUTE_SQL)
+            after = read_calendar_event_stats(conn)
+    finally:
+        conn.close()
+
+    drifted = [key for key in after if before[key] != after[key]]
+    if drifted:
+        log(f"📊 תוקנו מוני אירועי היומן: {', '.join(drifted)}")
+    return after
+
+
+if __name__ == "__main__":
+    for key, value in recompute_calendar_event_counts().items():
+        print(f"✅ {key}: {value}")
@@ -14,7 +14,7 @@ from pathlib import Path
 
 # Import our components
 from database_manager import DatabaseManager, get_db_manager
-from green_api_client import EnhancedGreenAPIClient, get_green_api_client
+from green_api_client import GreenAPIClient, get_green_api_client, HISTORY_PAGE_SIZE
 from media_manager import MediaManager, get_media_manager
 
 # Configure logging
@@ -25,16 +25,18 @@ logger = logging.getLogger(__name__)
 class ChatSyncManager:
     """Manages synchronization of WhatsApp chats to local database"""
     
-    def __init__(self, db_path: str = "whatsapp_chats.db", media_path: str = "media"):
+    def __init__(self, db_path: str = "whatsapp_chats.db", media_path: str = "media",
+                 api_client: Optional[GreenAPIClient] = None):
         """
         Initialize Chat Sync Manager
         
         Args:
             db_path: Path to SQLite database
             media_path: Path to media storage directory
+            api_client: Green API client (default - built from GREENAPI_* environment variables)
         """
         self.db = get_db_manager(db_path)
-        self.api_client = get_green_api_client()
+        self.api_client = api_client or get_green_api_client()
         self.media_manager = get_media_manager(media_path)
         
         logger.info("Chat Sync Manager initialized")
@@ -133,7 +135,9 @@ class ChatSyncManager:
         return message_id
     
     def sync_chat_history(self, chat_id: str, contact_phone: str = None, 
-                         contact_name: str = None, max_messages: int = 1000) -> Dict:
+                         contact_name: str = None, max_messages: int = 1000,
+                         messages: Optional[List[Dict]] = None,
+                         page_size: int = HISTORY_PAGE_SIZE) -> Dict:
         """
         Sync complete chat history for a specific chat
         
@@ -142,6 +146,9 @@ class ChatSyncManager:
             contact_phone: Phone number for contact creation
             contact_name: Contact name
             max_messages: Maximum messages to retrieve
+            messages: Raw messages already fetched (e.g. concurrently by
+                      AsyncGreenAPIClient) - skips the API call
+            page_size: First page size when paging back through the history
             
         Returns:
             Sync results dictionary
@@ -168,9 +175,39 @@ class ChatSyncManager:
         # Get existing sync status
         sync_status = self.db.get_sync_status(db_chat_id)
         
+        # High-water mark - the newest message synced in a previous run
+        high_water_mark = self.db.get_high_water_mark(db_chat_id)
+        
         try:
             # Fetch chat history from Green API
-            messages = self.api_client.get_chat_history_paginated(chat_id, max_messages)
+            if messages is None and high_water_mark:
+                # Page back only until the already-synced message - the fetch is
+                # bounded by the mark, so only the delta is transferred
+                mark_timestamp = high_water_mark["last_message_timestamp"]
+                mark_message_id = high_water_mark["last_message_id"]
+                complete, fetched = self.api_client.get_chat_history_paginated(
+                    chat_id,
+                    since_timestamp=mark_timestamp,
+                    page_size=page_size,
+                    stop_at_message_id=mark_message_id
+                )
+                reached_mark = complete and any(msg.get("timestamp", 0) <= mark_timestamp for msg in fetched)
+                messages = [
+                    msg for msg in fetched
+                    if msg.get("timestamp", 0) >= mark_timestamp and msg.get("idMessage") != mark_message_id
+                ]
+            else:
+                complete = True
+                if messages is None:
+                    complete, messages = self.api_client.get_chat_history_paginated(
+                        chat_id, max_messages, page_size=page_size
+                    )
+                reached_mark = complete and (not high_water_mark or any(
+                    msg.get("timestamp", 0) <= high_water_mark["last_message_timestamp"] for msg in messages
+                ))
+            
+            if not complete and not messages:
+                raise RuntimeError("getChatHistory failed - no history was fetched")
             
             if not messages:
                 logger.warning(f"No messages found for chat {chat_id}")
@@ -190,6 +227,9 @@ class ChatSyncManager:
             media_queued = 0
             last_message_id = None
             
+            # Load known message IDs once - duplicate checks become set lookups
+            existing_ids = self.db.get_message_ids_for_chat(db_chat_id)
+            
             # Process messages (they come in reverse chronological order)
             for raw_message in messages:
                 try:
@@ -197,18 +237,15 @@ class ChatSyncManager:
                     parsed_message = self.api_client.parse_message(raw_message)
                     
                     # Skip if we already have this message
-                    if parsed_message.get("whatsapp_message_id"):
-                        existing_messages = self.db.get_messages_by_chat(
-                            db_chat_id, limit=1, offset=0
-                        )
-                        # Simple check - in production you'd want a more efficient lookup
-                        existing_ids = [msg.get("whatsapp_message_id") for msg in existing_messages]
-                        if parsed_message["whatsapp_message_id"] in existing_ids:
-                            continue
+                    whatsapp_message_id = parsed_message.get("whatsapp_message_id")
+                    if whatsapp_message_id and whatsapp_message_id in existing_ids:
+                        continue
                     
                     # Sync message to database
                     message_id = self.sync_message(parsed_message, db_chat_id)
                     new_messages += 1
+                    if whatsapp_message_id:
+                        existing_ids.add(whatsapp_message_id)
                     
                     # Track if media was queued
                     if parsed_message.get("media_url"):
@@ -220,6 +257,18 @@ class ChatSyncManager:
                     logger.error(f"Error processing message: {e}")
                     continue
             
+            # Advance the high-water mark to the newest message - only when the fetch
+            # reached the previous mark, otherwise a gap of unsynced messages would be skipped
+            newest = max(messages, key=lambda msg: msg.get("timestamp", 0))
+            if newest.get("timestamp"):
+                last_message_id = newest.get("idMessage") or last_message_id
+                if reached_mark:
+                    self.db.update_high_water_mark(db_chat_id, newest["timestamp"], newest.get("idMessage"))
+                elif not complete:
+                    logger.warning(f"History fetch for {chat_id} failed part way - keeping the high-water mark")
+                else:
+                    logger.warning(f"History fetch for {chat_id} did not reach the high-water mark - keeping it")
+            
             # Update sync status
             self.db.update_sync_status(
                 chat_id=db_chat_id,
@@ -236,6 +285,7 @@ class ChatSyncManager:
                 "db_chat_id": db_chat_id,
                 "messages_retrieved": len(messages),
                 "messages_synced": new_messages,
+                "history_complete": complete,
                 "media_queued": media_queued,
                 "duration_seconds": round(duration, 2),
                 "last_message_id": last_message_id
@@ -279,9 +329,10 @@ class ChatSyncManager:
 
 # Convenience function
 def get_chat_sync_manager(db_path: str = "whatsapp_chats.db", 
-                         media_path: str = "media") -> ChatSyncManager:
+                         media_path: str = "media",
+                         api_client: Optional[GreenAPIClient] = None) -> ChatSyncManager:
     """Get a chat sync manager instance"""
-    return ChatSyncManager(db_path, media_path)
+    return ChatSyncManager(db_path, media_path, api_client)
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from calendar_mirror import get_synced_calendar_events
 import os.path
 
 class CheckWhatsAppEvents:
@@ -47,15 +48,8 @@ class CheckWhatsAppEvents:
         self.log("בודק אירועי WhatsApp ביומן...")
         
         try:
-            # קבלת כל האירועים
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                maxResults=2500,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
+            # קבלת כל האירועים - מהמראה המקומית, אחרי סנכרון מצטבר מול Google
+            events = get_synced_calendar_events(self.service, self.calendar_id, log=self.log)
             whatsapp_events = []
             
             for event in events:
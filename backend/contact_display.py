@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+דגל is_displayable של אנשי קשר - האם להציג את איש הקשר בחיפוש בממשק ה-Web
+
+איש קשר מוצג אם יש לו שם תקין (לא ריק, לא רק ספרות, יותר מ-2 תווים) או push_name.
+הדגל מחושב בזמן הכתיבה (WhatsAppContactsGroupsDatabase), והחיפוש משתמש באינדקס
+idx_contacts_displayable. סקריפטים אחרים שמשנים שמות (ניקוי, שחזור וכו') לא מעדכנים
+את הדגל - backfill_displayable מיישר אותו, ורץ גם בסינכרון ההתאמה היומי.
+
+הרצה ידנית:
+    python contact_display.py
+"""
+
+import re
+from typing import Optional
+
+from db_connections import get_connection
+from db_migrations import CONTACTS_DB
+
+_DIGITS_ONLY = re.compile(r'[0-9]+')
+
+# אותו תנאי ב-SQL (GLOB '*[^0-9]*' = יש לפחות תו אחד שאינו ספרה)
+DISPLAYABLE_SQL = """(
+    (name IS NOT NULL AND name != '' AND name GLOB '*[^0-9]*' AND LENGTH(TRIM(name)) > 2)
+    OR (push_name IS NOT NULL AND push_name != '')
+)"""
+
+
+def is_displayable_contact(name: Optional[str], push_name: Optional[str]) -> int:
+    """ערך עמודת is_displayable (0/1) לפי השם וה-push_name"""
+    valid_name = bool(name) and not _DIGITS_ONLY.fullmatch(name) and len(name.strip(' ')) > 2
+    return int(valid_name or bool(push_name))
+
+
+def backfill_displayable(db_path: str = CONTACTS_DB, log=print) -> int:
+    """
+    עדכון is_displayable בשורות שבהן הדגל לא תואם לשם הנוכחי
+
+    Returns:
+        מספר השורות שעודכנו
+    """
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            cursor = conn.execute(f"""
+                UPDATE contacts SET is_displayable = {DISPLAYABLE_SQL}
+                WHERE is_displayable IS NOT {DISPLAYABLE_SQL}
+            """)
+        updated = cursor.rowcount
+    finally:
+        conn.close()
+
+    if updated:
+        log(f"🏷️ עודכן דגל התצוגה של {updated} אנשי קשר")
+    return updated
+
+
+if __name__ == "__main__":
+    print(f"✅ עודכנו {backfill_displayable()} אנשי קשר")
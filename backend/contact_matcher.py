@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+התאמת שמות אנשי קשר לרשימת המאושרים
+המבנים נבנים פעם אחת בטעינה, והתוצאה נשמרת לכל שם שנבדק
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Optional, Set
+
+# אורך מינימלי להתאמה חלקית (שם מוכל בשם) ולהתאמת מילה
+MIN_SUBSTRING_LENGTH = 4
+MIN_WORD_LENGTH = 3
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """נרמול שם להשוואה"""
+    return (name or "").strip().lower()
+
+
+class _AhoCorasick:
+    """אוטומט Aho-Corasick - האם אחת התבניות מופיעה בטקסט, במעבר יחיד על הטקסט"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [False]
+
+        for pattern in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(False)
+                state = next_state
+            self._output[state] = True
+
+        # קישורי כישלון ב-BFS
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = True
+
+    def search(self, text: str) -> bool:
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                return True
+        return False
+
+
+class ApprovedContactMatcher:
+    """
+    התאמת שם איש קשר לרשימת המאושרים, באותם כללים של הבדיקה המקורית:
+    1. התאמה מדויקת (ללא רווחים מסביב וללא תלות באותיות גדולות/קטנות)
+    2. שם מאושר מוכל בשם, או השם מוכל בשם מאושר - כשהקצר מביניהם באורך 4 לפחות
+    3. מילה משותפת באורך 3 לפחות
+    """
+
+    def __init__(self, approved_names: Iterable[Optional[str]]):
+        normalized = {normalize_name(name) for name in approved_names if name}
+        normalized.discard("")
+
+        self._exact: Set[str] = normalized
+
+        # מאושר מוכל בשם הנבדק - אוטומט על כל השמות המאושרים הארוכים מספיק
+        self._approved_in_name = _AhoCorasick(
+            name for name in normalized if len(name) >= MIN_SUBSTRING_LENGTH
+        )
+
+        # שם נבדק מוכל במאושר - חיפוש substring אחד על כל השמות המחוברים
+        self._approved_blob = "\x00".join(sorted(normalized))
+
+        # אינדקס הפוך מילה -> שמות מאושרים
+        self._word_index: Dict[str, Set[str]] = {}
+        for name in normalized:
+            for word in name.split():
+                if len(word) >= MIN_WORD_LENGTH:
+                    self._word_index.setdefault(word, set()).add(name)
+
+        self._cache: Dict[str, bool] = {}
+
+    def __len__(self):
+        return len(self._exact)
+
+    def is_approved(self, contact_name: Optional[str]) -> bool:
+        """בדיקה אם שם איש קשר מאושר - התוצאה נשמרת לכל שם"""
+        cached = self._cache.get(contact_name)
+        if cached is not None:
+            return cached
+
+        result = self._match(contact_name)
+        self._cache[contact_name] = result
+        return result
+
+    def _match(self, contact_name: Optional[str]) -> bool:
+        if not contact_name or len(contact_name.strip()) < 2:
+            return False
+
+        contact_clean = normalize_name(contact_name)
+
+        if contact_clean in self._exact:
+            return True
+
+        if self._approved_in_name.search(contact_clean):
+            return True
+
+        if len(contact_clean) >= MIN_SUBSTRING_LENGTH and contact_clean in self._approved_blob:
+            return True
+
+        return any(
+            word in self._word_index
+            for word in contact_clean.split()
+            if len(word) >= MIN_WORD_LENGTH
+        )
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מוני הסטטיסטיקות של אנשי קשר וקבוצות (טבלת contact_stats ב-whatsapp_contacts_groups.db)
+
+המונים מתעדכנים ע"י triggers (migrations/whatsapp_contacts_groups/0006_contact_stats.sql),
+ולוח הבקרה קורא אותם בשליפה אחת. כתיבה שעוקפת את ה-triggers (למשל INSERT OR REPLACE
+מחיבור בלי recursive_triggers) עלולה להזיז מונה - recompute_contact_stats מחשב הכל מחדש,
+ורץ גם בסינכרון ההתאמה היומי.
+
+הרצה ידנית:
+    python contact_stats.py
+"""
+
+import sqlite3
+from typing import Dict
+
+from db_connections import get_connection
+from db_migrations import CONTACTS_DB
+
+CONTACT_STAT_KEYS = (
+    'total_contacts', 'contacts_in_calendar', 'total_groups', 'israeli_contacts', 'groups_in_calendar'
+)
+
+RECOMPUTE_SQL = """
+    INSERT OR REPLACE INTO contact_stats (stat_key, value)
+    SELECT 'total_contacts', COUNT(*) FROM contacts WHERE type = 'contact'
+    UNION ALL
+    SELECT 'contacts_in_calendar', COUNT(*) FROM contacts WHERE type = 'contact' AND include_in_timebro = 1
+    UNION ALL
+    SELECT 'total_groups', COUNT(*) FROM contacts WHERE type = 'group'
+    UNION ALL
+    SELECT 'israeli_contacts', COUNT(*) FROM contacts WHERE type = 'contact' AND phone_number LIKE '972%'
+    UNION ALL
+    SELECT 'groups_in_calendar', COUNT(*) FROM groups WHERE include_in_timebro = 1
+"""
+
+
+def read_contact_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """המונים הנוכחיים (0 למונה שחסר)"""
+    stats = dict.fromkeys(CONTACT_STAT_KEYS, 0)
+    stats.update(conn.execute("SELECT stat_key, value FROM contact_stats").fetchall())
+    return stats
+
+
+def recompute_contact_stats(db_path: str = CONTACTS_DB, log=print) -> Dict[str, int]:
+    """חישוב כל המונים מחדש מהטבלאות"""
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            before = read_contact_stats(conn)
+            conn.execute(RECOMPUTE_SQL)
+            after = read_contact_stats(conn)
+    finally:
+        conn.close()
+
+    drifted = [key for key in CONTACT_STAT_KEYS if before[key] != after[key]]
+    if drifted:
+        log(f"📊 תוקנו מוני סטטיסטיקה: {', '.join(drifted)}")
+    return after
+
+
+if __name__ == "__main__":
+    for key, value in recompute_contact_stats().items():
+        print(f"✅ {key}: {value}")
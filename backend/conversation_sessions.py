@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+חלוקת הודעות למפגשי שיחה לפי הפסקות זמן
+מנגנון משותף לכל המנתחים - עובר על ההודעות פעם אחת ומחזיר מפגשים בהדרגה,
+כך שגם בניית יומן על כל ההיסטוריה לא מחזיקה את כל ההודעות בזיכרון
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class ConversationSession:
+    """מפגש שיחה - הודעות רצופות של צ'אט אחד בלי הפסקה ארוכה מה-gap"""
+
+    __slots__ = ('chat', 'messages', 'start_timestamp', 'last_timestamp', 'min_duration_seconds')
+
+    def __init__(self, chat: Hashable, first_message: Any, timestamp: float, min_duration_seconds: float = 0):
+        self.chat = chat
+        self.messages: List[Any] = [first_message]
+        self.start_timestamp = timestamp
+        self.last_timestamp = timestamp
+        self.min_duration_seconds = min_duration_seconds
+
+    def add(self, message: Any, timestamp: float):
+        self.messages.append(message)
+        self.last_timestamp = timestamp
+
+    @property
+    def end_timestamp(self) -> float:
+        """זמן הסיום - לפחות משך המינימום מתחילת המפגש"""
+        return max(self.last_timestamp, self.start_timestamp + self.min_duration_seconds)
+
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.start_timestamp)
+
+    @property
+    def end_time(self) -> datetime:
+        return datetime.fromtimestamp(self.end_timestamp)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __repr__(self):
+        return f"ConversationSession(chat={self.chat!r}, messages={len(self.messages)}, start={self.start_time})"
+
+
+def iter_conversation_sessions(messages: Iterable[Any],
+                               timestamp_of: Callable[[Any], float],
+                               gap_minutes: float = 60,
+                               chat_of: Optional[Callable[[Any], Hashable]] = None,
+                               min_duration_minutes: float = 0) -> Iterator[ConversationSession]:
+    """
+    חלוקת הודעות למפגשים - generator שצורך את ההודעות בהדרגה (למשל ישירות מ-cursor)
+
+    Args:
+        messages: הודעות ממוינות לפי זמן (עולה)
+        timestamp_of: פונקציה שמחזירה את זמן ההודעה בשניות (epoch) - נקראת פעם אחת לכל הודעה
+        gap_minutes: הפסקה ארוכה מזו (בדקות) מתחילה מפגש חדש
+        chat_of: פונקציה שמחזירה את מזהה הצ'אט של ההודעה - מפגשים נפרדים לכל צ'אט.
+                 בלעדיה כל ההודעות נחשבות לצ'אט אחד
+        min_duration_minutes: משך מינימלי למפגש - זמן הסיום של מפגש קצר יותר מוארך
+
+    Yields:
+        ConversationSession לכל מפגש, ברגע שידוע שהוא הסתיים
+    """
+    gap_seconds = gap_minutes * 60
+    min_duration_seconds = min_duration_minutes * 60
+
+    # מפגש פתוח אחד לכל צ'אט - רק הם נשמרים בזיכרון
+    open_sessions: Dict[Hashable, ConversationSession] = {}
+    last_sweep = None
+
+    for message in messages:
+        timestamp = timestamp_of(message)
+        chat = chat_of(message) if chat_of else None
+
+        session = open_sessions.get(chat)
+        if session is not None and timestamp - session.last_timestamp > gap_seconds:
+            del open_sessions[chat]
+            yield session
+            session = None
+
+        if session is None:
+            open_sessions[chat] = ConversationSession(chat, message, timestamp, min_duration_seconds)
+        else:
+            session.add(message, timestamp)
+
+        # ההודעות ממוינות לפי זמן, לכן מפגש שלא קיבל הודעה במשך gap כבר לא יגדל -
+        # סגירתו מיד שומרת על זיכרון קבוע גם עם צ'אטים רבים
+        if chat_of and len(open_sessions) > 1:
+            if last_sweep is None:
+                last_sweep = timestamp
+            elif timestamp - last_sweep > gap_seconds:
+                last_sweep = timestamp
+                stale = [
+                    key for key, open_session in open_sessions.items()
+                    if timestamp - open_session.last_timestamp > gap_seconds
+                ]
+                for key in sorted(stale, key=lambda key: open_sessions[key].start_timestamp):
+                    yield open_sessions.pop(key)
+
+    for session in sorted(open_sessions.values(), key=lambda session: session.start_timestamp):
+        yield session
+
+
+def split_conversation_sessions(messages: Iterable[Any],
+                                timestamp_of: Callable[[Any], float],
+                                gap_minutes: float = 60) -> List[List[Any]]:
+    """חלוקת הודעות של שיחה אחת לרשימות הודעות לפי מפגשים (ממוין לפי זמן)"""
+    messages = sorted(messages, key=timestamp_of)
+    return [
+        session.messages
+        for session in iter_conversation_sessions(messages, timestamp_of, gap_minutes)
+    ]
@@ -9,6 +9,7 @@ import sqlite3
 import os
 from datetime import datetime
 from green_api_client import EnhancedGreenAPIClient
+from db_migrations import migrate_database
 
 class ContactsTableManager:
     def __init__(self, db_file="contacts.db"):
@@ -25,48 +26,10 @@ class ContactsTableManager:
         print(f"[{timestamp}] {emoji} {message}")
 
     def create_contacts_table(self):
-        """יצירת טבלת Contacts"""
+        """יצירת טבלת Contacts (migrations/contacts/) - שורות קיימות מתעדכנות ב-INSERT OR REPLACE"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # מחיקת טבלה קיימת אם יש
-            cursor.execute("DROP TABLE IF EXISTS contacts")
-            
-            # יצירת טבלה חדשה
-            cursor.execute("""
-                CREATE TABLE contacts (
-                    id TEXT PRIMARY KEY,
-                    whatsapp_id TEXT UNIQUE NOT NULL,
-                    phone_number TEXT,
-                    name TEXT,
-                    contact_name TEXT,
-                    display_name TEXT,
-                    type TEXT,
-                    is_business BOOLEAN DEFAULT 0,
-                    is_group BOOLEAN DEFAULT 0,
-                    country_code TEXT,
-                    is_israeli BOOLEAN DEFAULT 0,
-                    has_profile_picture BOOLEAN DEFAULT 0,
-                    last_seen DATETIME,
-                    status_message TEXT,
-                    is_approved BOOLEAN DEFAULT 0,
-                    approval_reason TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # יצירת אינדקסים לחיפוש מהיר
-            cursor.execute("CREATE INDEX idx_contacts_phone ON contacts(phone_number)")
-            cursor.execute("CREATE INDEX idx_contacts_name ON contacts(name)")
-            cursor.execute("CREATE INDEX idx_contacts_display_name ON contacts(display_name)")
-            cursor.execute("CREATE INDEX idx_contacts_is_israeli ON contacts(is_israeli)")
-            cursor.execute("CREATE INDEX idx_contacts_is_approved ON contacts(is_approved)")
-            cursor.execute("CREATE INDEX idx_contacts_country_code ON contacts(country_code)")
-            
-            conn.commit()
-            conn.close()
+            if migrate_database(self.db_file, self.log, schema='contacts') < 0:
+                return False
             
             self.log("✅ טבלת contacts נוצרה בהצלחה", "SUCCESS")
             return True
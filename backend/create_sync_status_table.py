@@ -4,31 +4,12 @@
 יצירת טבלת sync_status
 """
 
-import sqlite3
-import os
+from db_migrations import CALENDAR_DB, migrate_database
 
 def create_sync_status_table():
-    """יצירת טבלת sync_status"""
+    """יצירת טבלת sync_status (שורה אחת לכל פריט - migrations/timebro_calendar)"""
     try:
-        # יצירת טבלת sync_status
-        conn = sqlite3.connect("timebro_calendar.db")
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sync_status (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id TEXT NOT NULL,
-                item_type TEXT NOT NULL,
-                last_sync DATETIME,
-                success BOOLEAN,
-                messages_count INTEGER,
-                events_count INTEGER,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        migrate_database(CALENDAR_DB)
         
         print("✅ טבלת sync_status נוצרה בהצלחה")
         return True
@@ -10,9 +10,11 @@ import json
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Any
-from pathlib import Path
 import hashlib
 
+from db_connections import configure_connection
+from db_migrations import CHATS_SCHEMA, apply_migrations
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,8 +45,8 @@ class DatabaseManager:
             self.connection.row_factory = sqlite3.Row  # Enable column access by name
             # Enable foreign key constraints
             self.connection.execute("PRAGMA foreign_keys = ON")
-            # Enable WAL mode for better concurrency
-            self.connection.execute("PRAGMA journal_mode = WAL")
+            # WAL and the shared tuning pragmas (synchronous, cache, mmap)
+            configure_connection(self.connection)
         return self.connection
     
     def _is_connection_closed(self) -> bool:
@@ -56,21 +58,11 @@ class DatabaseManager:
             return True
     
     def initialize_database(self):
-        """Initialize database with schema"""
-        schema_path = Path(__file__).parent / "database_schema.sql"
-        
-        if not schema_path.exists():
-            raise FileNotFoundError(f"Database schema file not found: {schema_path}")
-        
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema_sql = f.read()
-        
+        """Initialize database with schema (versioned files in migrations/whatsapp_chats/)"""
         conn = self.get_connection()
         try:
-            # Execute schema creation
-            conn.executescript(schema_sql)
-            conn.commit()
-            logger.info("Database initialized successfully")
+            version = apply_migrations(conn, CHATS_SCHEMA, logger.info)
+            logger.info(f"Database initialized successfully (schema version {version})")
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
@@ -472,6 +464,26 @@ class DatabaseManager:
         
         return [dict(row) for row in rows]
     
+    def get_message_ids_for_chat(self, chat_id: int) -> set:
+        """
+        Get all known WhatsApp message IDs for a chat
+        
+        Args:
+            chat_id: Chat ID
+            
+        Returns:
+            Set of whatsapp_message_id values already stored for the chat
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT whatsapp_message_id FROM messages
+            WHERE chat_id = ? AND whatsapp_message_id IS NOT NULL
+        """, (chat_id,))
+        
+        return {row[0] for row in cursor.fetchall()}
+    
     def get_chat_summary(self, phone_number: str = None) -> List[Dict]:
         """Get chat summary, optionally filtered by phone number"""
         conn = self.get_connection()
@@ -522,6 +534,42 @@ class DatabaseManager:
         
         return dict(row) if row else None
     
+    def get_high_water_mark(self, chat_id: int) -> Optional[Dict]:
+        """
+        Get the newest synced message of a chat
+        
+        Returns:
+            Dict with last_message_timestamp (Unix seconds) and last_message_id, or None
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT last_message_timestamp, last_message_id, updated_at
+            FROM chat_high_water_marks WHERE chat_id = ?
+        """, (chat_id,))
+        row = cursor.fetchone()
+        
+        return dict(row) if row else None
+    
+    def update_high_water_mark(self, chat_id: int, last_message_timestamp: int,
+                               last_message_id: str = None):
+        """Advance the high-water mark of a chat - never moves it backwards"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO chat_high_water_marks (chat_id, last_message_timestamp, last_message_id, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(chat_id) DO UPDATE SET
+                last_message_timestamp = excluded.last_message_timestamp,
+                last_message_id = excluded.last_message_id,
+                updated_at = excluded.updated_at
+            WHERE excluded.last_message_timestamp >= chat_high_water_marks.last_message_timestamp
+        """, (chat_id, last_message_timestamp, last_message_id, datetime.now(timezone.utc).isoformat()))
+        
+        conn.commit()
+    
     # Media management
     
     def add_to_media_queue(self, message_id: int, media_url: str):
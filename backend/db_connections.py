@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מאגר חיבורי SQLite משותף לכל מסדי הנתונים של המערכת
+(whatsapp_contacts_groups.db, whatsapp_messages_webjs.db, timebro_calendar.db, whatsapp_chats.db)
+
+- חיבור נפתח פעם אחת עם WAL ו-pragmas מכווננים, ומוחזר למאגר ב-close() במקום להיסגר
+- בתוך אותו thread, חיבור שכבר בשימוש מוחזר שוב (קריאות מקוננות לא פותחות חיבור נוסף)
+- חיבורי קריאה בלבד (read_only=True) לממשק ה-Web - לא נועלים את המסד מול הסינכרון ברקע
+
+שימוש:
+    conn = get_connection('whatsapp_contacts_groups.db', read_only=True)
+    try:
+        ...
+    finally:
+        conn.close()  # חזרה למאגר, טרנזקציה פתוחה מבוטלת
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# מספר חיבורים פנויים שנשמרים לכל מסד (לכל מצב - כתיבה/קריאה)
+POOL_MAX_IDLE = 8
+
+# זמן המתנה לנעילה (שניות) לפני "database is locked"
+BUSY_TIMEOUT_SECONDS = 30.0
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",      # בטוח ב-WAL, חוסך fsync בכל commit
+    "PRAGMA cache_size = -16000",       # ~16MB מטמון דפים
+    "PRAGMA mmap_size = 268435456",     # 256MB קריאה ממופית
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA recursive_triggers = ON",   # INSERT OR REPLACE מפעיל את triggers המחיקה של אינדקסי ה-FTS
+)
+
+
+def configure_connection(conn: sqlite3.Connection, read_only: bool = False):
+    """הגדרת WAL ו-pragmas לחיבור חדש"""
+    if not read_only:
+        # מצב WAL נשמר בקובץ המסד - קוראים לא חוסמים את הכותב ולהפך
+        conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+
+
+class PooledConnection:
+    """
+    עטיפה לחיבור מהמאגר - מתנהגת כמו sqlite3.Connection,
+    אבל close() מחזיר את החיבור למאגר
+    """
+
+    __slots__ = ('_conn', '_pool', '_key', '_closed')
+
+    def __init__(self, conn: sqlite3.Connection, pool: 'ConnectionPool', key: Tuple[str, bool]):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_closed', False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._connection(), name)
+
+    def __setattr__(self, name, value):
+        # row_factory, text_factory וכו' - מוגדרים על החיבור עצמו
+        setattr(self._connection(), name, value)
+
+    def __enter__(self):
+        self._connection().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._connection().__exit__(exc_type, exc_value, traceback)
+
+    def __del__(self):
+        # עטיפה שנזרקה בלי close() (למשל אחרי חריגה) - החיבור חוזר למאגר
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def close(self):
+        if not self._closed:
+            object.__setattr__(self, '_closed', True)
+            self._pool._release(self._key)
+
+
+class ConnectionPool:
+    """מאגר חיבורים לפי (נתיב מסד, קריאה בלבד)"""
+
+    def __init__(self, max_idle: int = POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, bool], List[sqlite3.Connection]] = {}
+        self._lock = threading.Lock()
+        # חיבורים שבשימוש ה-thread הנוכחי: key -> [connection, מספר משתמשים]
+        self._local = threading.local()
+
+    def _in_use(self) -> Dict[Tuple[str, bool], list]:
+        in_use = getattr(self._local, 'in_use', None)
+        if in_use is None:
+            in_use = self._local.in_use = {}
+        return in_use
+
+    def _open(self, db_path: str, read_only: bool) -> sqlite3.Connection:
+        if read_only:
+            conn = sqlite3.connect(
+                f"{Path(db_path).as_uri()}?mode=ro", uri=True,
+                timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        try:
+            configure_connection(conn, read_only)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def connect(self, db_path: str, read_only: bool = False) -> PooledConnection:
+        key = (os.path.abspath(db_path), read_only)
+        in_use = self._in_use()
+
+        entry = in_use.get(key)
+        if entry is None:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                conn = self._open(key[0], read_only)
+            entry = in_use[key] = [conn, 0]
+
+        entry[1] += 1
+        return PooledConnection(entry[0], self, key)
+
+    def _release(self, key: Tuple[str, bool]):
+        in_use = self._in_use()
+        entry = in_use.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+
+        del in_use[key]
+        conn = entry[0]
+        try:
+            # שינויים שלא בוצע להם commit לא עוברים למשתמש הבא
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        """סגירת כל החיבורים הפנויים (חיבורים בשימוש נסגרים כשהם מוחזרים)"""
+        with self._lock:
+            idle_lists, self._idle = list(self._idle.values()), {}
+        for idle in idle_lists:
+            for conn in idle:
+                conn.close()
+
+
+_pool = ConnectionPool()
+
+
+def get_connection(db_path: str, read_only: bool = False) -> PooledConnection:
+    """
+    חיבור למסד מהמאגר המשותף
+
+    Args:
+        db_path: נתיב קובץ המסד
+        read_only: חיבור לקריאה בלבד (המסד חייב להתקיים)
+    """
+    return _pool.connect(db_path, read_only)
+
+
+def close_all_connections():
+    """סגירת החיבורים הפנויים במאגר המשותף"""
+    _pool.close_all()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מיגרציות ממוספרות למסדי הנתונים של המערכת
+
+הסכמה של כל מסד מוגדרת במקום אחד בלבד - קבצי SQL ממוספרים בתיקייה migrations/<סכמה>/:
+    migrations/whatsapp_messages_webjs/0001_messages.sql
+    migrations/whatsapp_messages_webjs/0002_unique_message_key.sql
+    ...
+הגרסה של כל מסד נשמרת ב-PRAGMA user_version, וכל קובץ רץ פעם אחת בטרנזקציה משלו.
+שם הסכמה הוא שם קובץ המסד בלי הסיומת (אפשר להעביר schema במפורש למסד בשם אחר).
+
+הרצה ידנית:
+    python db_migrations.py
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from db_connections import get_connection
+
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+
+MESSAGES_DB = 'whatsapp_messages_webjs.db'
+CONTACTS_DB = 'whatsapp_contacts_groups.db'
+CHATS_DB = 'whatsapp_chats.db'
+CALENDAR_DB = 'timebro_calendar.db'
+
+# שמות הסכמות (תיקיות המיגרציות)
+MESSAGES_SCHEMA = 'whatsapp_messages_webjs'
+CONTACTS_SCHEMA = 'whatsapp_contacts_groups'
+CHATS_SCHEMA = 'whatsapp_chats'
+CALENDAR_SCHEMA = 'timebro_calendar'
+
+_MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+
+def schema_for(db_path: str) -> str:
+    """שם הסכמה לפי שם קובץ המסד"""
+    return Path(db_path).stem
+
+
+def load_migrations(schema: str) -> List[Tuple[int, str, str]]:
+    """
+    קבצי המיגרציה של סכמה, לפי סדר הגרסאות
+
+    Returns:
+        רשימת (גרסה, שם, SQL)
+    """
+    schema_dir = MIGRATIONS_DIR / schema
+    if not schema_dir.is_dir():
+        return []
+
+    migrations = []
+    for path in sorted(schema_dir.iterdir()):
+        match = _MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path.read_text(encoding='utf-8')))
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """פיצול קובץ SQL לפקודות בודדות (כולל triggers עם BEGIN ... END)"""
+    statements = []
+    current = ''
+    for line in sql.splitlines(keepends=True):
+        if not current and (not line.strip() or line.lstrip().startswith('--')):
+            continue
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _execute_migration_statement(conn: sqlite3.Connection, statement: str):
+    try:
+        conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        # SQLite אין ADD COLUMN IF NOT EXISTS - עמודה שכבר נוספה ע"י קוד ישן נחשבת כמיגרציה שבוצעה
+        if 'duplicate column name' in str(e) and re.match(r'(?is)\s*ALTER\s+TABLE\b.*\bADD\b', statement):
+            return
+        raise
+
+
+def apply_migrations(conn: sqlite3.Connection, schema: str, log=print) -> int:
+    """
+    הרצת קבצי המיגרציה שטרם הורצו
+
+    Returns:
+        גרסת הסכמה אחרי ההרצה
+    """
+    version = get_schema_version(conn)
+    for migration_version, name, sql in load_migrations(schema):
+        if migration_version <= version:
+            continue
+
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN")
+        try:
+            for statement in split_statements(sql):
+                _execute_migration_statement(conn, statement)
+            # PRAGMA user_version לא מקבל פרמטרים - הגרסה היא מספר שלם משם הקובץ
+            conn.execute(f"PRAGMA user_version = {int(migration_version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        version = migration_version
+        log(f"🗄️ מיגרציה {schema}/{migration_version:04d} הורצה: {name}")
+    return version
+
+
+def migrate_database(db_path: str, log=print, schema: Optional[str] = None) -> int:
+    """
+    עדכון מסד לגרסה האחרונה של הסכמה שלו
+
+    Returns:
+        גרסת הסכמה, או -1 אם המיגרציה נכשלה
+    """
+    schema = schema or schema_for(db_path)
+    conn = get_connection(db_path)
+    try:
+        return apply_migrations(conn, schema, log)
+    except sqlite3.Error as e:
+        log(f"⚠️ מיגרציה של {db_path} נכשלה: {e}")
+        return -1
+    finally:
+        conn.close()
+
+
+def migrate_all(log=print) -> Dict[str, int]:
+    """עדכון כל המסדים המנוהלים בתיקייה הנוכחית"""
+    results = {}
+    for schema_dir in sorted(MIGRATIONS_DIR.iterdir()):
+        if schema_dir.is_dir():
+            db_path = f"{schema_dir.name}.db"
+            results[db_path] = migrate_database(db_path, log)
+    return results
+
+
+if __name__ == "__main__":
+    for db_path, version in migrate_all().items():
+        print(f"✅ {db_path}: גרסה {version}")
@@ -14,6 +14,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from calendar_mirror import CalendarMirror
 
 class EventDeleter:
     """Delete events from TimeBro Google Calendar by date range"""
@@ -24,6 +25,7 @@ class EventDeleter:
         self.end_date = end_date      # Format: YYYY-MM-DD
         self.timebro_calendar_id = None
         self.service = None
+        self.mirror = None
         self.log_entries = []
 
     def log(self, message, level="INFO"):
@@ -97,29 +99,14 @@ class EventDeleter:
         try:
             self.log(f"🔍 קורא אירועים מהיומן ({self.start_date} עד {self.end_date})...")
 
-            events = []
-            page_token = None
-
             # Convert dates to RFC3339 format with timezone
             time_min = f"{self.start_date}T00:00:00+03:00"
             time_max = f"{self.end_date}T23:59:59+03:00"
 
-            while True:
-                events_result = self.service.events().list(
-                    calendarId=self.timebro_calendar_id,
-                    timeMin=time_min,
-                    timeMax=time_max,
-                    maxResults=2500,
-                    singleEvents=True,
-                    orderBy='startTime',
-                    pageToken=page_token
-                ).execute()
-
-                events.extend(events_result.get('items', []))
-                page_token = events_result.get('nextPageToken')
-
-                if not page_token:
-                    break
+            # Only changes since the previous run are downloaded from Google
+            self.mirror = CalendarMirror(self.service, self.timebro_calendar_id, log=self.log)
+            self.mirror.sync()
+            events = self.mirror.get_events(time_min, time_max)
 
             self.log(f"📊 נמצאו {len(events)} אירועים ביומן", "SUCCESS")
             return events
@@ -179,6 +166,7 @@ class EventDeleter:
                     ).execute()
 
                     self.log(f"   ✅ [{idx}/{len(events)}] נמחק: {title}", "SUCCESS")
+                    self.mirror.forget_events([event_id])
                     deleted_count += 1
 
                 except Exception as e:
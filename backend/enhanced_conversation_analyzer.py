@@ -9,7 +9,9 @@ import json
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict
+from operator import itemgetter
 from timebro_calendar import TimeBroCalendar
+from conversation_sessions import split_conversation_sessions
 
 class EnhancedConversationAnalyzer:
     def __init__(self):
@@ -308,34 +310,8 @@ class EnhancedConversationAnalyzer:
         if not messages:
             return []
             
-        sessions = []
-        current_session = []
-        
-        # Sort messages by timestamp
-        sorted_messages = sorted(messages, key=lambda x: x['timestamp'])
-        
-        for i, msg in enumerate(sorted_messages):
-            if not current_session:
-                current_session = [msg]
-            else:
-                # Check time gap from last message
-                last_msg_time = datetime.fromtimestamp(current_session[-1]['timestamp'])
-                current_msg_time = datetime.fromtimestamp(msg['timestamp'])
-                time_gap = current_msg_time - last_msg_time
-                
-                # If gap > 2 hours, start new session
-                if time_gap > timedelta(hours=2):
-                    if current_session:
-                        sessions.append(current_session)
-                        current_session = [msg]
-                else:
-                    current_session.append(msg)
-                    
-        # Add the last session
-        if current_session:
-            sessions.append(current_session)
-            
-        return sessions
+        # If gap > 2 hours, start new session
+        return split_conversation_sessions(messages, itemgetter('timestamp'), gap_minutes=120)
         
     def delete_existing_august_events(self):
         """Delete all existing August 2025 מייק ביקוב events"""
@@ -10,6 +10,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from calendar_mirror import get_synced_calendar_events
 import os.path
 from contacts_list import CONTACTS_CONFIG
 
@@ -69,15 +70,8 @@ class FindIrrelevantEvents:
         self.log("מחפש אירועי דיון לא רלוונטיים...")
         
         try:
-            # קבלת כל האירועים
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                maxResults=2500,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
+            # קבלת כל האירועים - מהמראה המקומית, אחרי סנכרון מצטבר מול Google
+            events = get_synced_calendar_events(self.service, self.calendar_id, log=self.log)
             
             # סיווג האירועים
             call_events = []           # אירועי שיחות טלפון - לא נוגעים!
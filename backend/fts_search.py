@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בניית שאילתות חיפוש לאינדקסי FTS5 (contacts_fts, groups_fts, messages_fts)
+האינדקסים משתמשים ב-tokenizer מסוג trigram, כך ש-MATCH על ביטוי מצוטט
+מוצא תת-מחרוזת בכל מקום בשדה - כמו LIKE '%term%', אבל דרך האינדקס
+"""
+
+from typing import Iterable, Optional
+
+# trigram מחפש רצפים של 3 תווים - ביטוי קצר יותר לא יכול להשתמש באינדקס
+MIN_TRIGRAM_LENGTH = 3
+
+
+def fts_match_query(term: str, columns: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    ביטוי MATCH לחיפוש תת-מחרוזת
+
+    Args:
+        term: טקסט החיפוש כפי שהוקלד
+        columns: הגבלת החיפוש לעמודות מסוימות (ברירת מחדל - כל העמודות באינדקס)
+
+    Returns:
+        ביטוי ל-MATCH, או None אם הטקסט קצר מדי (יש להשתמש ב-LIKE)
+    """
+    term = (term or '').strip()
+    if len(term) < MIN_TRIGRAM_LENGTH:
+        return None
+
+    # ביטוי מצוטט - תווים מיוחדים של FTS5 (* : - וכו') נחשבים לטקסט רגיל
+    phrase = '"' + term.replace('"', '""') + '"'
+    if columns:
+        return '{' + ' '.join(columns) + '} : ' + phrase
+    return phrase
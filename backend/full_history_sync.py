@@ -2,7 +2,6 @@
 
 import asyncio
 import json
-import time
 from datetime import datetime, timezone
 from pathlib import Path
 import logging
@@ -15,6 +14,8 @@ sys.path.append('.')
 
 from database_manager import get_db_manager
 from green_api_client import get_green_api_client
+from async_green_api_client import get_async_green_api_client
+from rate_limiter import get_green_api_rate_limiter
 from chat_sync_manager import get_chat_sync_manager
 
 class FullHistorySync:
@@ -22,9 +23,8 @@ class FullHistorySync:
         self.client = None
         self.sync_manager = None
         self.progress_file = 'sync_progress.json'
-        self.batch_size = 50  # Process 50 chats at a time
+        self.batch_size = 50  # Process 50 chats at a time (histories fetched concurrently)
         self.message_batch_size = 1000  # Messages per chat per batch
-        self.delay_between_chats = 2.0  # Seconds between chat syncs
         self.delay_between_batches = 10.0  # Seconds between large batches
         
         # Setup logging
@@ -73,8 +73,8 @@ class FullHistorySync:
         self.logger.info("🔍 Discovering all chats and groups...")
         
         try:
-            all_chats = self.client.get_chats()
-            if not isinstance(all_chats, list):
+            success, all_chats = self.client.get_chats()
+            if not success or not isinstance(all_chats, list):
                 self.logger.error("Failed to get chats from API")
                 return [], []
             
@@ -144,7 +144,8 @@ class FullHistorySync:
         
         return priority_order
     
-    def sync_single_chat(self, chat_info: Dict, progress: Dict) -> Tuple[bool, int]:
+    def sync_single_chat(self, chat_info: Dict, progress: Dict,
+                         messages: Optional[List[Dict]] = None) -> Tuple[bool, int]:
         """Sync a single chat and return success status and message count"""
         chat_id = chat_info['id']
         chat_name = chat_info.get('name', chat_id)
@@ -160,7 +161,8 @@ class FullHistorySync:
                     chat_id=chat_id,
                     contact_phone=phone,
                     contact_name=phone,
-                    max_messages=self.message_batch_size
+                    max_messages=self.message_batch_size,
+                    messages=messages
                 )
             else:
                 # Group chat sync (simplified for now)
@@ -234,45 +236,7 @@ class FullHistorySync:
             self.logger.info("\\n💫 SYNC PHASE")
             self.logger.info("-" * 15)
             
-            start_index = progress['chats_processed']
-            total_messages_synced_this_run = 0
-            
-            for i in range(start_index, len(all_chats)):
-                chat_info = all_chats[i]
-                chat_id = chat_info['id']
-                
-                # Skip if already processed
-                if chat_id in progress['processed_chat_ids']:
-                    self.logger.info(f"⏭️ Skipping already processed: {chat_info['name']}")
-                    continue
-                
-                # Progress update
-                progress_pct = (i / len(all_chats)) * 100
-                self.logger.info(f"\\n📊 Progress: {i+1}/{len(all_chats)} ({progress_pct:.1f}%)")
-                
-                # Sync the chat
-                success, message_count = self.sync_single_chat(chat_info, progress)
-                
-                # Update progress
-                if success:
-                    progress['processed_chat_ids'].append(chat_id)
-                    progress['total_messages_synced'] += message_count
-                    total_messages_synced_this_run += message_count
-                else:
-                    progress['failed_chat_ids'].append(chat_id)
-                
-                progress['chats_processed'] = i + 1
-                self.save_progress(progress)
-                
-                # Rate limiting delay
-                if i < len(all_chats) - 1:  # Don't delay after last chat
-                    self.logger.info(f"⏳ Waiting {self.delay_between_chats}s before next chat...")
-                    time.sleep(self.delay_between_chats)
-                
-                # Batch delay (every 10 chats)
-                if (i + 1) % 10 == 0:
-                    self.logger.info(f"🔄 Batch complete. Waiting {self.delay_between_batches}s...")
-                    time.sleep(self.delay_between_batches)
+            total_messages_synced_this_run = asyncio.run(self.run_sync_phase(all_chats, progress))
             
             # Completion
             progress['status'] = 'completed'
@@ -317,6 +281,68 @@ class FullHistorySync:
             if self.sync_manager:
                 self.sync_manager.close()
     
+    async def fetch_histories(self, client, chats: List[Dict]) -> Dict[str, Optional[List[Dict]]]:
+        """Fetch the history of a batch of private chats concurrently"""
+        private_ids = [chat['id'] for chat in chats if chat['type'] == 'private']
+        responses = await client.get_chat_histories(private_ids, count=self.message_batch_size)
+        
+        histories = {}
+        for chat_id, (success, response) in responses.items():
+            if success:
+                histories[chat_id] = response if isinstance(response, list) else response.get('messages', [])
+            else:
+                self.logger.error(f"❌ Failed to fetch history for {chat_id}: {response.get('error', 'Unknown error')}")
+                histories[chat_id] = None
+        return histories
+    
+    async def run_sync_phase(self, all_chats: List[Dict], progress: Dict) -> int:
+        """
+        Sync chats in batches - each batch's histories are fetched concurrently
+        (within the shared Green API quota), then saved one chat at a time
+        """
+        start_index = progress['chats_processed']
+        total_messages_synced_this_run = 0
+        
+        async with get_async_green_api_client(rate_limiter=get_green_api_rate_limiter()) as client:
+            for batch_start in range(start_index, len(all_chats), self.batch_size):
+                batch = [
+                    chat for chat in all_chats[batch_start:batch_start + self.batch_size]
+                    if chat['id'] not in progress['processed_chat_ids']
+                ]
+                batch_end = min(batch_start + self.batch_size, len(all_chats))
+                
+                progress_pct = (batch_start / len(all_chats)) * 100
+                self.logger.info(f"\\n📊 Progress: {batch_start+1}-{batch_end}/{len(all_chats)} ({progress_pct:.1f}%)")
+                
+                histories = await self.fetch_histories(client, batch)
+                
+                for chat_info in batch:
+                    chat_id = chat_info['id']
+                    
+                    if chat_info['type'] == 'private' and histories.get(chat_id) is None:
+                        success, message_count = False, 0
+                    else:
+                        success, message_count = self.sync_single_chat(chat_info, progress, histories.get(chat_id))
+                    
+                    # Update progress
+                    if success:
+                        progress['processed_chat_ids'].append(chat_id)
+                        progress['total_messages_synced'] += message_count
+                        total_messages_synced_this_run += message_count
+                    else:
+                        progress['failed_chat_ids'].append(chat_id)
+                
+                progress['chats_processed'] = batch_end
+                progress['current_batch'] = batch_start // self.batch_size + 1
+                self.save_progress(progress)
+                
+                # Batch delay
+                if batch_end < len(all_chats):
+                    self.logger.info(f"🔄 Batch complete. Waiting {self.delay_between_batches}s...")
+                    await asyncio.sleep(self.delay_between_batches)
+        
+        return total_messages_synced_this_run
+    
     def show_current_status(self):
         """Show current sync status"""
         progress = self.load_progress()
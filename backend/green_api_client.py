@@ -3,51 +3,165 @@ Green API client for WhatsApp integration
 Handles API communication and connection testing
 """
 
+import os
+import random
+import time
 import requests
 import json
-from datetime import datetime
-from typing import Dict, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying - rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Upper bound for a single backoff wait (seconds)
+MAX_BACKOFF_SECONDS = 60.0
+
+# First page size for paginated history fetches - grows geometrically from here
+HISTORY_PAGE_SIZE = 100
+
+# Green API typeMessage -> message_type stored in whatsapp_chats.db
+MESSAGE_TYPES = {
+    "textMessage": "text",
+    "extendedTextMessage": "text",
+    "quotedMessage": "text",
+    "imageMessage": "image",
+    "videoMessage": "video",
+    "audioMessage": "audio",
+    "documentMessage": "document",
+    "stickerMessage": "sticker",
+    "locationMessage": "location",
+    "contactMessage": "contact",
+}
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
 
 class GreenAPIClient:
-    def __init__(self, instance_id: str, token: str, id_instance: Optional[str] = None):
+    def __init__(self, instance_id: str, token: str, id_instance: Optional[str] = None,
+                 rate_limiter=None, pool_size: Optional[int] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None):
         self.instance_id = instance_id
         self.token = token
         self.id_instance = id_instance or instance_id
+        # מגביל קצב אופציונלי (TokenBucketRateLimiter) - משותף בין threads
+        self.rate_limiter = rate_limiter
         self.base_url = f"https://api.green-api.com/waInstance{self.instance_id}"
         self.headers = {
             "Content-Type": "application/json"
         }
-    
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Tuple[bool, Dict]:
-        """Make API request to Green API"""
-        url = f"{self.base_url}/{endpoint}/{self.token}"
         
+        # Retry policy for 429/5xx (GREENAPI_MAX_RETRIES, GREENAPI_BACKOFF_BASE)
+        self.max_retries = max_retries if max_retries is not None else _env_number("GREENAPI_MAX_RETRIES", 3)
+        self.backoff_base = backoff_base if backoff_base is not None else _env_number("GREENAPI_BACKOFF_BASE", 1.0, float)
+        
+        # Persistent session - connections are kept alive and reused between calls.
+        # The pool should be at least as large as the number of threads sharing the client
+        pool_size = pool_size or _env_number("GREENAPI_POOL_SIZE", 10)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def _retry_after_seconds(response) -> Optional[float]:
+        """Parse a Retry-After header (delay in seconds or an HTTP date)"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
         try:
-            if method.upper() == "GET":
-                response = requests.get(url, headers=self.headers, timeout=30)
-            elif method.upper() == "POST":
-                response = requests.post(url, headers=self.headers, json=data, timeout=30)
-            else:
-                return False, {"error": f"Unsupported HTTP method: {method}"}
-            
-            response.raise_for_status()
-            return True, response.json()
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    
+    def _backoff_seconds(self, attempt: int, response=None) -> float:
+        """Exponential backoff with full jitter, never shorter than Retry-After"""
+        backoff = random.uniform(0, min(MAX_BACKOFF_SECONDS, self.backoff_base * (2 ** attempt)))
+        retry_after = self._retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, MAX_BACKOFF_SECONDS))
+        return backoff
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      idempotent: bool = True, path_suffix: str = "",
+                      params: Optional[Dict] = None, timeout: float = 30) -> Tuple[bool, Dict]:
+        """
+        Make API request to Green API
+        
+        429 responses are always retried (the request was not processed).
+        5xx responses are retried only for idempotent calls.
+        """
+        url = f"{self.base_url}/{endpoint}/{self.token}{path_suffix}"
+        method = method.upper()
+        if method not in ("GET", "POST", "DELETE"):
+            return False, {"error": f"Unsupported HTTP method: {method}"}
+        
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
             
-        except requests.exceptions.Timeout:
-            return False, {"error": "Request timeout - Green API server not responding"}
-        except requests.exceptions.ConnectionError:
-            return False, {"error": "Connection error - Unable to reach Green API server"}
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                return False, {"error": "Unauthorized - Invalid instance ID or token"}
-            elif e.response.status_code == 403:
-                return False, {"error": "Forbidden - Check your API permissions"}
-            elif e.response.status_code == 404:
-                return False, {"error": "Not found - Invalid API endpoint or instance"}
-            else:
-                return False, {"error": f"HTTP error {e.response.status_code}: {e.response.text}"}
-        except Exception as e:
-            return False, {"error": f"Unexpected error: {str(e)}"}
+            try:
+                if method == "GET":
+                    response = self.session.get(url, params=params, timeout=timeout)
+                elif method == "DELETE":
+                    response = self.session.delete(url, params=params, timeout=timeout)
+                else:
+                    response = self.session.post(url, json=data, params=params, timeout=timeout)
+                
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in RETRYABLE_STATUS_CODES
+                )
+                if retryable and attempt < self.max_retries:
+                    time.sleep(self._backoff_seconds(attempt, response))
+                    attempt += 1
+                    continue
+                
+                response.raise_for_status()
+                return True, response.json()
+                
+            except requests.exceptions.Timeout:
+                return False, {"error": "Request timeout - Green API server not responding"}
+            except requests.exceptions.ConnectionError:
+                return False, {"error": "Connection error - Unable to reach Green API server"}
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 401:
+                    return False, {"error": "Unauthorized - Invalid instance ID or token"}
+                elif e.response.status_code == 403:
+                    return False, {"error": "Forbidden - Check your API permissions"}
+                elif e.response.status_code == 404:
+                    return False, {"error": "Not found - Invalid API endpoint or instance"}
+                elif e.response.status_code == 429:
+                    return False, {"error": "Too many requests - Green API rate limit exceeded"}
+                else:
+                    return False, {"error": f"HTTP error {e.response.status_code}: {e.response.text}"}
+            except Exception as e:
+                return False, {"error": f"Unexpected error: {str(e)}"}
     
     def test_connection(self) -> Tuple[bool, Dict]:
         """Test Green API connection and credentials"""
@@ -82,7 +196,8 @@ class GreenAPIClient:
             "chatId": chat_id,
             "message": message
         }
-        return self._make_request("POST", "sendMessage", data)
+        # Not retried on 5xx - the message may already have been sent
+        return self._make_request("POST", "sendMessage", data, idempotent=False)
     
     def get_contacts(self) -> Tuple[bool, Dict]:
         """Get WhatsApp contacts"""
@@ -100,7 +215,76 @@ class GreenAPIClient:
         }
         return self._make_request("POST", "getChatHistory", data)
 
-    def get_chat_history_by_date_range(self, chat_id: str, start_date: datetime, end_date: datetime) -> list:
+    def receive_notification(self, receive_timeout: int = 5) -> Tuple[bool, Optional[Dict]]:
+        """
+        Receive the next incoming notification from the instance queue
+        
+        Long-polls up to receive_timeout seconds. The response is None when the
+        queue is empty, otherwise a dict with receiptId and body (the webhook payload).
+        """
+        return self._make_request("GET", "receiveNotification",
+                                  params={"receiveTimeout": receive_timeout},
+                                  timeout=receive_timeout + 30)
+    
+    def delete_notification(self, receipt_id: int) -> Tuple[bool, Dict]:
+        """Delete a received notification from the queue, so the next one is returned"""
+        return self._make_request("DELETE", "deleteNotification", path_suffix=f"/{receipt_id}")
+
+    def get_chat_history_paginated(self, chat_id: str, max_messages: Optional[int] = None,
+                                   since_timestamp: Optional[int] = None,
+                                   page_size: int = HISTORY_PAGE_SIZE,
+                                   stop_at_message_id: Optional[str] = None) -> Tuple[bool, list]:
+        """
+        Get chat history walking backwards page by page
+        
+        getChatHistory has no offset or cursor - it only returns the latest `count`
+        messages - so each page asks for a larger count (doubling) until the oldest
+        message returned is before since_timestamp, a page contains
+        stop_at_message_id (an already-synced message), the history is exhausted,
+        or max_messages is reached. Total transfer stays within twice the final page.
+        
+        Args:
+            chat_id: WhatsApp chat ID
+            max_messages: Maximum messages to return (None - no limit)
+            since_timestamp: Stop once messages older than this (Unix seconds) were fetched
+            page_size: Size of the first page
+            stop_at_message_id: Stop once this message ID was fetched
+            
+        Returns:
+            (complete, messages) - messages newest first (as returned by Green API).
+            complete is False when a page request failed: messages is then only the
+            previous, shorter page, so callers must not treat it as the whole range
+            (e.g. advance a high-water mark past it)
+        """
+        count = page_size if max_messages is None else min(page_size, max_messages)
+        messages = []
+        
+        while count > 0:
+            success, response = self.get_chat_history(chat_id, count=count)
+            if not success:
+                return False, messages if max_messages is None else messages[:max_messages]
+            
+            messages = response if isinstance(response, list) else response.get('messages', [])
+            
+            if len(messages) < count:
+                break  # Whole history fetched
+            if max_messages is not None and count >= max_messages:
+                break
+            if stop_at_message_id and any(msg.get('idMessage') == stop_at_message_id for msg in messages):
+                break
+            if since_timestamp is not None and messages:
+                oldest = min(msg.get('timestamp', 0) for msg in messages)
+                if oldest < since_timestamp:
+                    break
+            
+            count *= 2
+            if max_messages is not None:
+                count = min(count, max_messages)
+        
+        return True, messages if max_messages is None else messages[:max_messages]
+
+    def get_chat_history_by_date_range(self, chat_id: str, start_date: datetime,
+                                       end_date: datetime) -> Union[list, Dict]:
         """
         Get chat history for a specific date range
 
@@ -110,20 +294,18 @@ class GreenAPIClient:
             end_date: End date (datetime object)
 
         Returns:
-            List of messages in the date range
+            List of messages in the date range, or {"error": ...} when the history
+            could not be paged back to start_date
         """
         # Convert dates to timestamps (Green API uses Unix timestamps)
         start_timestamp = int(start_date.timestamp())
         end_timestamp = int(end_date.timestamp())
 
-        # Get messages - Green API doesn't have native date range filtering
-        # So we fetch more messages and filter client-side
-        success, response = self.get_chat_history(chat_id, count=1000)
-
-        if not success:
-            return []
-
-        messages = response if isinstance(response, list) else response.get('messages', [])
+        # Green API doesn't have native date range filtering - page backwards
+        # until start_date is passed, then filter client-side
+        complete, messages = self.get_chat_history_paginated(chat_id, since_timestamp=start_timestamp)
+        if not complete:
+            return {"error": f"getChatHistory failed after {len(messages)} messages - range not fully fetched"}
 
         # Filter messages by date range
         filtered_messages = []
@@ -136,6 +318,45 @@ class GreenAPIClient:
 
         return filtered_messages
 
+    @staticmethod
+    def parse_message(raw_message: Dict) -> Dict:
+        """
+        Convert a getChatHistory message to the fields stored by ChatSyncManager.sync_message
+        
+        Returns:
+            Dict with whatsapp_message_id, sender_phone, message_type, content, timestamp
+            (aware UTC datetime), is_outgoing and the media/location/contact fields
+        """
+        type_message = raw_message.get("typeMessage") or "textMessage"
+        extended = raw_message.get("extendedTextMessage") or {}
+        location = raw_message.get("location") or {}
+        contact = raw_message.get("contact") or {}
+        sender_id = raw_message.get("senderId") or ""
+        timestamp = raw_message.get("timestamp")
+        
+        return {
+            "whatsapp_message_id": raw_message.get("idMessage"),
+            "sender_phone": sender_id.split("@", 1)[0] or None,
+            "message_type": MESSAGE_TYPES.get(type_message, type_message),
+            "content": (raw_message.get("textMessage") or extended.get("text")
+                        or raw_message.get("caption") or location.get("nameLocation")
+                        or contact.get("displayName")),
+            "timestamp": datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None,
+            "is_outgoing": raw_message.get("type") == "outgoing",
+            "is_forwarded": bool(raw_message.get("isForwarded")),
+            "media_url": raw_message.get("downloadUrl"),
+            "media_filename": raw_message.get("fileName"),
+            "media_mime_type": raw_message.get("mimeType"),
+            "media_size_bytes": raw_message.get("fileSize"),
+            "location_latitude": location.get("latitude"),
+            "location_longitude": location.get("longitude"),
+            "location_name": location.get("nameLocation"),
+            "location_address": location.get("address"),
+            "shared_contact_name": contact.get("displayName"),
+            "shared_contact_phone": None,
+            "shared_contact_vcard": contact.get("vcard"),
+        }
+
     def get_credential_help(self) -> Dict:
         """Get help information for finding Green API credentials"""
         return {
@@ -197,6 +418,16 @@ class GreenAPIClient:
             }
         }
 
+def get_green_api_client(rate_limiter=None, **kwargs) -> GreenAPIClient:
+    """Create a client from GREENAPI_ID_INSTANCE / GREENAPI_API_TOKEN"""
+    id_instance = os.getenv("GREENAPI_ID_INSTANCE")
+    api_token = os.getenv("GREENAPI_API_TOKEN")
+    if not id_instance or not api_token:
+        raise ValueError("GREENAPI_ID_INSTANCE and GREENAPI_API_TOKEN must be set")
+
+    return GreenAPIClient(id_instance, api_token, rate_limiter=rate_limiter, **kwargs)
+
+
 class GreenAPITester:
     """Test Green API connection and provide detailed feedback"""
     
@@ -26,11 +26,13 @@ from chat_sync_manager import get_chat_sync_manager
 class IncrementalSyncManager:
     """Manages incremental WhatsApp message synchronization"""
     
-    def __init__(self):
+    def __init__(self, api_client=None):
         self.db_path = "whatsapp_chats.db"
+        self.api_client = api_client  # None - get_green_api_client() from the environment
         self.log_file = "incremental_sync.log"
         self.status_file = "incremental_sync_status.json"
-        self.max_messages_per_chat = 200  # Limit for incremental sync
+        self.max_messages_per_chat = 200  # Limit for a chat's first sync (no high-water mark yet)
+        self.history_page_size = 20  # First page when paging back to the high-water mark
         self.batch_delay = 1.0  # Seconds between chat syncs
         
         # Email configuration
@@ -185,7 +187,7 @@ class IncrementalSyncManager:
             failed_syncs = 0
             sync_results = []
             
-            with get_chat_sync_manager(self.db_path) as sync_manager:
+            with get_chat_sync_manager(self.db_path, api_client=self.api_client) as sync_manager:
                 for i, chat in enumerate(priority_chats[:50]):  # Limit to 50 chats for incremental
                     chat_id = chat['whatsapp_chat_id']
                     phone = chat['phone_number']
@@ -194,12 +196,13 @@ class IncrementalSyncManager:
                     try:
                         self.logger.info(f"[{i+1}/{len(priority_chats)}] Syncing {name or phone}")
                         
-                        # Sync with limited message count for incremental updates
+                        # Only messages newer than the chat's high-water mark are fetched
                         result = sync_manager.sync_chat_history(
                             chat_id=chat_id,
                             contact_phone=phone,
                             contact_name=name,
-                            max_messages=self.max_messages_per_chat
+                            max_messages=self.max_messages_per_chat,
+                            page_size=self.history_page_size
                         )
                         
                         if result['success']:
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+קריאת סוף קבצי לוג בלי לקרוא את כל הקובץ (לטאב הלוגים - /api/logs)
+
+- read_last_lines: קריאה בבלוקים מסוף הקובץ אחורה, עד שנאספו מספיק שורות
+- LogTailIndex: זוכר לכל קובץ את ה-offset שנקרא ואת השורות האחרונות (כבר מפורסרות),
+  כך שבדיקה תקופתית קוראת רק את הבתים שנוספו מאז הפעם הקודמת.
+  קובץ שקוצר או הוחלף (rotation) נקרא מחדש מהסוף
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# גודל בלוק בקריאה אחורה מסוף הקובץ
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# כשנוספו יותר בתים מזה מאז הקריאה הקודמת - קוראים מחדש מהסוף במקום את כל התוספת
+REREAD_THRESHOLD = 1024 * 1024
+
+
+def read_last_lines(path: str, max_lines: int, block_size: int = TAIL_BLOCK_SIZE) -> Tuple[List[str], int]:
+    """
+    השורות השלמות האחרונות בקובץ (ללא שורות ריקות)
+
+    Returns:
+        (שורות מהישנה לחדשה, offset אחרי השורה השלמה האחרונה)
+        שורה אחרונה בלי ירידת שורה עדיין נכתבת - היא לא מוחזרת ותיקרא בפעם הבאה
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        end_offset = None
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+
+            if end_offset is None:
+                last_newline = data.rfind(b'\n')
+                if last_newline == -1:
+                    continue
+                end_offset = position + last_newline + 1
+                data = data[:last_newline + 1]
+
+            # max_lines שורות מלאות (לא ריקות) אחרי השורה הראשונה, שאולי חתוכה
+            complete_lines = data.split(b'\n', 1)[1] if position > 0 else data
+            if sum(1 for line in complete_lines.split(b'\n') if line.strip()) >= max_lines:
+                break
+
+    if end_offset is None:
+        return [], 0
+
+    lines = [line.decode('utf-8', errors='replace').strip() for line in data.split(b'\n')]
+    if position > 0:
+        lines = lines[1:]  # השורה הראשונה בבלוק חתוכה
+    lines = [line for line in lines if line]
+    return lines[-max_lines:], end_offset
+
+
+class LogTailIndex:
+    """השורות האחרונות של כל קובץ לוג, מתעדכנות לפי מה שנוסף לקובץ"""
+
+    def __init__(self, parse: Callable[[str], Optional[Dict]], max_lines: int = 100):
+        """
+        Args:
+            parse: פרסור שורה ל-dict (None לשורה שלא מתאימה לפורמט)
+            max_lines: מספר השורות האחרונות שנשמרות לכל קובץ
+        """
+        self.parse = parse
+        self.max_lines = max_lines
+        # path -> {'file_id', 'offset', 'entries'}
+        self._files: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def tail(self, path: str) -> List[Dict]:
+        """השורות המפורסרות האחרונות בקובץ (מהישנה לחדשה); [] אם הקובץ לא קיים"""
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._files.pop(path, None)
+                return []
+
+            file_id = (stat.st_dev, stat.st_ino)
+            state = self._files.get(path)
+            if (state is None or state['file_id'] != file_id or stat.st_size < state['offset']
+                    or stat.st_size - state['offset'] > REREAD_THRESHOLD):
+                state = self._load(path, file_id)
+            elif stat.st_size > state['offset']:
+                self._read_appended(path, state)
+
+            return [entry for entry in state['entries'] if entry]
+
+    def _load(self, path: str, file_id: Tuple[int, int]) -> Dict:
+        """קריאה ראשונה (או אחרי rotation) - רק מסוף הקובץ"""
+        lines, offset = read_last_lines(path, self.max_lines)
+        state = {
+            'file_id': file_id,
+            'offset': offset,
+            'entries': deque((self.parse(line) for line in lines), maxlen=self.max_lines)
+        }
+        self._files[path] = state
+        return state
+
+    def _read_appended(self, path: str, state: Dict):
+        """קריאת השורות שנוספו מאז ה-offset הקודם"""
+        with open(path, 'rb') as f:
+            f.seek(state['offset'])
+            data = f.read()
+
+        # שורה אחרונה בלי ירידת שורה עדיין נכתבת - תיקרא בפעם הבאה
+        last_newline = data.rfind(b'\n')
+        if last_newline == -1:
+            return
+        state['offset'] += last_newline + 1
+
+        for line in data[:last_newline].split(b'\n'):
+            line = line.decode('utf-8', errors='replace').strip()
+            if line:
+                state['entries'].append(self.parse(line))
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+כתיבת הודעות לטבלת messages ב-whatsapp_messages_webjs.db
+משותף לסינכרון (SyncManager) ולקליטת התראות בזמן אמת (NotificationIngestionService)
+הטבלה והמפתח הייחודי מוגדרים ב-migrations/whatsapp_messages_webjs/
+"""
+
+import sqlite3
+from typing import Iterable, Tuple
+
+# סדר העמודות בשורות שנכתבות לטבלה
+MESSAGE_COLUMNS = (
+    'id', 'chat_id', 'contact_number', 'contact_name', 'message_body',
+    'message_type', 'timestamp', 'is_from_me', 'created_at'
+)
+
+
+def insert_messages(conn: sqlite3.Connection, rows: Iterable[Tuple]) -> int:
+    """
+    הכנסה מרוכזת של הודעות בטרנזקציה אחת - הודעות קיימות מדולגות ע"י המפתח הייחודי
+
+    Args:
+        rows: שורות לפי סדר MESSAGE_COLUMNS
+
+    Returns:
+        מספר ההודעות החדשות שנשמרו
+    """
+    with conn:
+        cursor = conn.executemany(f"""
+            INSERT OR IGNORE INTO messages ({', '.join(MESSAGE_COLUMNS)})
+            VALUES ({', '.join('?' for _ in MESSAGE_COLUMNS)})
+        """, rows)
+    # rowcount סופר רק שורות של messages, בלי הכתיבות של triggers (אינדקס ה-FTS)
+    return cursor.rowcount
@@ -0,0 +1,29 @@
+-- טבלת Contacts מנתוני Green API (contacts.db) - ContactsTableManager
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id TEXT PRIMARY KEY,
+    whatsapp_id TEXT UNIQUE NOT NULL,
+    phone_number TEXT,
+    name TEXT,
+    contact_name TEXT,
+    display_name TEXT,
+    type TEXT,
+    is_business BOOLEAN DEFAULT 0,
+    is_group BOOLEAN DEFAULT 0,
+    country_code TEXT,
+    is_israeli BOOLEAN DEFAULT 0,
+    has_profile_picture BOOLEAN DEFAULT 0,
+    last_seen DATETIME,
+    status_message TEXT,
+    is_approved BOOLEAN DEFAULT 0,
+    approval_reason TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_contacts_phone ON contacts(phone_number);
+CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts(name);
+CREATE INDEX IF NOT EXISTS idx_contacts_display_name ON contacts(display_name);
+CREATE INDEX IF NOT EXISTS idx_contacts_is_israeli ON contacts(is_israeli);
+CREATE INDEX IF NOT EXISTS idx_contacts_is_approved ON contacts(is_approved);
+CREATE INDEX IF NOT EXISTS idx_contacts_country_code ON contacts(country_code);
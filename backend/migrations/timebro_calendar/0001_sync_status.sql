@@ -0,0 +1,31 @@
+-- סטטוס הסינכרון האחרון של כל איש קשר/קבוצה (SyncManager._update_sync_status)
+-- עד עכשיו כל סינכרון הוסיף שורה חדשה, וכל קריאה מיינה את כל השורות של הפריט.
+-- מעכשיו - שורה נוכחית אחת לכל פריט, עם מפתח ייחודי שמשמש גם לשליפה מרוכזת.
+
+CREATE TABLE IF NOT EXISTS sync_status (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id TEXT NOT NULL,
+    item_type TEXT NOT NULL,
+    last_sync DATETIME,
+    success BOOLEAN,
+    messages_count INTEGER,
+    events_count INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- השארת השורה האחרונה בלבד לכל פריט
+DELETE FROM sync_status
+WHERE id NOT IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY item_id, item_type ORDER BY last_sync DESC, id DESC
+        ) AS row_number
+        FROM sync_status
+    )
+    WHERE row_number = 1
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_status_item ON sync_status(item_id, item_type);
+
+-- הסינכרון האחרון בלוח הבקרה (ORDER BY last_sync DESC LIMIT 1)
+CREATE INDEX IF NOT EXISTS idx_sync_status_last_sync ON sync_status(last_sync);
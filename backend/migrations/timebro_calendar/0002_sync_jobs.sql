@@ -0,0 +1,29 @@
+-- תור עבודות הסינכרון (sync_jobs.SyncJobQueue) - במקום thread לכל בקשה ומצב בזיכרון בלבד
+-- עבודה שנקטעה (הפעלה מחדש של השרת) חוזרת לתור וממשיכה מה-checkpoint שלה
+
+CREATE TABLE IF NOT EXISTS sync_jobs (
+    sync_id TEXT PRIMARY KEY,
+    sync_type TEXT NOT NULL,               -- contact / group / all
+    item_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,   -- גבוה יותר = נלקח קודם
+    status TEXT NOT NULL DEFAULT 'queued', -- queued / running / completed / error
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner_pid INTEGER,                     -- התהליך שמריץ את העבודה
+    progress TEXT,                         -- JSON: done / total / current_item
+    checkpoint TEXT,                       -- JSON: מה כבר הושלם, לחידוש אחרי הפעלה מחדש
+    result TEXT,                           -- JSON
+    error TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    completed_at DATETIME
+);
+
+-- בחירת העבודה הבאה: status = 'queued' ORDER BY priority DESC, created_at
+CREATE INDEX IF NOT EXISTS idx_sync_jobs_queue ON sync_jobs(status, priority DESC, created_at);
+
+-- בקשה זהה לעבודה שעדיין בתור/רצה לא יוצרת עבודה נוספת
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_jobs_active
+    ON sync_jobs(sync_type, item_id, start_date, end_date)
+    WHERE status IN ('queued', 'running');
@@ -0,0 +1,5 @@
+-- מזהה מופע התור (SyncJobQueue) שמריץ את העבודה - בנוסף ל-owner_pid
+-- כך ששני תורים באותו תהליך לא מחזירים לתור עבודה שהשני מריץ,
+-- ועבודה עם ה-pid שלנו מהפעלה קודמת (קונטיינר) עדיין מזוהה כשארית
+
+ALTER TABLE sync_jobs ADD COLUMN owner_token TEXT;
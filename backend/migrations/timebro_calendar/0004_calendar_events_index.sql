@@ -0,0 +1,32 @@
+-- אירועי היומן שנוצרו מ-WhatsApp (SimpleTimeBroCalendar.save_event_to_db)
+-- ואינדקס מקומי של האירועים ביומן - בדיקת כפילות בלי events.list לכל אירוע
+-- (עד עכשיו נוצרו inline ב-init_database / _ensure_event_index)
+
+CREATE TABLE IF NOT EXISTS simple_calendar_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contact_name TEXT NOT NULL,
+    company TEXT,
+    start_datetime TEXT NOT NULL,
+    end_datetime TEXT NOT NULL,
+    total_messages INTEGER,
+    my_messages INTEGER,
+    their_messages INTEGER,
+    event_content TEXT,
+    google_event_id TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- fingerprint: sha1 של (יומן, כותרת, התחלה, סיום); זמנים בשעון מקומי של היומן
+CREATE TABLE IF NOT EXISTS calendar_event_index (
+    fingerprint TEXT PRIMARY KEY,
+    calendar_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    start_datetime TEXT NOT NULL,
+    end_datetime TEXT NOT NULL,
+    google_event_id TEXT,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- חיפוש אירוע עם אותה כותרת שחופף בזמנים
+CREATE INDEX IF NOT EXISTS idx_calendar_event_index_title_start
+    ON calendar_event_index (calendar_id, title, start_datetime);
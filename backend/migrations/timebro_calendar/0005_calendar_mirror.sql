@@ -0,0 +1,23 @@
+-- מראה מקומית של יומן Google (calendar_mirror.CalendarMirror) ו-syncToken לסנכרון מצטבר
+-- (עד עכשיו נוצרו inline ב-CalendarMirror._init_tables)
+
+CREATE TABLE IF NOT EXISTS calendar_mirror_events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    summary TEXT,
+    start_time TEXT,     -- UTC, 'YYYY-MM-DDTHH:MM:SS'
+    end_time TEXT,
+    updated TEXT,
+    event_json TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_mirror_events_start
+    ON calendar_mirror_events (calendar_id, start_time);
+
+CREATE TABLE IF NOT EXISTS calendar_mirror_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    last_full_sync DATETIME,
+    last_sync DATETIME
+);
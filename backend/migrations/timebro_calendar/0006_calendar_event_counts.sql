@@ -0,0 +1,44 @@
+-- מוני אירועי היומן ללוח הבקרה (/api/stats) - ספירה לכל יום לפי created_at,
+-- מתעדכנת ע"י triggers בכל כתיבה ל-calendar_events. סה"כ / 30 הימים האחרונים / מאז תאריך
+-- הם SUM על כמה מאות שורות לכל היותר במקום סריקות COUNT(*) של הטבלה.
+-- calendar_stats.recompute_calendar_event_counts מחשב אותם מחדש (סינכרון ההתאמה היומי).
+
+-- טבלת האירועים הישנה (fix_calendar_issues.py) - קיימת במסדים ישנים, נוצרת כאן למסד חדש
+CREATE TABLE IF NOT EXISTS calendar_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    description TEXT,
+    start_datetime TEXT,
+    end_datetime TEXT,
+    source_contact TEXT,
+    category TEXT,
+    google_event_id TEXT,
+    status TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- day: date(created_at), או '' לאירוע בלי created_at (נספר רק בסה"כ)
+CREATE TABLE IF NOT EXISTS calendar_event_daily_counts (
+    day TEXT PRIMARY KEY,
+    events INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO calendar_event_daily_counts (day, events)
+SELECT COALESCE(date(created_at), ''), COUNT(*) FROM calendar_events GROUP BY 1;
+
+CREATE TRIGGER IF NOT EXISTS calendar_event_counts_insert AFTER INSERT ON calendar_events BEGIN
+    INSERT INTO calendar_event_daily_counts (day, events) VALUES (COALESCE(date(new.created_at), ''), 1)
+    ON CONFLICT(day) DO UPDATE SET events = events + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_event_counts_delete AFTER DELETE ON calendar_events BEGIN
+    UPDATE calendar_event_daily_counts SET events = events - 1
+    WHERE day = COALESCE(date(old.created_at), '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_event_counts_update AFTER UPDATE OF created_at ON calendar_events BEGIN
+    UPDATE calendar_event_daily_counts SET events = events - 1
+    WHERE day = COALESCE(date(old.created_at), '');
+    INSERT INTO calendar_event_daily_counts (day, events) VALUES (COALESCE(date(new.created_at), ''), 1)
+    ON CONFLICT(day) DO UPDATE SET events = events + 1;
+END;
@@ -0,0 +1,4 @@
+-- זמני אירועי יום שלם במראה נשמרו כחצות UTC במקום חצות בשעון היומן (Asia/Jerusalem).
+-- מחיקת ה-syncToken גורמת לסנכרון מלא הבא לכתוב מחדש את כל האירועים בנרמול הנכון.
+
+UPDATE calendar_mirror_state SET sync_token = NULL;
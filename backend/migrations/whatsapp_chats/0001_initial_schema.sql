@@ -0,0 +1,148 @@
+-- WhatsApp chat storage (whatsapp_chats.db) - used by DatabaseManager and ChatSyncManager
+-- Replaces the database_schema.sql file that DatabaseManager used to read
+
+CREATE TABLE IF NOT EXISTS contacts (
+    contact_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone_number TEXT UNIQUE,
+    whatsapp_id TEXT UNIQUE,
+    name TEXT,
+    profile_picture_url TEXT,
+    is_business BOOLEAN DEFAULT 0,
+    business_name TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS groups (
+    group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    whatsapp_group_id TEXT UNIQUE NOT NULL,
+    group_name TEXT,
+    group_description TEXT,
+    group_picture_url TEXT,
+    created_by_contact_id INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY (created_by_contact_id) REFERENCES contacts(contact_id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS group_members (
+    group_id INTEGER NOT NULL,
+    contact_id INTEGER NOT NULL,
+    role TEXT DEFAULT 'member',
+    joined_at TEXT,
+    PRIMARY KEY (group_id, contact_id),
+    FOREIGN KEY (group_id) REFERENCES groups(group_id) ON DELETE CASCADE,
+    FOREIGN KEY (contact_id) REFERENCES contacts(contact_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    whatsapp_chat_id TEXT UNIQUE NOT NULL,
+    chat_type TEXT NOT NULL CHECK (chat_type IN ('private', 'group')),
+    contact_id INTEGER,
+    group_id INTEGER,
+    last_activity TEXT,
+    last_message_id INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY (contact_id) REFERENCES contacts(contact_id) ON DELETE SET NULL,
+    FOREIGN KEY (group_id) REFERENCES groups(group_id) ON DELETE SET NULL
+);
+
+-- timestamp is an ISO-8601 string
+CREATE TABLE IF NOT EXISTS messages (
+    message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    whatsapp_message_id TEXT,
+    chat_id INTEGER NOT NULL,
+    sender_contact_id INTEGER,
+    message_type TEXT NOT NULL DEFAULT 'text',
+    content TEXT,
+    timestamp TEXT NOT NULL,
+    received_at TEXT,
+    is_outgoing BOOLEAN DEFAULT 0,
+    is_forwarded BOOLEAN DEFAULT 0,
+    is_starred BOOLEAN DEFAULT 0,
+    is_deleted BOOLEAN DEFAULT 0,
+    reply_to_message_id TEXT,
+    media_url TEXT,
+    local_media_path TEXT,
+    media_filename TEXT,
+    media_mime_type TEXT,
+    media_size_bytes INTEGER,
+    media_duration_seconds INTEGER,
+    media_thumbnail_path TEXT,
+    location_latitude REAL,
+    location_longitude REAL,
+    location_name TEXT,
+    location_address TEXT,
+    shared_contact_name TEXT,
+    shared_contact_phone TEXT,
+    shared_contact_vcard TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY (chat_id) REFERENCES chats(chat_id) ON DELETE CASCADE,
+    FOREIGN KEY (sender_contact_id) REFERENCES contacts(contact_id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS message_reactions (
+    reaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message_id INTEGER NOT NULL,
+    contact_id INTEGER,
+    reaction TEXT NOT NULL,
+    timestamp TEXT,
+    created_at TEXT,
+    FOREIGN KEY (message_id) REFERENCES messages(message_id) ON DELETE CASCADE,
+    FOREIGN KEY (contact_id) REFERENCES contacts(contact_id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_status (
+    chat_id INTEGER PRIMARY KEY,
+    last_synced_message_id TEXT,
+    last_sync_timestamp TEXT,
+    total_messages_synced INTEGER DEFAULT 0,
+    last_error TEXT,
+    FOREIGN KEY (chat_id) REFERENCES chats(chat_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS media_download_queue (
+    queue_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message_id INTEGER NOT NULL UNIQUE,
+    media_url TEXT NOT NULL,
+    download_status TEXT NOT NULL DEFAULT 'pending',
+    download_attempts INTEGER NOT NULL DEFAULT 0,
+    last_attempt_at TEXT,
+    error_message TEXT,
+    created_at TEXT,
+    FOREIGN KEY (message_id) REFERENCES messages(message_id) ON DELETE CASCADE
+);
+
+-- Existing chat databases may hold duplicate messages - keep the first copy
+-- of each (chat_id, whatsapp_message_id) so the unique index can be built
+DELETE FROM messages
+WHERE whatsapp_message_id IS NOT NULL
+  AND message_id NOT IN (
+    SELECT MIN(message_id) FROM messages
+    WHERE whatsapp_message_id IS NOT NULL
+    GROUP BY chat_id, whatsapp_message_id
+);
+
+-- Dedup lookups (get_message_ids_for_chat) and date-range reads (get_messages_by_chat)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_chat_whatsapp_id ON messages (chat_id, whatsapp_message_id);
+CREATE INDEX IF NOT EXISTS idx_messages_chat_timestamp ON messages (chat_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages (sender_contact_id);
+CREATE INDEX IF NOT EXISTS idx_chats_last_activity ON chats (last_activity);
+CREATE INDEX IF NOT EXISTS idx_media_queue_status ON media_download_queue (download_status, created_at);
+
+CREATE VIEW IF NOT EXISTS chat_summary AS
+SELECT
+    ch.chat_id,
+    ch.whatsapp_chat_id,
+    ch.chat_type,
+    COALESCE(c.phone_number, g.whatsapp_group_id, ch.whatsapp_chat_id) AS chat_identifier,
+    COALESCE(c.name, g.group_name, ch.whatsapp_chat_id) AS chat_name,
+    (SELECT COUNT(*) FROM messages m WHERE m.chat_id = ch.chat_id) AS total_messages,
+    (SELECT MAX(m.timestamp) FROM messages m WHERE m.chat_id = ch.chat_id) AS last_message_time,
+    ch.last_activity
+FROM chats ch
+LEFT JOIN contacts c ON ch.contact_id = c.contact_id
+LEFT JOIN groups g ON ch.group_id = g.group_id;
@@ -0,0 +1,9 @@
+-- Per-chat high-water marks - the newest message already synced for each chat
+
+CREATE TABLE IF NOT EXISTS chat_high_water_marks (
+    chat_id INTEGER PRIMARY KEY,
+    last_message_timestamp INTEGER NOT NULL,
+    last_message_id TEXT,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY (chat_id) REFERENCES chats(chat_id) ON DELETE CASCADE
+);
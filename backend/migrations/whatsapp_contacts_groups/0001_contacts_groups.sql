@@ -0,0 +1,71 @@
+-- אנשי קשר וקבוצות WhatsApp עם דגלי timebro (whatsapp_contacts_groups.db)
+-- נכתב ע"י WhatsAppContactsGroupsDatabase, נקרא ע"י ממשק ה-Web, SyncManager ו-SimpleTimeBroCalendar
+
+CREATE TABLE IF NOT EXISTS contacts (
+    contact_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone_number VARCHAR(20),
+    whatsapp_id VARCHAR(100) UNIQUE,
+    remote_jid VARCHAR(100) UNIQUE,
+    name VARCHAR(255),
+    push_name VARCHAR(255),
+    profile_picture_url TEXT,
+    is_business BOOLEAN DEFAULT FALSE,
+    is_saved BOOLEAN DEFAULT FALSE,
+    type VARCHAR(50),
+    include_in_timebro BOOLEAN DEFAULT FALSE,
+    timebro_priority INTEGER DEFAULT 0,
+    company VARCHAR(255),
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS groups (
+    group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    whatsapp_group_id VARCHAR(100) UNIQUE NOT NULL,
+    subject VARCHAR(255),
+    description TEXT,
+    picture_url TEXT,
+    size INTEGER DEFAULT 0,
+    creation BIGINT,
+    subject_time BIGINT,
+    subject_owner VARCHAR(100),
+    owner VARCHAR(100),
+    is_community BOOLEAN DEFAULT FALSE,
+    is_community_announce BOOLEAN DEFAULT FALSE,
+    restrict BOOLEAN DEFAULT FALSE,
+    announce BOOLEAN DEFAULT FALSE,
+    linked_parent VARCHAR(100),
+    include_in_timebro BOOLEAN DEFAULT FALSE,
+    timebro_priority INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS group_members (
+    member_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_id INTEGER NOT NULL,
+    contact_id INTEGER NOT NULL,
+    role VARCHAR(20) DEFAULT 'member',
+    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (group_id) REFERENCES groups(group_id),
+    FOREIGN KEY (contact_id) REFERENCES contacts(contact_id),
+    UNIQUE(group_id, contact_id)
+);
+
+CREATE TABLE IF NOT EXISTS timebro_settings (
+    setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contact_id INTEGER,
+    group_id INTEGER,
+    setting_name VARCHAR(100),
+    setting_value TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (contact_id) REFERENCES contacts(contact_id),
+    FOREIGN KEY (group_id) REFERENCES groups(group_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_contacts_phone ON contacts(phone_number);
+CREATE INDEX IF NOT EXISTS idx_contacts_whatsapp_id ON contacts(whatsapp_id);
+CREATE INDEX IF NOT EXISTS idx_contacts_timebro ON contacts(include_in_timebro);
+CREATE INDEX IF NOT EXISTS idx_groups_whatsapp_id ON groups(whatsapp_group_id);
+CREATE INDEX IF NOT EXISTS idx_groups_timebro ON groups(include_in_timebro);
@@ -0,0 +1,6 @@
+-- אינדקסים לחיפוש שם חברה לפי שם איש קשר/קבוצה (_get_company_name)
+
+-- WHERE name = ? OR push_name = ? - שני אינדקסים מאפשרים MULTI-INDEX OR
+CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts (name);
+CREATE INDEX IF NOT EXISTS idx_contacts_push_name ON contacts (push_name);
+CREATE INDEX IF NOT EXISTS idx_groups_subject ON groups (subject);
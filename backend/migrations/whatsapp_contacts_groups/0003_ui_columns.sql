@@ -0,0 +1,9 @@
+-- עמודות שממשק ה-Web וסקריפטי הניקוי הוסיפו בזמן ריצה - מעכשיו חלק מהסכמה
+
+ALTER TABLE contacts ADD COLUMN company_name TEXT;
+ALTER TABLE contacts ADD COLUMN google_contact_name TEXT;
+ALTER TABLE contacts ADD COLUMN whatsapp_personal_name TEXT;
+ALTER TABLE contacts ADD COLUMN name_cleaned BOOLEAN DEFAULT 0;
+
+ALTER TABLE groups ADD COLUMN company_name TEXT;
+ALTER TABLE groups ADD COLUMN subject_cleaned BOOLEAN DEFAULT 0;
@@ -0,0 +1,52 @@
+-- אינדקס חיפוש טקסט מלא (FTS5, trigram) לאנשי קשר וקבוצות - חיפוש תת-מחרוזת בלי סריקת הטבלה
+-- הטבלאות הווירטואליות מפנות לטבלאות המקור (external content) ומתעדכנות ע"י triggers
+
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    name, push_name, phone_number, company_name,
+    content='contacts', content_rowid='contact_id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts (rowid, name, push_name, phone_number, company_name)
+    VALUES (new.contact_id, new.name, new.push_name, new.phone_number, new.company_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts (contacts_fts, rowid, name, push_name, phone_number, company_name)
+    VALUES ('delete', old.contact_id, old.name, old.push_name, old.phone_number, old.company_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_fts_update
+AFTER UPDATE OF name, push_name, phone_number, company_name ON contacts BEGIN
+    INSERT INTO contacts_fts (contacts_fts, rowid, name, push_name, phone_number, company_name)
+    VALUES ('delete', old.contact_id, old.name, old.push_name, old.phone_number, old.company_name);
+    INSERT INTO contacts_fts (rowid, name, push_name, phone_number, company_name)
+    VALUES (new.contact_id, new.name, new.push_name, new.phone_number, new.company_name);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS groups_fts USING fts5(
+    subject, description, company_name,
+    content='groups', content_rowid='group_id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS groups_fts_insert AFTER INSERT ON groups BEGIN
+    INSERT INTO groups_fts (rowid, subject, description, company_name)
+    VALUES (new.group_id, new.subject, new.description, new.company_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS groups_fts_delete AFTER DELETE ON groups BEGIN
+    INSERT INTO groups_fts (groups_fts, rowid, subject, description, company_name)
+    VALUES ('delete', old.group_id, old.subject, old.description, old.company_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS groups_fts_update
+AFTER UPDATE OF subject, description, company_name ON groups BEGIN
+    INSERT INTO groups_fts (groups_fts, rowid, subject, description, company_name)
+    VALUES ('delete', old.group_id, old.subject, old.description, old.company_name);
+    INSERT INTO groups_fts (rowid, subject, description, company_name)
+    VALUES (new.group_id, new.subject, new.description, new.company_name);
+END;
+
+-- מילוי האינדקס מהשורות הקיימות
+INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild');
+INSERT INTO groups_fts (groups_fts) VALUES ('rebuild');
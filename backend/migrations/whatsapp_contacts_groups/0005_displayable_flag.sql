@@ -0,0 +1,12 @@
+-- דגל "איש קשר להצגה" שמחושב בזמן הכתיבה (contact_display.is_displayable_contact)
+-- במקום פילטר REGEXP בפייתון על כל שורה בכל חיפוש:
+--     שם תקין (לא ריק, לא רק ספרות, יותר מ-2 תווים) או push_name לא ריק
+
+ALTER TABLE contacts ADD COLUMN is_displayable INTEGER NOT NULL DEFAULT 0;
+
+UPDATE contacts SET is_displayable = (
+    (name IS NOT NULL AND name != '' AND name GLOB '*[^0-9]*' AND LENGTH(TRIM(name)) > 2)
+    OR (push_name IS NOT NULL AND push_name != '')
+);
+
+CREATE INDEX IF NOT EXISTS idx_contacts_displayable ON contacts(is_displayable, include_in_timebro);
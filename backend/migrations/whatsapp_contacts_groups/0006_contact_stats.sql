@@ -0,0 +1,64 @@
+-- מוני הסטטיסטיקות של לוח הבקרה (/api/stats) - מתעדכנים ע"י triggers בכל כתיבה,
+-- כך שקריאת הסטטיסטיקות היא שליפה של כמה שורות במקום סריקות COUNT(*) של הטבלאות.
+-- contact_stats.recompute_contact_stats מחשב אותם מחדש (סינכרון ההתאמה היומי).
+
+CREATE TABLE IF NOT EXISTS contact_stats (
+    stat_key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO contact_stats (stat_key, value)
+SELECT 'total_contacts', COUNT(*) FROM contacts WHERE type = 'contact'
+UNION ALL
+SELECT 'contacts_in_calendar', COUNT(*) FROM contacts WHERE type = 'contact' AND include_in_timebro = 1
+UNION ALL
+SELECT 'total_groups', COUNT(*) FROM contacts WHERE type = 'group'
+UNION ALL
+SELECT 'israeli_contacts', COUNT(*) FROM contacts WHERE type = 'contact' AND phone_number LIKE '972%'
+UNION ALL
+SELECT 'groups_in_calendar', COUNT(*) FROM groups WHERE include_in_timebro = 1;
+
+CREATE TRIGGER IF NOT EXISTS contact_stats_contacts_insert AFTER INSERT ON contacts BEGIN
+    UPDATE contact_stats SET value = value + CASE stat_key
+        WHEN 'total_contacts' THEN (new.type IS 'contact')
+        WHEN 'contacts_in_calendar' THEN (new.type IS 'contact' AND new.include_in_timebro IS 1)
+        WHEN 'total_groups' THEN (new.type IS 'group')
+        WHEN 'israeli_contacts' THEN (new.type IS 'contact' AND IFNULL(new.phone_number LIKE '972%', 0))
+        ELSE 0 END;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contact_stats_contacts_delete AFTER DELETE ON contacts BEGIN
+    UPDATE contact_stats SET value = value - CASE stat_key
+        WHEN 'total_contacts' THEN (old.type IS 'contact')
+        WHEN 'contacts_in_calendar' THEN (old.type IS 'contact' AND old.include_in_timebro IS 1)
+        WHEN 'total_groups' THEN (old.type IS 'group')
+        WHEN 'israeli_contacts' THEN (old.type IS 'contact' AND IFNULL(old.phone_number LIKE '972%', 0))
+        ELSE 0 END;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contact_stats_contacts_update
+AFTER UPDATE OF type, include_in_timebro, phone_number ON contacts BEGIN
+    UPDATE contact_stats SET value = value + CASE stat_key
+        WHEN 'total_contacts' THEN (new.type IS 'contact') - (old.type IS 'contact')
+        WHEN 'contacts_in_calendar' THEN (new.type IS 'contact' AND new.include_in_timebro IS 1)
+                                       - (old.type IS 'contact' AND old.include_in_timebro IS 1)
+        WHEN 'total_groups' THEN (new.type IS 'group') - (old.type IS 'group')
+        WHEN 'israeli_contacts' THEN (new.type IS 'contact' AND IFNULL(new.phone_number LIKE '972%', 0))
+                                   - (old.type IS 'contact' AND IFNULL(old.phone_number LIKE '972%', 0))
+        ELSE 0 END;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contact_stats_groups_insert AFTER INSERT ON groups BEGIN
+    UPDATE contact_stats SET value = value + (new.include_in_timebro IS 1)
+    WHERE stat_key = 'groups_in_calendar';
+END;
+
+CREATE TRIGGER IF NOT EXISTS contact_stats_groups_delete AFTER DELETE ON groups BEGIN
+    UPDATE contact_stats SET value = value - (old.include_in_timebro IS 1)
+    WHERE stat_key = 'groups_in_calendar';
+END;
+
+CREATE TRIGGER IF NOT EXISTS contact_stats_groups_update AFTER UPDATE OF include_in_timebro ON groups BEGIN
+    UPDATE contact_stats SET value = value + (new.include_in_timebro IS 1) - (old.include_in_timebro IS 1)
+    WHERE stat_key = 'groups_in_calendar';
+END;
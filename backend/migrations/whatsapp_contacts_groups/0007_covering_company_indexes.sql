@@ -0,0 +1,11 @@
+-- אינדקסים מכסים לחיפוש שם חברה (_get_company_name) - company_name נקרא מהאינדקס בלי גישה לשורה
+-- מחליפים את האינדקסים החד-עמודתיים של 0002 (company_name נוסף רק ב-0003)
+
+DROP INDEX IF EXISTS idx_contacts_name;
+DROP INDEX IF EXISTS idx_contacts_push_name;
+DROP INDEX IF EXISTS idx_groups_subject;
+
+-- name ו-push_name נבדקים בשני חלקי UNION ALL - אינדקס מכסה לכל חלק
+CREATE INDEX IF NOT EXISTS idx_contacts_name_company ON contacts (name, company_name);
+CREATE INDEX IF NOT EXISTS idx_contacts_push_name_company ON contacts (push_name, company_name);
+CREATE INDEX IF NOT EXISTS idx_groups_subject_company ON groups (subject, company_name);
@@ -0,0 +1,15 @@
+-- טבלת ההודעות של whatsapp_messages_webjs.db
+-- נכתבת ע"י SyncManager, NotificationIngestionService ולקוח WhatsApp Web.js
+-- timestamp במילישניות, is_from_me 0/1
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT,
+    chat_id TEXT,
+    contact_number TEXT,
+    contact_name TEXT,
+    message_body TEXT,
+    message_type TEXT,
+    timestamp INTEGER,
+    is_from_me BOOLEAN,
+    created_at DATETIME
+);
@@ -0,0 +1,9 @@
+-- מפתח ייחודי (id, chat_id) - הכנסות INSERT OR IGNORE מדלגות על הודעות קיימות
+-- ניקוי כפילויות קיימות לפני יצירת האינדקס הייחודי
+
+DELETE FROM messages
+WHERE rowid NOT IN (
+    SELECT MIN(rowid) FROM messages GROUP BY id, chat_id
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_id_chat_unique ON messages (id, chat_id);
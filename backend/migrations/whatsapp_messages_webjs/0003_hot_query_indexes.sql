@@ -0,0 +1,7 @@
+-- אינדקסים לשאילתות לפי צ'אט וטווח זמן
+
+-- בדיקת הודעות קיימות לצ'אט בטווח - sync_contact_messages, sync_calendar_for_contact
+CREATE INDEX IF NOT EXISTS idx_messages_chat_timestamp ON messages (chat_id, timestamp);
+
+-- הודעות בטווח תאריכים ממוינות לפי זמן + שמות ייחודיים בטווח - iter_messages_for_date_range
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp_contact ON messages (timestamp, contact_name);
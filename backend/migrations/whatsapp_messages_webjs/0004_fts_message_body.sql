@@ -0,0 +1,29 @@
+-- אינדקס חיפוש טקסט מלא (FTS5, trigram) לתוכן ההודעות ולשם איש הקשר
+-- לטבלת messages אין INTEGER PRIMARY KEY, לכן האינדקס מפנה ל-rowid.
+-- VACUUM עלול למספר מחדש את ה-rowid - אחריו יש להריץ:
+--     INSERT INTO messages_fts (messages_fts) VALUES ('rebuild');
+
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    message_body, contact_name,
+    content='messages', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, message_body, contact_name)
+    VALUES (new.rowid, new.message_body, new.contact_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, message_body, contact_name)
+    VALUES ('delete', old.rowid, old.message_body, old.contact_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_update
+AFTER UPDATE OF message_body, contact_name ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, message_body, contact_name)
+    VALUES ('delete', old.rowid, old.message_body, old.contact_name);
+    INSERT INTO messages_fts (rowid, message_body, contact_name)
+    VALUES (new.rowid, new.message_body, new.contact_name);
+END;
+
+INSERT INTO messages_fts (messages_fts) VALUES ('rebuild');
@@ -9,7 +9,9 @@ import json
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict
+from operator import itemgetter
 from timebro_calendar import TimeBroCalendar
+from conversation_sessions import split_conversation_sessions
 from contacts_list import CONTACTS_CONFIG, get_contact_company, get_company_color
 
 class MultiContactAnalyzer:
@@ -243,31 +245,8 @@ class MultiContactAnalyzer:
         if not messages:
             return []
             
-        sessions = []
-        current_session = []
-        
-        sorted_messages = sorted(messages, key=lambda x: x['timestamp'])
-        
-        for msg in sorted_messages:
-            if not current_session:
-                current_session = [msg]
-            else:
-                last_time = current_session[-1]['datetime']
-                current_time = msg['datetime']
-                time_gap = current_time - last_time
-                
-                # If gap > 4 hours, start new session (longer gap for multi-contact)
-                if time_gap > timedelta(hours=4):
-                    if current_session:
-                        sessions.append(current_session)
-                        current_session = [msg]
-                else:
-                    current_session.append(msg)
-                    
-        if current_session:
-            sessions.append(current_session)
-            
-        return sessions
+        # If gap > 4 hours, start new session (longer gap for multi-contact)
+        return split_conversation_sessions(messages, itemgetter('timestamp'), gap_minutes=240)
         
     def create_whatsapp_link(self, contact_phone=None):
         """יצירת קישור WhatsApp"""
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+קליטת הודעות WhatsApp בזמן אמת מהתראות Green API
+שני מצבים:
+- תור התראות: receiveNotification/deleteNotification בלולאה (הפעלה כשירות - python notification_ingestion.py)
+- webhook: Green API שולח את ההתראות ל-/api/webhook/green-api בממשק ה-Web
+
+ההודעות נכתבות ל-whatsapp_messages_webjs.db במקבצים קטנים (micro-batches),
+כך שהודעה חדשה נשמרת תוך שניות בלי להוריד שוב את היסטוריית הצ'אט.
+התראה מאושרת ל-Green API (deleteNotification / תשובת 200 ל-webhook) רק אחרי שנשמרה.
+הסינכרון המלא רץ לעתים רחוקות כבדיקת התאמה (ראה setup_cron_jobs.py)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from db_connections import get_connection
+from db_migrations import MESSAGES_SCHEMA, migrate_database
+from messages_store import insert_messages
+
+# סוגי התראות שמכילות הודעה
+MESSAGE_WEBHOOK_TYPES = {
+    'incomingMessageReceived',
+    'outgoingMessageReceived',
+    'outgoingAPIMessageReceived'
+}
+
+
+def _message_text(message_data: Dict) -> Optional[str]:
+    """חילוץ טקסט ההודעה מ-messageData לפי סוג ההודעה"""
+    for data_key, text_key in (
+        ('textMessageData', 'textMessage'),
+        ('extendedTextMessageData', 'text'),
+        ('fileMessageData', 'caption'),
+        ('locationMessageData', 'nameLocation'),
+        ('contactMessageData', 'displayName'),
+    ):
+        text = (message_data.get(data_key) or {}).get(text_key)
+        if text:
+            return text
+    return None
+
+
+class NotificationIngestionService:
+    """קליטת התראות הודעה ושמירתן במקבצים קטנים"""
+
+    def __init__(self, client=None, messages_db: str = 'whatsapp_messages_webjs.db',
+                 contacts_db: str = 'whatsapp_contacts_groups.db',
+                 batch_size: int = 50, flush_interval: float = 2.0):
+        """
+        Args:
+            client: GreenAPIClient - נדרש רק במצב תור התראות
+            batch_size: מספר הודעות שגורם לכתיבה מיידית
+            flush_interval: זמן מקסימלי (שניות) שהודעה ממתינה לפני כתיבה
+        """
+        self.client = client
+        self.messages_db = messages_db
+        self.contacts_db = contacts_db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: List[Tuple] = []
+        # receiptId של התראות מהתור - נמחקות רק אחרי שהמקבץ שלהן נכתב
+        self._pending_receipts: List[int] = []
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._stop_event = threading.Event()
+        self._flusher_thread = None
+
+        # שמות אנשי קשר/קבוצות לפי chat_id - נטענים פעם אחת לכל צ'אט
+        self._chat_names: Dict[str, Optional[str]] = {}
+        self._schema_ready = False
+
+        self.stats = {'received': 0, 'saved': 0, 'ignored': 0}
+
+    def log(self, message, level="INFO"):
+        """לוגים"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if level == "SUCCESS":
+            emoji = "✅"
+        elif level == "ERROR":
+            emoji = "❌"
+        elif level == "WARNING":
+            emoji = "⚠️"
+        else:
+            emoji = "📨"
+        print(f"[{timestamp}] {emoji} {message}")
+
+    def _lookup_chat_name(self, chat_id: str) -> Optional[str]:
+        """שם איש הקשר או הקבוצה ממסד אנשי הקשר - כמו בסינכרון"""
+        if chat_id in self._chat_names:
+            return self._chat_names[chat_id]
+
+        name = None
+        try:
+            conn = get_connection(self.contacts_db, read_only=True)
+            try:
+                if chat_id.endswith('@g.us'):
+                    row = conn.execute(
+                        "SELECT subject FROM groups WHERE whatsapp_group_id = ? LIMIT 1", (chat_id,)
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        "SELECT name FROM contacts WHERE whatsapp_id = ? OR phone_number = ? LIMIT 1",
+                        (chat_id, chat_id.replace('@c.us', ''))
+                    ).fetchone()
+                name = row[0] if row else None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log(f"שגיאה בקבלת שם צ'אט {chat_id}: {e}", "WARNING")
+
+        self._chat_names[chat_id] = name
+        return name
+
+    def notification_to_row(self, body: Dict) -> Optional[Tuple]:
+        """
+        המרת התראת Green API (תוכן ה-webhook) לשורה בטבלת messages
+
+        Returns:
+            שורה לפי סדר MESSAGE_COLUMNS, או None אם ההתראה אינה הודעה
+        """
+        if not body or body.get('typeWebhook') not in MESSAGE_WEBHOOK_TYPES:
+            return None
+
+        sender_data = body.get('senderData') or {}
+        message_data = body.get('messageData') or {}
+        chat_id = sender_data.get('chatId')
+        message_id = body.get('idMessage')
+        if not chat_id or not message_id:
+            return None
+
+        contact_name = (
+            self._lookup_chat_name(chat_id)
+            or sender_data.get('chatName')
+            or sender_data.get('senderContactName')
+            or sender_data.get('senderName')
+        )
+
+        return (
+            message_id,
+            chat_id,
+            chat_id,  # contact_number
+            contact_name,
+            _message_text(message_data),
+            message_data.get('typeMessage') or 'text',
+            int((body.get('timestamp') or 0) * 1000),
+            body['typeWebhook'] != 'incomingMessageReceived',  # is_from_me
+            datetime.now().isoformat()
+        )
+
+    def add_notification(self, body: Dict, receipt_id: Optional[int] = None) -> bool:
+        """
+        הוספת התראה למקבץ הממתין - thread-safe
+
+        Args:
+            receipt_id: מזהה ההתראה בתור של Green API - נמחקת אחרי שהמקבץ נכתב
+
+        Returns:
+            True אם ההתראה היא הודעה שנוספה לכתיבה
+        """
+        self.stats['received'] += 1
+        row = self.notification_to_row(body)
+        if row is None:
+            self.stats['ignored'] += 1
+
+        with self._pending_lock:
+            if row is not None:
+                self._pending.append(row)
+            if receipt_id is not None:
+                self._pending_receipts.append(receipt_id)
+            batch_full = len(self._pending) >= self.batch_size
+
+        if batch_full:
+            self.flush()
+        return row is not None
+
+    def flush(self, raise_errors: bool = False) -> int:
+        """
+        כתיבת המקבץ הממתין למסד בטרנזקציה אחת, ואז מחיקת ההתראות שלו מהתור
+
+        Args:
+            raise_errors: להעביר שגיאת כתיבה הלאה (webhook - כדי לא להחזיר 200)
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+                receipts, self._pending_receipts = self._pending_receipts, []
+            self._last_flush = time.monotonic()
+
+            saved = 0
+            if rows:
+                if not self._schema_ready:
+                    self._schema_ready = migrate_database(self.messages_db, self.log, schema=MESSAGES_SCHEMA) >= 0
+
+                try:
+                    conn = get_connection(self.messages_db)
+                    try:
+                        saved = insert_messages(conn, rows)
+                    finally:
+                        conn.close()
+                except sqlite3.Error as e:
+                    # החזרת השורות וההתראות לתור - ינוסו שוב בכתיבה הבאה
+                    with self._pending_lock:
+                        self._pending = rows + self._pending
+                        self._pending_receipts = receipts + self._pending_receipts
+                    self.log(f"שגיאה בשמירת {len(rows)} הודעות: {e}", "ERROR")
+                    if raise_errors:
+                        raise
+                    return 0
+
+                self.stats['saved'] += saved
+                if saved:
+                    self.log(f"💾 נשמרו {saved} הודעות חדשות")
+
+        self._delete_notifications(receipts)
+        return saved
+
+    def _delete_notifications(self, receipts: List[int]):
+        """מחיקת התראות שכבר נשמרו מתור ההתראות של Green API"""
+        for receipt_id in receipts:
+            deleted, response = self.client.delete_notification(receipt_id)
+            if not deleted:
+                # ההתראה תתקבל שוב - ההודעה כבר שמורה ו-INSERT OR IGNORE ידלג עליה
+                self.log(f"שגיאה במחיקת התראה {receipt_id}: {response.get('error')}", "WARNING")
+
+    def _flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def start_background_flusher(self):
+        """thread שכותב את המקבץ הממתין כל flush_interval - למצב webhook"""
+        if self._flusher_thread and self._flusher_thread.is_alive():
+            return
+
+        def flusher():
+            while not self._stop_event.wait(self.flush_interval):
+                self._flush_if_due()
+            self.flush()
+
+        self._flusher_thread = threading.Thread(target=flusher, name='notification-flusher', daemon=True)
+        self._flusher_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._flusher_thread:
+            self._flusher_thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def run_forever(self, receive_timeout: int = 5):
+        """
+        קליטה מתור ההתראות של Green API
+
+        receiveNotification מחזיר תמיד את ההתראה הראשונה בתור עד שהיא נמחקת,
+        לכן כל התראה נכתבת (commit) ורק אז נמחקת - לפני קבלת הבאה.
+        קריסה לפני המחיקה משאירה את ההתראה בתור, והיא נקלטת שוב בהפעלה הבאה
+        """
+        if self.client is None:
+            raise ValueError("GreenAPIClient is required for notification queue mode")
+
+        self.log("🚀 מתחיל קליטת התראות מ-Green API")
+        error_backoff = 1.0
+
+        while not self._stop_event.is_set():
+            success, notification = self.client.receive_notification(receive_timeout)
+            if not success:
+                self.log(f"שגיאה בקבלת התראה: {notification.get('error')}", "WARNING")
+                self._stop_event.wait(error_backoff)
+                error_backoff = min(error_backoff * 2, 60.0)
+                continue
+
+            if not notification:
+                error_backoff = 1.0
+                continue
+
+            self.add_notification(notification.get('body') or {}, notification.get('receiptId'))
+            try:
+                self.flush(raise_errors=True)
+            except sqlite3.Error:
+                # ההתראה לא נמחקה ותתקבל שוב - לא משאירים עותק ממתין שלה
+                with self._pending_lock:
+                    self._pending, self._pending_receipts = [], []
+                self._stop_event.wait(error_backoff)
+                error_backoff = min(error_backoff * 2, 60.0)
+                continue
+            error_backoff = 1.0
+
+        self.flush()
+        self.log(f"🛑 הקליטה הופסקה - {self.stats['saved']} הודעות נשמרו", "SUCCESS")
+
+
+def main():
+    """הפעלת שירות הקליטה מתור ההתראות"""
+    from dotenv import load_dotenv
+    from green_api_client import GreenAPIClient
+
+    load_dotenv()
+    id_instance = os.getenv("GREENAPI_ID_INSTANCE")
+    api_token = os.getenv("GREENAPI_API_TOKEN")
+    if not id_instance or not api_token:
+        print("❌ חסרים GREENAPI_ID_INSTANCE / GREENAPI_API_TOKEN")
+        return 1
+
+    service = NotificationIngestionService(GreenAPIClient(id_instance, api_token))
+    try:
+        service.run_forever()
+    except KeyboardInterrupt:
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
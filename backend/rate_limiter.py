@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מגביל קצב (Token Bucket) משותף לקריאות Green API
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket - כל קריאה ל-API צורכת טוקן אחד"""
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_second: קצב מילוי הדלי (טוקנים לשנייה)
+            capacity: גודל הדלי (burst מקסימלי), ברירת מחדל - שנייה אחת של קצב
+        """
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+
+        self.rate = float(rate_per_second)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        המתנה עד שיש מספיק טוקנים וצריכתם
+
+        Returns:
+            True אם הטוקנים נצרכו, False אם עבר ה-timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait_time = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+
+            # ההמתנה מחוץ ל-lock כדי ששאר ה-threads יוכלו לבדוק את הדלי
+            time.sleep(wait_time)
+
+
+# מגביל משותף לכל התהליך - כל הלקוחות של Green API חולקים את אותה מכסה
+_green_api_limiter = None
+_green_api_limiter_lock = threading.Lock()
+
+
+def get_green_api_rate_limiter() -> TokenBucketRateLimiter:
+    """
+    קבלת מגביל הקצב המשותף של Green API
+
+    ניתן להגדרה דרך משתני סביבה:
+        GREENAPI_RATE_LIMIT_PER_SECOND - קצב קריאות מותר (ברירת מחדל 1)
+        GREENAPI_RATE_LIMIT_BURST - מספר קריאות מקסימלי ברצף (ברירת מחדל 3)
+    """
+    global _green_api_limiter
+    with _green_api_limiter_lock:
+        if _green_api_limiter is None:
+            rate = float(os.getenv("GREENAPI_RATE_LIMIT_PER_SECOND", "1"))
+            burst = float(os.getenv("GREENAPI_RATE_LIMIT_BURST", "3"))
+            _green_api_limiter = TokenBucketRateLimiter(rate, burst)
+        return _green_api_limiter
@@ -15,6 +15,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from calendar_mirror import CalendarMirror
 import pickle
 
 class DuplicateEventRemover:
@@ -25,6 +26,7 @@ class DuplicateEventRemover:
         self.db_calendar = 'timebro_calendar.db'
         self.timebro_calendar_id = None
         self.service = None
+        self.mirror = None
         self.start_date = start_date
         self.end_date = end_date
 
@@ -98,39 +100,17 @@ class DuplicateEventRemover:
             return False
 
     def fetch_all_events(self):
-        """Fetch all events from TimeBro calendar"""
+        """Fetch all events from TimeBro calendar (incremental sync into the local mirror)"""
         try:
             if self.start_date and self.end_date:
                 self.log(f"🔍 קורא אירועים מהיומן ({self.start_date} עד {self.end_date})...")
             else:
                 self.log("🔍 קורא אירועים מהיומן...")
 
-            events = []
-            page_token = None
-
-            # Build query parameters
-            query_params = {
-                'calendarId': self.timebro_calendar_id,
-                'maxResults': 2500,
-                'singleEvents': True,
-                'orderBy': 'startTime',
-            }
-
-            # Add date range if specified
-            if self.start_date:
-                query_params['timeMin'] = self.start_date
-            if self.end_date:
-                query_params['timeMax'] = self.end_date
-
-            while True:
-                query_params['pageToken'] = page_token
-                events_result = self.service.events().list(**query_params).execute()
-
-                events.extend(events_result.get('items', []))
-                page_token = events_result.get('nextPageToken')
-
-                if not page_token:
-                    break
+            # Only changes since the previous run are downloaded from Google
+            self.mirror = CalendarMirror(self.service, self.timebro_calendar_id, self.db_calendar, log=self.log)
+            self.mirror.sync()
+            events = self.mirror.get_events(self.start_date, self.end_date)
 
             self.log(f"📊 נמצאו {len(events)} אירועים ביומן", "SUCCESS")
             return events
@@ -247,6 +227,7 @@ class DuplicateEventRemover:
                         ).execute()
 
                         self.log(f"   ✅ נמחק: {event_id[:20]}...", "SUCCESS")
+                        self.mirror.forget_events([event_id])
                         deleted_count += 1
 
                     except Exception as e:
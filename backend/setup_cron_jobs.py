@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 הגדרת Cron Jobs למערכת TimeBro Calendar
-- סינכרון שעתי של WhatsApp (כל השיחות)
+- קליטת הודעות WhatsApp בזמן אמת מתור ההתראות של Green API (notification_ingestion.py)
+- סינכרון התאמה יומי של WhatsApp (משלים הודעות שפוספסו בקליטה)
 - עיבוד יומן שבועי במוצאי שבת
 """
 
@@ -23,27 +24,38 @@ class CronJobsSetup:
     def create_cron_scripts(self):
         """יצירת סקריפטים לcron jobs"""
         
-        # סקריפט סינכרון שעתי
-        hourly_script = f"""#!/bin/bash
-# TimeBro - Hourly WhatsApp Sync
-# רץ כל שעה לסינכרון כל השיחות בוואטסאפ
+        # סקריפט סינכרון התאמה יומי - ההודעות החדשות נקלטות בזמן אמת ע"י notification_ingestion.py
+        reconcile_script = f"""#!/bin/bash
+# TimeBro - Daily WhatsApp Reconciliation Sync
+# רץ פעם ביום להשלמת הודעות שלא נקלטו מתור ההתראות
 
 cd "{self.project_path}"
 
 # לוג התחלה
-echo "[$(date)] 🔄 Starting hourly WhatsApp sync..." >> timebro_cron.log
+echo "[$(date)] 🔄 Starting daily WhatsApp reconciliation sync..." >> timebro_cron.log
 
-# הפעלת סינכרון WhatsApp
+# הפעלת סינכרון WhatsApp - כל המסומנים, היומיים האחרונים
+# (בלי workers של תור העבודות - עבודות שנשלחו מהממשק נשארות לשרת ה-Web)
 {self.python_path} -c "
 import sys
+from datetime import date, timedelta
 sys.path.append('{self.project_path}')
-from timebro_calendar_system import TimeBroCalendarSystem
-system = TimeBroCalendarSystem()
-system.sync_whatsapp_messages()
+from sync_manager import SyncManager
+manager = SyncManager(start_job_queue=False)
+end = date.today()
+result = manager.sync_all_marked((end - timedelta(days=2)).isoformat(), end.isoformat())
+sys.exit(0 if result.get('success') else 1)
 " >> timebro_cron.log 2>&1
 
+# יישור דגל התצוגה של אנשי קשר ששמם שונה ע"י סקריפטי ניקוי/שחזור
+{self.python_path} contact_display.py >> timebro_cron.log 2>&1
+
+# חישוב מחדש של מוני הסטטיסטיקות (למקרה שכתיבה עקפה את ה-triggers)
+{self.python_path} contact_stats.py >> timebro_cron.log 2>&1
+{self.python_path} calendar_stats.py >> timebro_cron.log 2>&1
+
 # לוג סיום
-echo "[$(date)] ✅ Hourly sync completed" >> timebro_cron.log
+echo "[$(date)] ✅ Reconciliation sync completed" >> timebro_cron.log
 """
 
         # סקריפט עיבוד יומן שבועי
@@ -70,14 +82,14 @@ echo "[$(date)] ✅ Weekly calendar processing completed" >> timebro_cron.log
 """
 
         # שמירת הסקריפטים
-        with open('timebro_hourly_sync.sh', 'w') as f:
-            f.write(hourly_script)
+        with open('timebro_reconcile_sync.sh', 'w') as f:
+            f.write(reconcile_script)
         
         with open('timebro_weekly_calendar.sh', 'w') as f:
             f.write(weekly_script)
         
         # הפיכה לניתנים להרצה
-        os.chmod('timebro_hourly_sync.sh', 0o755)
+        os.chmod('timebro_reconcile_sync.sh', 0o755)
         os.chmod('timebro_weekly_calendar.sh', 0o755)
         
         self.log("✅ סקריפטי cron נוצרו", "SUCCESS")
@@ -89,9 +101,13 @@ echo "[$(date)] ✅ Weekly calendar processing completed" >> timebro_cron.log
 # TimeBro Calendar System - Automated Jobs
 # Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-# Hourly WhatsApp sync (all conversations)
-# רץ כל שעה ב-7 דקות (למניעת עומס בתחילת השעה)
-7 * * * * {self.project_path}/timebro_hourly_sync.sh
+# Real-time WhatsApp ingestion (Green API notification queue)
+# שירות שרץ ברקע מאתחול המחשב וקולט הודעות חדשות תוך שניות
+@reboot cd {self.project_path} && {self.python_path} notification_ingestion.py >> {self.project_path}/timebro_ingestion.log 2>&1
+
+# Daily WhatsApp reconciliation sync (all conversations)
+# רץ כל יום ב-3:07 להשלמת הודעות שפוספסו בקליטה
+7 3 * * * {self.project_path}/timebro_reconcile_sync.sh
 
 # Weekly calendar processing (Saturday night)
 # רץ כל מוצאי שבת בשעה 21:00
@@ -170,17 +186,23 @@ echo "[$(date)] ✅ Weekly calendar processing completed" >> timebro_cron.log
 
 ## 🚀 מה הותקן:
 
-### 1. סינכרון שעתי (כל השיחות בוואטסאפ)
-- **מתי**: כל שעה ב-7 דקות
-- **מה**: סינכרון כל השיחות והקבוצות מוואטסאפ
-- **סקריפט**: timebro_hourly_sync.sh
+### 1. קליטת הודעות בזמן אמת
+- **מתי**: רץ ברקע מאתחול המחשב (@reboot)
+- **מה**: קליטת הודעות חדשות מתור ההתראות של Green API ושמירתן תוך שניות
+- **סקריפט**: notification_ingestion.py (לוג: timebro_ingestion.log)
+- **חלופה**: webhook ל-/api/webhook/green-api בממשק ה-Web (חובה להגדיר GREENAPI_WEBHOOK_TOKEN - נשלח כ-Authorization: Bearer)
+
+### 2. סינכרון התאמה יומי (כל השיחות בוואטסאפ)
+- **מתי**: כל יום בשעה 3:07
+- **מה**: השלמת הודעות שלא נקלטו בזמן אמת (למשל כשהשירות לא רץ)
+- **סקריפט**: timebro_reconcile_sync.sh
 
-### 2. עיבוד יומן שבועי
+### 3. עיבוד יומן שבועי
 - **מתי**: כל מוצאי שבת בשעה 21:00
 - **מה**: חילוץ אירועי יומן מהשבוע שחלף ושליחה לClaude
 - **סקריפט**: timebro_weekly_calendar.sh
 
-### 3. בדיקת בריאות יומית
+### 4. בדיקת בריאות יומית
 - **מתי**: כל יום בשעה 8:00
 - **מה**: בדיקת מצב המערכת וסטטיסטיקות
 
@@ -194,7 +216,13 @@ crontab -l
 ### הפעלה ידנית של סינכרון:
 ```bash
 cd "{self.project_path}"
-./timebro_hourly_sync.sh
+./timebro_reconcile_sync.sh
+```
+
+### הפעלה ידנית של קליטת ההודעות:
+```bash
+cd "{self.project_path}"
+nohup python3 notification_ingestion.py >> timebro_ingestion.log 2>&1 &
 ```
 
 ### הפעלה ידנית של עיבוד יומן:
@@ -207,6 +235,7 @@ cd "{self.project_path}"
 ```bash
 tail -f {self.project_path}/timebro_cron.log
 tail -f {self.project_path}/timebro_health.log
+tail -f {self.project_path}/timebro_ingestion.log
 ```
 
 ### הפעלה ידנית של המערכת:
@@ -286,7 +315,8 @@ python3 setup_cron_jobs.py
         # בדיקת קבצים
         required_files = [
             'timebro_calendar_system.py',
-            'timebro_hourly_sync.sh',
+            'notification_ingestion.py',
+            'timebro_reconcile_sync.sh',
             'timebro_weekly_calendar.sh',
             'whatsapp_web_js_client.js'
         ]
@@ -297,6 +327,17 @@ python3 setup_cron_jobs.py
             else:
                 print(f'❌ {file} חסר')
         
+        # בדיקת שירות קליטת ההודעות
+        try:
+            result = subprocess.run(['pgrep', '-f', 'notification_ingestion.py'],
+                                  capture_output=True, text=True)
+            if result.stdout.strip():
+                print('✅ קליטת הודעות בזמן אמת רצה')
+            else:
+                print('⚠️ קליטת הודעות בזמן אמת לא רצה')
+        except:
+            print('❌ שגיאה בבדיקת קליטת ההודעות')
+        
         # בדיקת WhatsApp Client
         try:
             result = subprocess.run(['pgrep', '-f', 'whatsapp_web_js_client.js'], 
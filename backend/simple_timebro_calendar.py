@@ -9,17 +9,42 @@
 import sqlite3
 import json
 import os
+import time
+import hashlib
+import threading
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from contacts_list import CONTACTS_CONFIG, get_contact_company
+from contact_matcher import ApprovedContactMatcher
+from conversation_sessions import iter_conversation_sessions
+from db_connections import get_connection
+from db_migrations import CALENDAR_SCHEMA, migrate_database
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
+# מקסימום בקשות בבקשת batch אחת של Google Calendar API
+CALENDAR_BATCH_SIZE = 50
+
+# cache תהליכי של הרשאות Google (לפי קובץ token) - נטען מהדיסק פעם אחת
+_credentials_cache = {}
+_credentials_lock = threading.Lock()
+
+# אובייקט ה-service של googleapiclient אינו thread-safe, לכן נשמר לכל thread בנפרד
+_thread_services = threading.local()
+
+# אזור הזמן של אירועי היומן - כל הזמנים באינדקס המקומי נשמרים כשעון מקומי
+CALENDAR_TIMEZONE = ZoneInfo('Asia/Jerusalem')
+
+# כל כמה זמן מותר ליישר את האינדקס המקומי מול Google עבור אותו טווח
+EVENT_INDEX_RECONCILE_SECONDS = 600
+
 class SimpleTimeBroCalendar:
     def __init__(self):
         self.timebro_calendar_id = 'c_mjbk37j51lkl4pl8i9tk31ek3o@group.calendar.google.com'
         self.db_main = 'whatsapp_messages_webjs.db'
+        self.db_contacts = 'whatsapp_contacts_groups.db'
         self.db_calendar = 'timebro_calendar.db'
         
         # Google Calendar API
@@ -30,17 +55,23 @@ class SimpleTimeBroCalendar:
         # רשימת אנשי הקשר המאושרים - רק אלה שביקשת
         self.approved_contacts = set()
         self._load_approved_contacts()
+        self.contact_matcher = ApprovedContactMatcher(self.approved_contacts)
         
         # מרחק זמן לקיבוץ הודעות (60 דקות - שעה)
         self.message_grouping_minutes = 60
+        
+        # אינדקס מקומי של אירועים שנוצרו - מחליף קריאת events.list לכל אירוע
+        self._reconciled_ranges = []
+        self._event_index_lock = threading.Lock()
+        
+        # טבלאות היומן והאינדקס (migrations/timebro_calendar/) - לפני כל שימוש באינדקס
+        migrate_database(self.db_calendar, self.log, schema=CALENDAR_SCHEMA)
 
     def _load_approved_contacts(self):
         """טעינת אנשי הקשר המאושרים מהמסד הנתונים"""
         try:
-            import sqlite3
-            
             # טעינת אנשי קשר מסומנים לסינכרון
-            conn = sqlite3.connect('whatsapp_contacts_groups.db')
+            conn = get_connection(self.db_contacts)
             cursor = conn.cursor()
             
             # אנשי קשר
@@ -64,41 +95,8 @@ class SimpleTimeBroCalendar:
             return set()
 
     def is_approved_contact(self, contact_name):
-        """בדיקה חכמה יותר אם איש קשר מאושר"""
-        if not contact_name or len(contact_name.strip()) < 2:
-            return False
-        
-        contact_clean = contact_name.strip().lower()
-        
-        # בדיקה מדויקת ראשונה
-        for approved in self.approved_contacts:
-            approved_clean = approved.strip().lower()
-            if contact_clean == approved_clean:
-                return True
-        
-        # בדיקה חלקית - אם השם מכיל או מוכל באישור
-        for approved in self.approved_contacts:
-            approved_clean = approved.strip().lower()
-            # אם השם מכיל את השם המאושר או להפך
-            if approved_clean in contact_clean or contact_clean in approved_clean:
-                # וודא שהשם ארוך מספיק כדי למנוע false positives
-                min_len = min(len(approved_clean), len(contact_clean))
-                if min_len >= 4:  # שמות של לפחות 4 תווים
-                    return True
-        
-        # בדיקה לפי מילים נפרדות (שם פרטי או משפחה)
-        contact_words = contact_clean.split()
-        for approved in self.approved_contacts:
-            approved_words = approved.strip().lower().split()
-            
-            # אם יש התאמה של לפחות מילה אחת ארוכה
-            for contact_word in contact_words:
-                for approved_word in approved_words:
-                    if len(contact_word) >= 3 and len(approved_word) >= 3:
-                        if contact_word == approved_word:
-                            return True
-        
-        return False
+        """בדיקה חכמה יותר אם איש קשר מאושר - מדויק, שם מוכל או מילה משותפת"""
+        return self.contact_matcher.is_approved(contact_name)
         
     def log(self, message, level="INFO"):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -111,72 +109,119 @@ class SimpleTimeBroCalendar:
             f.write(f"{log_entry}\n")
 
     def init_database(self):
-        """אתחול מסד נתונים"""
-        conn = sqlite3.connect(self.db_calendar)
-        cursor = conn.cursor()
-        
-        # טבלת אירועים פשוטה
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS simple_calendar_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                contact_name TEXT NOT NULL,
-                company TEXT,
-                start_datetime TEXT NOT NULL,
-                end_datetime TEXT NOT NULL,
-                total_messages INTEGER,
-                my_messages INTEGER,
-                their_messages INTEGER,
-                event_content TEXT,
-                google_event_id TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        """אתחול מסד נתונים - simple_calendar_events ו-calendar_event_index מוגדרות ב-migrations/timebro_calendar/"""
+        migrate_database(self.db_calendar, self.log, schema=CALENDAR_SCHEMA)
         self.log("✅ מסד נתונים אותחל", "SUCCESS")
 
+    def _load_google_credentials(self):
+        """טעינת הרשאות Google - מה-cache אם עדיין בתוקף"""
+        with _credentials_lock:
+            creds = _credentials_cache.get(self.token_file)
+            if creds and creds.valid:
+                return creds
+            
+            if not creds and os.path.exists(self.token_file):
+                creds = Credentials.from_authorized_user_file(self.token_file, self.SCOPES)
+            
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    creds.refresh(Request())
+                else:
+                    if not os.path.exists(self.credentials_file):
+                        self.log("❌ קובץ credentials.json לא נמצא", "ERROR")
+                        return None
+                    
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        self.credentials_file, self.SCOPES)
+                    creds = flow.run_local_server(port=0)
+                
+                with open(self.token_file, 'w') as token:
+                    token.write(creds.to_json())
+            
+            _credentials_cache[self.token_file] = creds
+            return creds
+
     def authenticate_google_calendar(self):
-        """אימות Google Calendar API"""
-        creds = None
+        """אימות Google Calendar API - ה-service נבנה פעם אחת לכל thread"""
+        services = getattr(_thread_services, 'by_token_file', None)
+        if services is None:
+            services = _thread_services.by_token_file = {}
         
-        if os.path.exists(self.token_file):
-            creds = Credentials.from_authorized_user_file(self.token_file, self.SCOPES)
+        service = services.get(self.token_file)
+        if service is not None:
+            return service
         
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                if not os.path.exists(self.credentials_file):
-                    self.log("❌ קובץ credentials.json לא נמצא", "ERROR")
-                    return None
-                
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_file, self.SCOPES)
-                creds = flow.run_local_server(port=0)
-            
-            with open(self.token_file, 'w') as token:
-                token.write(creds.to_json())
+        creds = self._load_google_credentials()
+        if not creds:
+            return None
         
         try:
-            service = build('calendar', 'v3', credentials=creds)
+            # ה-service מרענן את ה-token בעצמו כשהוא פג
+            service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+            services[self.token_file] = service
             self.log("✅ חיבור לGoogle Calendar הצליח", "SUCCESS")
             return service
         except Exception as e:
             self.log(f"❌ שגיאה בחיבור לGoogle Calendar: {e}", "ERROR")
             return None
 
-    def get_messages_for_date_range(self, start_date, end_date):
-        """קבלת הודעות מטווח תאריכים מאנשי קשר מאושרים בלבד"""
+    def iter_messages_for_date_range(self, start_date, end_date, batch_size=1000):
+        """
+        הודעות מטווח תאריכים מאנשי קשר מאושרים בלבד - הסינון מתבצע ב-SQLite
+        והשורות מוחזרות בהדרגה מה-cursor (ממוינות לפי זמן)
+        """
+        conn = get_connection(self.db_main)
         try:
-            conn = sqlite3.connect(self.db_main)
             cursor = conn.cursor()
             
             # חישוב timestamps
             start_timestamp = int(start_date.timestamp() * 1000)
             end_timestamp = int(end_date.timestamp() * 1000)
             
-            # שאילתה להודעות מכל אנשי הקשר
+            # טבלאות זמניות של צ'אטים ושמות מאושרים, לצורך join בצד ה-SQL
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS approved_chat_ids (chat_id TEXT PRIMARY KEY)")
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS approved_chat_names (contact_name TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM temp.approved_chat_ids")
+            cursor.execute("DELETE FROM temp.approved_chat_names")
+            
+            # צ'אטים מסומנים לפי מזהה - מתוך מסד אנשי הקשר והקבוצות.
+            # ה-DELETE פתח טרנזקציה, ו-ATTACH/DETACH לא רצים בתוך טרנזקציה פתוחה -
+            # בלי commit ה-DETACH נכשל והמסד נשאר מחובר לחיבור שחוזר למאגר
+            conn.commit()
+            cursor.execute("ATTACH DATABASE ? AS contacts_db", (self.db_contacts,))
+            try:
+                try:
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO temp.approved_chat_ids (chat_id)
+                        SELECT whatsapp_id FROM contacts_db.contacts
+                        WHERE include_in_timebro = 1 AND whatsapp_id IS NOT NULL
+                        UNION
+                        SELECT whatsapp_group_id FROM contacts_db.groups
+                        WHERE include_in_timebro = 1 AND whatsapp_group_id IS NOT NULL
+                    """)
+                except sqlite3.Error as e:
+                    # מסד אנשי קשר בלי הטבלאות - הסינון לפי שם עדיין פועל
+                    self.log(f"⚠️ לא ניתן לטעון צ'אטים מסומנים לפי מזהה: {e}", "WARNING")
+                conn.commit()
+            finally:
+                cursor.execute("DETACH DATABASE contacts_db")
+            
+            # שמות מאושרים - ההתאמה החלקית רצה רק על השמות הייחודיים בטווח, לא על כל שורה
+            cursor.execute("""
+                SELECT DISTINCT contact_name FROM messages
+                WHERE timestamp >= ? AND timestamp <= ?
+                AND contact_name IS NOT NULL
+            """, (start_timestamp, end_timestamp))
+            approved_names = [
+                (row[0],) for row in cursor.fetchall()
+                if self.is_approved_contact(row[0])
+            ]
+            cursor.executemany(
+                "INSERT OR IGNORE INTO temp.approved_chat_names (contact_name) VALUES (?)",
+                approved_names
+            )
+            
+            # שאילתה להודעות מאנשי קשר מאושרים בלבד
             cursor.execute("""
                 SELECT 
                     contact_name,
@@ -191,20 +236,27 @@ class SimpleTimeBroCalendar:
                     AND contact_name IS NOT NULL
                     AND message_body IS NOT NULL
                     AND LENGTH(TRIM(message_body)) > 0
-                ORDER BY contact_name, timestamp ASC
+                    AND (
+                        contact_name IN (SELECT contact_name FROM temp.approved_chat_names)
+                        OR chat_id IN (SELECT chat_id FROM temp.approved_chat_ids)
+                    )
+                ORDER BY timestamp ASC
             """, (start_timestamp, end_timestamp))
             
-            all_messages = cursor.fetchall()
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
             conn.close()
+
+    def get_messages_for_date_range(self, start_date, end_date):
+        """קבלת הודעות מטווח תאריכים מאנשי קשר מאושרים בלבד"""
+        try:
+            approved_messages = list(self.iter_messages_for_date_range(start_date, end_date))
             
-            # סינון לאנשי קשר מאושרים בלבד
-            approved_messages = []
-            for msg in all_messages:
-                contact_name = msg[0]
-                if self.is_approved_contact(contact_name):
-                    approved_messages.append(msg)
-            
-            self.log(f"נמצאו {len(approved_messages)} הודעות מאנשי קשר מאושרים (מתוך {len(all_messages)} סה\"כ)")
+            self.log(f"נמצאו {len(approved_messages)} הודעות מאנשי קשר מאושרים")
             
             # רשימת אנשי קשר שיש להם הודעות
             contacts_with_messages = set()
@@ -218,62 +270,48 @@ class SimpleTimeBroCalendar:
             self.log(f"❌ שגיאה בקבלת הודעות: {e}", "ERROR")
             return []
 
-    def group_messages_by_contact_and_time(self, messages):
-        """קיבוץ הודעות לפי איש קשר ולאחר מכן לפי פערי זמן של שעה"""
-        # שלב 1: קיבוץ לפי איש קשר
-        messages_by_contact = {}
+    def iter_conversations(self, messages):
+        """
+        חלוקת הודעות (ממוינות לפי זמן) למקבצי שיחה לכל איש קשר לפי פערי זמן של שעה -
+        המקבצים מוחזרים בהדרגה, ברגע שכל אחד מהם מסתיים
+        """
+        sessions = iter_conversation_sessions(
+            messages,
+            timestamp_of=lambda msg: msg[3] / 1000,
+            gap_minutes=self.message_grouping_minutes,
+            chat_of=lambda msg: msg[0]
+        )
         
-        for msg in messages:
-            contact_name = msg[0]
-            timestamp = msg[3]
-            message_datetime = datetime.fromtimestamp(timestamp / 1000)
-            
-            if contact_name not in messages_by_contact:
-                messages_by_contact[contact_name] = []
-            
-            messages_by_contact[contact_name].append({
+        for session in sessions:
+            contact_name = session.chat
+            group = [{
                 'content': msg[2],
-                'timestamp': timestamp,
-                'datetime': message_datetime,
+                'timestamp': msg[3],
+                'datetime': datetime.fromtimestamp(msg[3] / 1000),
                 'is_from_me': bool(msg[4]),
                 'contact_name': contact_name
-            })
+            } for msg in session.messages]
+            
+            yield {
+                'contact_name': contact_name,
+                'start_time': group[0]['datetime'],
+                'end_time': group[-1]['datetime'],
+                'messages': group
+            }
+
+    def group_messages_by_contact_and_time(self, messages):
+        """קיבוץ הודעות לפי איש קשר ולאחר מכן לפי פערי זמן של שעה"""
+        conversations_by_contact = {}
+        for conversation in self.iter_conversations(messages):
+            conversations_by_contact.setdefault(conversation['contact_name'], []).append(conversation)
         
-        # שלב 2: קיבוץ כל איש קשר למספר מקבצים לפי פערי זמן של שעה
+        # יצירת שם ייחודי לכל מקבץ
         all_conversations = {}
-        
-        for contact_name, contact_messages in messages_by_contact.items():
-            # מיון הודעות לפי זמן
-            contact_messages.sort(key=lambda x: x['timestamp'])
-            
-            # יצירת מקבצים לפי פערי זמן
-            conversation_groups = []
-            current_group = [contact_messages[0]]
-            last_time = contact_messages[0]['datetime']
-            
-            for msg in contact_messages[1:]:
-                time_diff_minutes = (msg['datetime'] - last_time).total_seconds() / 60
-                
-                if time_diff_minutes <= 60:  # פחות משעה - אותו מקבץ
-                    current_group.append(msg)
-                    last_time = msg['datetime']  # עדכון last_time גם כאן!
-                else:  # יותר משעה - מקבץ חדש
-                    conversation_groups.append(current_group)
-                    current_group = [msg]
-                    last_time = msg['datetime']
-            
-            # הוספת המקבץ האחרון
-            conversation_groups.append(current_group)
-            
-            # יצירת שם ייחודי לכל מקבץ
-            for i, group in enumerate(conversation_groups):
+        for contact_name, conversation_groups in conversations_by_contact.items():
+            conversation_groups.sort(key=lambda conversation: conversation['start_time'])
+            for i, conversation in enumerate(conversation_groups):
                 unique_key = f"{contact_name}_{i+1}" if len(conversation_groups) > 1 else contact_name
-                all_conversations[unique_key] = {
-                    'contact_name': contact_name,
-                    'start_time': group[0]['datetime'],
-                    'end_time': group[-1]['datetime'],
-                    'messages': group
-                }
+                all_conversations[unique_key] = conversation
         
         return all_conversations
 
@@ -306,51 +344,83 @@ class SimpleTimeBroCalendar:
         
         return '\n'.join(formatted_lines), my_count, their_count
 
+    def _prepare_calendar_event(self, contact_name, conversation, service, batch_fingerprints=None):
+        """
+        הכנת גוף אירוע Google Calendar ורשומת המסד המקומי - None אם אירוע דומה כבר קיים
+
+        batch_fingerprints: טביעות האצבע של האירועים שכבר הוכנו באותו batch -
+        האינדקס המקומי מתעדכן רק אחרי שה-batch נשלח, כך ששיחה כפולה ב-batch נתפסת כאן
+        """
+        # קבלת שם החברה מהמסד
+        company_name = self._get_company_name(contact_name)
+        company, color = get_contact_company(contact_name)
+        
+        # הכנת תוכן האירוע
+        content, my_messages, their_messages = self.format_conversation_content(conversation)
+        
+        # כותרת האירוע - שם החברה (או שם איש הקשר אם אין) עם אימוג'י צ'ט
+        start_time = conversation['start_time']
+        title = f"💬 {company_name if company_name else contact_name}"
+        
+        # זמני האירוע
+        # אם השיחה קצרה מ-5 דקות, נעשה אותה 5 דקות (מינימום)
+        duration = conversation['end_time'] - conversation['start_time']
+        if duration < timedelta(minutes=5):
+            end_time = conversation['start_time'] + timedelta(minutes=5)
+        else:
+            end_time = conversation['end_time']
+        
+        # בדיקה אם אירוע דומה כבר קיים (למניעת כפילויות)
+        if self._event_exists(service, title, start_time, end_time):
+            self.log(f"⚠️ אירוע דומה כבר קיים: {title[:50]}...", "WARNING")
+            return None
+        
+        if batch_fingerprints is not None:
+            fingerprint = self._event_fingerprint(title, start_time, end_time)
+            if fingerprint in batch_fingerprints:
+                self.log(f"⚠️ אירוע זהה כבר נמצא ב-batch: {title[:50]}...", "WARNING")
+                return None
+            batch_fingerprints.add(fingerprint)
+        
+        # מבנה אירוע Google Calendar
+        calendar_event = {
+            'summary': title,
+            'description': content,
+            'start': {
+                'dateTime': conversation['start_time'].replace(microsecond=0).isoformat(),
+                'timeZone': 'Asia/Jerusalem'
+            },
+            'end': {
+                'dateTime': end_time.replace(microsecond=0).isoformat(),
+                'timeZone': 'Asia/Jerusalem'
+            },
+            'colorId': color,
+            'reminders': {
+                'useDefault': False,
+                'overrides': []
+            }
+        }
+        
+        db_record = {
+            'contact_name': contact_name,
+            'company': company,
+            'start_datetime': conversation['start_time'],
+            'end_datetime': end_time,
+            'total_messages': len(conversation['messages']),
+            'my_messages': my_messages,
+            'their_messages': their_messages,
+            'event_content': content
+        }
+        
+        return calendar_event, db_record
+
     def create_calendar_event(self, contact_name, conversation, service):
         """יצירת אירוע ביומן"""
         try:
-            # קבלת שם החברה מהמסד
-            company_name = self._get_company_name(contact_name)
-            company, color = get_contact_company(contact_name)
-            
-            # הכנת תוכן האירוע
-            content, my_messages, their_messages = self.format_conversation_content(conversation)
-            
-            # כותרת האירוע - שם החברה (או שם איש הקשר אם אין) עם אימוג'י צ'ט
-            start_time = conversation['start_time']
-            title = f"💬 {company_name if company_name else contact_name}"
-            
-            # זמני האירוע
-            # אם השיחה קצרה מ-5 דקות, נעשה אותה 5 דקות (מינימום)
-            duration = conversation['end_time'] - conversation['start_time']
-            if duration < timedelta(minutes=5):
-                end_time = conversation['start_time'] + timedelta(minutes=5)
-            else:
-                end_time = conversation['end_time']
-            
-            # בדיקה אם אירוע דומה כבר קיים (למניעת כפילויות)
-            if self._event_exists(service, title, start_time, end_time):
-                self.log(f"⚠️ אירוע דומה כבר קיים: {title[:50]}...", "WARNING")
+            prepared = self._prepare_calendar_event(contact_name, conversation, service)
+            if not prepared:
                 return False
-            
-            # מבנה אירוע Google Calendar
-            calendar_event = {
-                'summary': title,
-                'description': content,
-                'start': {
-                    'dateTime': conversation['start_time'].replace(microsecond=0).isoformat(),
-                    'timeZone': 'Asia/Jerusalem'
-                },
-                'end': {
-                    'dateTime': end_time.replace(microsecond=0).isoformat(),
-                    'timeZone': 'Asia/Jerusalem'
-                },
-                'colorId': color,
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': []
-                }
-            }
+            calendar_event, db_record = prepared
             
             # יצירת האירוע
             created_event = service.events().insert(
@@ -359,29 +429,80 @@ class SimpleTimeBroCalendar:
             ).execute()
             
             # שמירה במסד הנתונים המקומי
-            self.save_event_to_db(
-                contact_name=contact_name,
-                company=company,
-                start_datetime=conversation['start_time'],
-                end_datetime=end_time,
-                total_messages=len(conversation['messages']),
-                my_messages=my_messages,
-                their_messages=their_messages,
-                event_content=content,
-                google_event_id=created_event.get('id')
-            )
+            self.save_event_to_db(google_event_id=created_event.get('id'), **db_record)
+            self._index_event(calendar_event['summary'], db_record['start_datetime'],
+                              db_record['end_datetime'], created_event.get('id'))
             
-            self.log(f"✅ נוצר אירוע: {title[:50]}...", "SUCCESS")
+            self.log(f"✅ נוצר אירוע: {calendar_event['summary'][:50]}...", "SUCCESS")
             return True
             
         except Exception as e:
             self.log(f"❌ שגיאה ביצירת אירוע: {e}", "ERROR")
             return False
 
+    def create_calendar_events_batch(self, conversations, service):
+        """
+        יצירת אירועים ביומן בבקשות batch (עד 50 אירועים לבקשה)
+        
+        Args:
+            conversations: רשימת זוגות (contact_name, conversation)
+            service: Google Calendar service
+        
+        Returns:
+            מספר האירועים שנוצרו
+        """
+        pending = []
+        batch_fingerprints = set()
+        for contact_name, conversation in conversations:
+            try:
+                prepared = self._prepare_calendar_event(contact_name, conversation, service,
+                                                        batch_fingerprints)
+                if prepared:
+                    pending.append(prepared)
+            except Exception as e:
+                self.log(f"❌ שגיאה בהכנת אירוע: {e}", "ERROR")
+        
+        created_count = 0
+        
+        for chunk_start in range(0, len(pending), CALENDAR_BATCH_SIZE):
+            chunk = pending[chunk_start:chunk_start + CALENDAR_BATCH_SIZE]
+            created = {}
+            
+            def on_response(request_id, response, exception):
+                if exception is not None:
+                    self.log(f"❌ שגיאה ביצירת אירוע: {exception}", "ERROR")
+                else:
+                    created[int(request_id)] = response
+            
+            batch = service.new_batch_http_request(callback=on_response)
+            for index, (calendar_event, _) in enumerate(chunk):
+                batch.add(
+                    service.events().insert(calendarId=self.timebro_calendar_id, body=calendar_event),
+                    request_id=str(index)
+                )
+            
+            try:
+                batch.execute()
+            except Exception as e:
+                # חלק מהאירועים אולי כבר נוצרו ב-Google - נשמרים למטה כדי שלא ייווצרו שוב
+                self.log(f"❌ שגיאה בשליחת batch של אירועים: {e}", "ERROR")
+            
+            # שמירה במסד הנתונים המקומי רק לאירועים שנוצרו בהצלחה
+            for index, response in created.items():
+                calendar_event, db_record = chunk[index]
+                self.save_event_to_db(google_event_id=response.get('id'), **db_record)
+                self._index_event(calendar_event['summary'], db_record['start_datetime'],
+                                  db_record['end_datetime'], response.get('id'))
+                self.log(f"✅ נוצר אירוע: {calendar_event['summary'][:50]}...", "SUCCESS")
+            
+            created_count += len(created)
+        
+        return created_count
+
     def save_event_to_db(self, **kwargs):
         """שמירת אירוע במסד הנתונים המקומי"""
         try:
-            conn = sqlite3.connect(self.db_calendar)
+            conn = get_connection(self.db_calendar)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -411,13 +532,14 @@ class SimpleTimeBroCalendar:
     def _get_company_name(self, contact_name):
         """קבלת שם החברה מהמסד"""
         try:
-            conn = sqlite3.connect('whatsapp_contacts_groups.db')
+            conn = get_connection(self.db_contacts)
             cursor = conn.cursor()
             
-            # חיפוש לפי שם
+            # חיפוש לפי שם ואז לפי push_name - כל חלק נקרא מאינדקס מכסה
             cursor.execute("""
-                SELECT company_name FROM contacts 
-                WHERE name = ? OR push_name = ?
+                SELECT company_name FROM contacts WHERE name = ?
+                UNION ALL
+                SELECT company_name FROM contacts WHERE push_name = ?
                 LIMIT 1
             """, (contact_name, contact_name))
             
@@ -428,7 +550,7 @@ class SimpleTimeBroCalendar:
                 return result[0]
             
             # אם לא נמצא באנשי קשר, נסה בקבוצות
-            conn = sqlite3.connect('whatsapp_contacts_groups.db')
+            conn = get_connection(self.db_contacts)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -446,49 +568,156 @@ class SimpleTimeBroCalendar:
             self.log(f"⚠️ שגיאה בקבלת שם חברה: {e}", "WARNING")
             return None
     
-    def _event_exists(self, service, title, start_time, end_time):
-        """בדיקה אם אירוע דומה כבר קיים"""
+    @staticmethod
+    def _to_index_time(value):
+        """נרמול זמן לפורמט האינדקס - שעון מקומי ללא timezone, ברמת שניות"""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is not None:
+            value = value.astimezone(CALENDAR_TIMEZONE).replace(tzinfo=None)
+        return value.replace(microsecond=0).isoformat()
+
+    @staticmethod
+    def _to_rfc3339(value):
+        """המרת datetime לפורמט RFC3339 עם timezone עבור Google Calendar API"""
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=CALENDAR_TIMEZONE)
+        return value.isoformat()
+
+    def _event_fingerprint(self, title, start_time, end_time):
+        """טביעת אצבע דטרמיניסטית של אירוע (יומן, כותרת, התחלה, סיום)"""
+        key = '|'.join([
+            self.timebro_calendar_id,
+            title,
+            self._to_index_time(start_time),
+            self._to_index_time(end_time)
+        ])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _index_event(self, title, start_time, end_time, google_event_id):
+        """רישום אירוע שנוצר באינדקס המקומי"""
         try:
-            # חיפוש אירועים עם אותה כותרת באותו יום
-            start_of_day = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = start_time.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            events_result = service.events().list(
-                calendarId=self.timebro_calendar_id,
-                timeMin=start_of_day.isoformat() + '+03:00',
-                timeMax=end_of_day.isoformat() + '+03:00',
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            conn = get_connection(self.db_calendar)
+            conn.execute("""
+                INSERT OR REPLACE INTO calendar_event_index
+                (fingerprint, calendar_id, title, start_datetime, end_datetime, google_event_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, (
+                self._event_fingerprint(title, start_time, end_time),
+                self.timebro_calendar_id,
+                title,
+                self._to_index_time(start_time),
+                self._to_index_time(end_time),
+                google_event_id
+            ))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.log(f"⚠️ שגיאה בעדכון אינדקס אירועים: {e}", "WARNING")
+
+    def reconcile_event_index(self, service, start_date, end_date, force=False):
+        """
+        יישור האינדקס המקומי מול Google Calendar בקריאת events.list אחת לטווח
+        
+        טווח שיושר בדקות האחרונות (EVENT_INDEX_RECONCILE_SECONDS) לא נקרא שוב.
+        """
+        range_start = self._to_index_time(start_date)
+        range_end = self._to_index_time(end_date)
+        
+        with self._event_index_lock:
+            now = time.monotonic()
+            self._reconciled_ranges = [
+                r for r in self._reconciled_ranges
+                if now - r[2] < EVENT_INDEX_RECONCILE_SECONDS
+            ]
+            if not force and any(r[0] <= range_start and range_end <= r[1] for r in self._reconciled_ranges):
+                return True
             
-            events = events_result.get('items', [])
-            for event in events:
-                if event.get('summary') == title:
-                    # בדיקה אם הזמנים חופפים - המרה ל-timezone aware
-                    event_start_str = event['start']['dateTime']
-                    event_end_str = event['end']['dateTime']
+            try:
+                rows = []
+                page_token = None
+                while True:
+                    events_result = service.events().list(
+                        calendarId=self.timebro_calendar_id,
+                        timeMin=self._to_rfc3339(start_date),
+                        timeMax=self._to_rfc3339(end_date),
+                        singleEvents=True,
+                        maxResults=2500,
+                        pageToken=page_token
+                    ).execute()
                     
-                    # המרה ל-datetime objects עם timezone
-                    if event_start_str.endswith('Z'):
-                        event_start = datetime.fromisoformat(event_start_str.replace('Z', '+00:00'))
-                    else:
-                        event_start = datetime.fromisoformat(event_start_str)
+                    for event in events_result.get('items', []):
+                        event_start = event.get('start', {}).get('dateTime')
+                        event_end = event.get('end', {}).get('dateTime')
+                        title = event.get('summary')
+                        # אירועי יום שלם אינם נוצרים ע"י המערכת
+                        if not event_start or not event_end or not title:
+                            continue
+                        rows.append((
+                            self._event_fingerprint(title, event_start, event_end),
+                            self.timebro_calendar_id,
+                            title,
+                            self._to_index_time(event_start),
+                            self._to_index_time(event_end),
+                            event.get('id')
+                        ))
                     
-                    if event_end_str.endswith('Z'):
-                        event_end = datetime.fromisoformat(event_end_str.replace('Z', '+00:00'))
-                    else:
-                        event_end = datetime.fromisoformat(event_end_str)
-                    
-                    # המרת הזמנים המקומיים ל-timezone aware
-                    from datetime import timezone
-                    start_time_aware = start_time.replace(tzinfo=timezone.utc)
-                    end_time_aware = end_time.replace(tzinfo=timezone.utc)
-                    
-                    # אם יש חפיפה בזמנים
-                    if (start_time_aware < event_end and end_time_aware > event_start):
-                        return True
+                    page_token = events_result.get('nextPageToken')
+                    if not page_token:
+                        break
+                
+                conn = get_connection(self.db_calendar)
+                with conn:
+                    # הטווח מוחלף כולו - אירועים שנמחקו ב-Google יוצאים מהאינדקס
+                    conn.execute("""
+                        DELETE FROM calendar_event_index
+                        WHERE calendar_id = ? AND start_datetime < ? AND end_datetime > ?
+                    """, (self.timebro_calendar_id, range_end, range_start))
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO calendar_event_index
+                        (fingerprint, calendar_id, title, start_datetime, end_datetime, google_event_id, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    """, rows)
+                conn.close()
+                
+                self._reconciled_ranges.append((range_start, range_end, now))
+                self.log(f"🔄 אינדקס אירועים יושר מול Google: {len(rows)} אירועים בטווח")
+                return True
+                
+            except Exception as e:
+                self.log(f"❌ שגיאה ביישור אינדקס אירועים: {e}", "ERROR")
+                return False
+
+    def _event_exists(self, service, title, start_time, end_time):
+        """בדיקה אם אירוע דומה כבר קיים - חיפוש באינדקס המקומי בלבד"""
+        try:
+            conn = get_connection(self.db_calendar)
+            cursor = conn.cursor()
             
-            return False
+            # התאמה מדויקת לפי טביעת אצבע
+            cursor.execute(
+                "SELECT 1 FROM calendar_event_index WHERE fingerprint = ?",
+                (self._event_fingerprint(title, start_time, end_time),)
+            )
+            exists = cursor.fetchone() is not None
+            
+            if not exists:
+                # אירוע עם אותה כותרת שחופף בזמנים
+                cursor.execute("""
+                    SELECT 1 FROM calendar_event_index
+                    WHERE calendar_id = ? AND title = ?
+                    AND start_datetime < ? AND end_datetime > ?
+                    LIMIT 1
+                """, (
+                    self.timebro_calendar_id,
+                    title,
+                    self._to_index_time(end_time),
+                    self._to_index_time(start_time)
+                ))
+                exists = cursor.fetchone() is not None
+            
+            conn.close()
+            return exists
             
         except Exception as e:
             self.log(f"❌ שגיאה בבדיקת קיום אירוע: {e}", "ERROR")
@@ -497,7 +726,7 @@ class SimpleTimeBroCalendar:
     def debug_contact_matching(self, start_date, end_date):
         """בדיקת אנשי קשר זמינים לדיבוג"""
         try:
-            conn = sqlite3.connect(self.db_main)
+            conn = get_connection(self.db_main)
             cursor = conn.cursor()
             
             # קבלת כל השמות הייחודיים
@@ -537,7 +766,7 @@ class SimpleTimeBroCalendar:
         """סינכרון יומן עבור איש קשר ספציפי"""
         try:
             # קבלת whatsapp_id עבור contact_id
-            conn = sqlite3.connect('whatsapp_contacts_groups.db')
+            conn = get_connection(self.db_contacts)
             cursor = conn.cursor()
             cursor.execute('SELECT whatsapp_id FROM contacts WHERE contact_id = ?', (contact_id,))
             result = cursor.fetchone()
@@ -551,7 +780,7 @@ class SimpleTimeBroCalendar:
             self.log(f"📱 משתמש ב-whatsapp_id: {whatsapp_id}")
             
             # קבלת הודעות עבור איש הקשר
-            conn = sqlite3.connect(self.db_main)
+            conn = get_connection(self.db_main)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -570,13 +799,16 @@ class SimpleTimeBroCalendar:
             # קיבוץ הודעות לאירועים
             events = self._group_messages_into_events(messages)
             
-            # יצירת אירועי יומן
-            events_created = 0
-            for event in events:
-                if self._create_calendar_event(event):
-                    events_created += 1
+            service = self.authenticate_google_calendar()
+            if not service:
+                return 0
+            
+            # קריאת events.list אחת לטווח במקום בדיקה מול Google לכל אירוע
+            self.reconcile_event_index(service, start_date, end_date)
             
-            return events_created
+            # יצירת אירועי יומן בבקשות batch
+            conversations = [self._build_conversation(event) for event in events if event]
+            return self.create_calendar_events_batch(conversations, service)
             
         except Exception as e:
             self.log(f"❌ שגיאה בסינכרון איש קשר: {e}", "ERROR")
@@ -587,76 +819,53 @@ class SimpleTimeBroCalendar:
         if not messages:
             return []
         
-        events = []
-        current_event = []
-        last_timestamp = None
+        # timestamp הוא במילישניות
+        sessions = iter_conversation_sessions(
+            messages,
+            timestamp_of=lambda message: message[6] / 1000,
+            gap_minutes=self.message_grouping_minutes
+        )
+        return [session.messages for session in sessions]
+    
+    def _build_conversation(self, event_messages):
+        """בניית (contact_name, conversation) מקבוצת הודעות גולמיות"""
+        # קבלת פרטי האירוע
+        first_message = event_messages[0]
+        last_message = event_messages[-1]
         
-        for message in messages:
-            # המרת timestamp
-            timestamp = datetime.fromtimestamp(message[6] / 1000)  # timestamp הוא במילישניות
-            
-            if last_timestamp is None:
-                # הודעה ראשונה
-                current_event = [message]
-                last_timestamp = timestamp
-            else:
-                # בדיקה אם ההודעה קרובה להודעה הקודמת (בתוך שעה אחת)
-                time_diff = timestamp - last_timestamp
-                if time_diff.total_seconds() <= self.message_grouping_minutes * 60:
-                    # הודעה באותו אירוע
-                    current_event.append(message)
-                else:
-                    # הודעה חדשה - שמירת האירוע הקודם
-                    if current_event:
-                        events.append(current_event)
-                    current_event = [message]
-                
-                last_timestamp = timestamp
+        # זמני התחלה וסיום
+        start_time = datetime.fromtimestamp(first_message[6] / 1000)
+        end_time = datetime.fromtimestamp(last_message[6] / 1000)
+
+        # מינימום 5 דקות לאירוע
+        if (end_time - start_time).total_seconds() < 300:  # 5 minutes
+            end_time = start_time + timedelta(minutes=5)
         
-        # הוספת האירוע האחרון
-        if current_event:
-            events.append(current_event)
+        contact_name = first_message[3] or "איש קשר לא ידוע"
         
-        return events
-    
+        # הכנת conversation object
+        conversation = {
+            'start_time': start_time,
+            'end_time': end_time,
+            'content': self._format_messages_for_calendar(event_messages),
+            'messages': self._convert_messages_to_dict(event_messages)  # המרת הודעות
+        }
+        
+        return contact_name, conversation
+
     def _create_calendar_event(self, event_messages):
         """יצירת אירוע יומן מקבוצת הודעות"""
         try:
             if not event_messages:
                 return False
             
-            # קבלת פרטי האירוע
-            first_message = event_messages[0]
-            last_message = event_messages[-1]
-            
-            # זמני התחלה וסיום
-            start_time = datetime.fromtimestamp(first_message[6] / 1000)
-            end_time = datetime.fromtimestamp(last_message[6] / 1000)
-
-            # מינימום 5 דקות לאירוע
-            if (end_time - start_time).total_seconds() < 300:  # 5 minutes
-                end_time = start_time + timedelta(minutes=5)
-            
-            # שם האירוע - רק השם עם אימוג'י צ'ט
-            contact_name = first_message[3] or "איש קשר לא ידוע"
-            event_title = f"💬 {contact_name}"
-            
-            # תוכן האירוע - הודעות עם RTL
-            event_description = self._format_messages_for_calendar(event_messages)
+            contact_name, conversation = self._build_conversation(event_messages)
             
             # יצירת האירוע
             service = self.authenticate_google_calendar()
             if not service:
                 return False
             
-            # הכנת conversation object
-            conversation = {
-                'start_time': start_time,
-                'end_time': end_time,
-                'content': event_description,
-                'messages': self._convert_messages_to_dict(event_messages)  # המרת הודעות
-            }
-            
             return self.create_calendar_event(
                 contact_name=contact_name,
                 conversation=conversation,
@@ -745,25 +954,33 @@ class SimpleTimeBroCalendar:
         if not service:
             return False
         
-        # קבלת הודעות
-        messages = self.get_messages_for_date_range(start_date, end_date)
-        if not messages:
-            self.log("❌ לא נמצאו הודעות לעיבוד", "ERROR")
-            return False
-        
-        # קיבוץ הודעות
-        grouped = self.group_messages_by_contact_and_time(messages)
+        # יישור אינדקס האירועים המקומי מול Google בקריאה אחת לטווח
+        self.reconcile_event_index(service, start_date, end_date)
         
-        # יצירת אירועים - מספר אירועים לכל איש קשר לפי מקבצי זמן
+        # קבלת הודעות וקיבוץ - השורות נקראות בהדרגה מה-cursor, וכל מקבץ שהסתיים
+        # נשלח ליצירה בבקשות batch, כך שהזיכרון לא גדל עם אורך התקופה
         total_events = 0
         successful_events = 0
+        pending = []
+        try:
+            messages = self.iter_messages_for_date_range(start_date, end_date)
+            for conversation in self.iter_conversations(messages):
+                pending.append((conversation['contact_name'], conversation))
+                if len(pending) >= CALENDAR_BATCH_SIZE:
+                    total_events += len(pending)
+                    successful_events += self.create_calendar_events_batch(pending, service)
+                    pending = []
+        except Exception as e:
+            self.log(f"❌ שגיאה בקבלת הודעות: {e}", "ERROR")
+            return False
+        
+        if pending:
+            total_events += len(pending)
+            successful_events += self.create_calendar_events_batch(pending, service)
         
-        for unique_key, conversation in grouped.items():
-            # יצירת אירוע לכל מקבץ
-            contact_name = conversation['contact_name']
-            total_events += 1
-            if self.create_calendar_event(contact_name, conversation, service):
-                successful_events += 1
+        if not total_events:
+            self.log("❌ לא נמצאו הודעות לעיבוד", "ERROR")
+            return False
         
         # סיכום
         self.log(f"✅ הושלם: {successful_events}/{total_events} אירועים נוצרו", "SUCCESS")
@@ -778,7 +995,7 @@ def main():
     
     # בדיקת הטווח הזמין במסד הנתונים
     try:
-        conn = sqlite3.connect(calendar_system.db_main)
+        conn = get_connection(calendar_system.db_main)
         cursor = conn.cursor()
         cursor.execute("SELECT MIN(timestamp), MAX(timestamp) FROM messages WHERE timestamp > 0")
         min_ts, max_ts = cursor.fetchone()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ערוץ אירועי הסינכרון (publish/subscribe בתוך התהליך) - מזין את /api/sync/events (SSE)
+
+SyncManager מפרסם:
+    sync - שינוי במצב סינכרון אסינכרוני (running / completed / error, והתקדמות)
+    item - סטטוס סינכרון חדש של איש קשר/קבוצה (אחרי _update_sync_status)
+
+כל מנוי מקבל תור משלו; אירועים אחרונים נשמרים בהיסטוריה קצרה, כך שלקוח
+שהתחבר מחדש (Last-Event-ID) מקבל את מה שפספס.
+"""
+
+import json
+import queue
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SyncEventBus:
+    """Thread-safe pub/sub לאירועי סינכרון"""
+
+    def __init__(self, history_size: int = 200, subscriber_queue_size: int = 1000):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._history = deque(maxlen=history_size)
+        self._subscribers: List[queue.Queue] = []
+        self._subscriber_queue_size = subscriber_queue_size
+
+    def publish(self, event_type: str, data: Dict) -> int:
+        """פרסום אירוע לכל המנויים; מחזיר את מזהה האירוע"""
+        with self._lock:
+            event = (self._next_id, event_type, dict(data))
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # לקוח תקוע לא עוצר את הסינכרון - הוא יקבל את ההיסטוריה בחיבור מחדש
+                pass
+        return event[0]
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> queue.Queue:
+        """
+        מנוי חדש
+
+        Args:
+            last_event_id: האירוע האחרון שהלקוח קיבל - אירועים מאוחרים יותר מההיסטוריה נשלחים מיד
+        """
+        subscriber = queue.Queue(maxsize=self._subscriber_queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event[0] > last_event_id:
+                        subscriber.put_nowait(event)
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def stream(self, last_event_id: Optional[int] = None, keepalive_seconds: float = 15.0) -> Iterator[str]:
+        """
+        זרם SSE (text/event-stream) - רץ עד שהלקוח מתנתק
+
+        כשאין אירועים נשלחת הערה (keepalive) כדי ש-proxy לא יסגור את החיבור
+        """
+        subscriber = self.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=keepalive_seconds)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def format_sse(event: Tuple[int, str, Dict]) -> str:
+    """אירוע בפורמט SSE"""
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# ערוץ משותף לכל התהליך - ה-SyncManager וה-routes של Flask חולקים אותו
+_sync_event_bus = None
+_sync_event_bus_lock = threading.Lock()
+
+
+def get_sync_event_bus() -> SyncEventBus:
+    """קבלת ערוץ אירועי הסינכרון המשותף"""
+    global _sync_event_bus
+    with _sync_event_bus_lock:
+        if _sync_event_bus is None:
+            _sync_event_bus = SyncEventBus()
+        return _sync_event_bus
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+תור עבודות סינכרון שנשמר ב-SQLite (טבלת sync_jobs ב-timebro_calendar.db)
+
+- מספר קבוע של workers - לחיצות חוזרות על "סנכרן" לא פותחות עוד threads מול Green API
+- בקשה זהה לעבודה שעדיין בתור/רצה מחזירה את אותו sync_id
+- עבודה לא נלקחת כשעבודה אחרת על אותו פריט כבר רצה (נעילה לפי פריט)
+- עדיפויות: סינכרון פריט בודד (מהכפתור בשורה) לפני "סנכרן הכל"
+- התקדמות ו-checkpoint נשמרים במסד; עבודה שנקטעה בהפעלה מחדש חוזרת לתור וממשיכה
+
+השימוש (SyncManager):
+    queue = SyncJobQueue(run_job, calendar_db, workers=2, log=log)
+    queue.start()
+    sync_id, created = queue.enqueue("contact", "123", "2025-01-01", "2025-01-31")
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from db_connections import get_connection
+from db_migrations import CALENDAR_DB, CALENDAR_SCHEMA, migrate_database
+
+# עדיפות ברירת מחדל לפי סוג - פריט בודד קצר ומחכים לו מהמסך
+JOB_PRIORITIES = {
+    "contact": 10,
+    "group": 10,
+    "all": 0,
+}
+
+# עבודה שנקטעה יותר מזה (קריסה חוזרת באותו פריט) מסומנת כשגיאה במקום לחזור לתור
+MAX_JOB_ATTEMPTS = 3
+
+# מזהי התורים שה-workers שלהם פעילים בתהליך הזה (owner_token של העבודות שהם מריצים)
+_live_queue_tokens = set()
+_live_queue_tokens_lock = threading.Lock()
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """האם התהליך שהריץ את העבודה עדיין חי"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _json_or_none(value) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+
+class SyncJobQueue:
+    """תור עבודות סינכרון עם pool קבוע של workers"""
+
+    def __init__(self, run_job: Callable[[Dict], Dict], db_path: str = CALENDAR_DB,
+                 workers: int = 2, log=print, poll_interval: float = 5.0):
+        """
+        Args:
+            run_job: מריץ עבודה (dict עם sync_id, sync_type, item_id, תאריכים ו-checkpoint) ומחזיר תוצאה
+            workers: מספר העבודות שרצות במקביל
+            poll_interval: כל כמה שניות worker פנוי בודק את התור גם בלי התראה (עבודות מתהליך אחר)
+        """
+        self.run_job = run_job
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.log = log
+        self.poll_interval = poll_interval
+
+        self._wakeup = threading.Condition()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # מזהה המופע - נשמר ב-owner_token של כל עבודה שהתור הזה לוקח
+        self.token = uuid.uuid4().hex
+
+        migrate_database(self.db_path, self.log, schema=CALENDAR_SCHEMA)
+
+    # --- הוספה ושליפה ---
+
+    def enqueue(self, sync_type: str, item_id: str, start_date: str, end_date: str,
+                priority: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        הוספת עבודה לתור
+
+        Returns:
+            (sync_id, created) - created=False כשעבודה זהה כבר בתור או רצה
+        """
+        item_id = str(item_id)
+        if priority is None:
+            priority = JOB_PRIORITIES.get(sync_type, 0)
+        sync_id = f"{sync_type}_{item_id}_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+
+        conn = get_connection(self.db_path)
+        try:
+            conn.execute("""
+                INSERT INTO sync_jobs (sync_id, sync_type, item_id, start_date, end_date, priority)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (sync_id, sync_type, item_id, start_date, end_date, priority))
+            conn.commit()
+            created = True
+        except sqlite3.IntegrityError:
+            # idx_sync_jobs_active - אותה בקשה כבר ממתינה או רצה
+            conn.rollback()
+            row = conn.execute("""
+                SELECT sync_id FROM sync_jobs
+                WHERE sync_type = ? AND item_id = ? AND start_date = ? AND end_date = ?
+                  AND status IN ('queued', 'running')
+            """, (sync_type, item_id, start_date, end_date)).fetchone()
+            if not row:
+                raise
+            sync_id, created = row[0], False
+        finally:
+            conn.close()
+
+        if created:
+            with self._wakeup:
+                self._wakeup.notify()
+        return sync_id, created
+
+    def get_job(self, sync_id: str) -> Optional[Dict]:
+        """מצב העבודה כפי שנשמר במסד"""
+        conn = get_connection(self.db_path, read_only=True)
+        try:
+            row = conn.execute("SELECT * FROM sync_jobs WHERE sync_id = ?", (sync_id,)).fetchone()
+            columns = [column[0] for column in conn.execute("SELECT * FROM sync_jobs LIMIT 0").description]
+        finally:
+            conn.close()
+        if not row:
+            return None
+
+        job = dict(zip(columns, row))
+        for key in ("progress", "checkpoint", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def queue_position(self, sync_id: str) -> Optional[int]:
+        """כמה עבודות ממתינות לפני עבודה שבתור (None אם היא כבר לא בתור)"""
+        conn = get_connection(self.db_path, read_only=True)
+        try:
+            row = conn.execute("""
+                SELECT COUNT(*) FROM sync_jobs AS other, sync_jobs AS job
+                WHERE job.sync_id = ? AND job.status = 'queued' AND other.status = 'queued'
+                  AND (other.priority > job.priority
+                       OR (other.priority = job.priority AND other.created_at < job.created_at))
+            """, (sync_id,)).fetchone()
+            queued = conn.execute("SELECT 1 FROM sync_jobs WHERE sync_id = ? AND status = 'queued'",
+                                  (sync_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if queued else None
+
+    # --- עדכונים מתוך עבודה שרצה ---
+
+    def save_progress(self, sync_id: str, progress: Dict, checkpoint: Optional[Dict] = None):
+        """שמירת התקדמות (ו-checkpoint לחידוש) של עבודה שרצה"""
+        conn = get_connection(self.db_path)
+        try:
+            if checkpoint is None:
+                conn.execute("UPDATE sync_jobs SET progress = ? WHERE sync_id = ?",
+                             (_json_or_none(progress), sync_id))
+            else:
+                conn.execute("UPDATE sync_jobs SET progress = ?, checkpoint = ? WHERE sync_id = ?",
+                             (_json_or_none(progress), _json_or_none(checkpoint), sync_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- workers ---
+
+    def start(self):
+        """החזרת עבודות שנקטעו לתור והפעלת ה-workers"""
+        if self._threads:
+            return
+        self.recover_interrupted_jobs()
+        with _live_queue_tokens_lock:
+            _live_queue_tokens.add(self.token)
+        self._stop_event.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"sync-job-worker-{index + 1}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        self.log(f"⚙️ תור הסינכרון פעיל עם {self.workers} workers")
+
+    def stop(self, timeout: float = 5.0):
+        """עצירת ה-workers (עבודה שרצה מסתיימת קודם)"""
+        self._stop_event.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if not self._threads:
+            # עבודה שעדיין רצה ב-thread שלא הסתיים לא תיחשב כשארית
+            with _live_queue_tokens_lock:
+                _live_queue_tokens.discard(self.token)
+
+    def recover_interrupted_jobs(self) -> int:
+        """
+        עבודות במצב running שהתור שלהן כבר לא קיים חוזרות לתור
+
+        עבודה עם ה-pid שלנו רצה כרגע רק אם owner_token שלה שייך לתור פעיל בתהליך
+        (למשל תור נוסף שנוצר באותו תהליך); אחרת היא שארית מהפעלה קודמת
+        (למשל בקונטיינר שבו ה-pid תמיד זהה)
+        """
+        with _live_queue_tokens_lock:
+            live_tokens = set(_live_queue_tokens)
+
+        conn = get_connection(self.db_path)
+        try:
+            rows = conn.execute("SELECT sync_id, owner_pid, owner_token, attempts FROM sync_jobs "
+                                "WHERE status = 'running'").fetchall()
+            recovered = 0
+            for sync_id, owner_pid, owner_token, attempts in rows:
+                if owner_pid == os.getpid():
+                    if owner_token in live_tokens:
+                        continue
+                elif _process_alive(owner_pid):
+                    continue
+                if attempts >= MAX_JOB_ATTEMPTS:
+                    conn.execute("""
+                        UPDATE sync_jobs SET status = 'error', error = ?, completed_at = CURRENT_TIMESTAMP
+                        WHERE sync_id = ?
+                    """, (f"העבודה נקטעה {attempts} פעמים", sync_id))
+                    self.log(f"❌ עבודת סינכרון {sync_id} נקטעה {attempts} פעמים - לא תחודש", "ERROR")
+                    continue
+                conn.execute("UPDATE sync_jobs SET status = 'queued', owner_pid = NULL, owner_token = NULL "
+                             "WHERE sync_id = ?",
+                             (sync_id,))
+                recovered += 1
+            conn.commit()
+        finally:
+            conn.close()
+
+        if recovered:
+            self.log(f"🔁 {recovered} עבודות סינכרון שנקטעו הוחזרו לתור")
+        return recovered
+
+    def claim_next_job(self) -> Optional[Dict]:
+        """
+        לקיחת העבודה הבאה בתור (עדיפות, ואז סדר הגעה)
+
+        עבודה על פריט שכבר יש לו עבודה רצה מדולגת - אותו צ'אט לא מסונכרן פעמיים במקביל.
+        הבחירה והעדכון בטרנזקציה אחת (BEGIN IMMEDIATE), כך ששני workers לא לוקחים אותה עבודה
+        """
+        conn = get_connection(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT sync_id FROM sync_jobs AS job
+                WHERE status = 'queued'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM sync_jobs AS running
+                      WHERE running.status = 'running'
+                        AND running.sync_type = job.sync_type
+                        AND running.item_id = job.item_id
+                  )
+                ORDER BY priority DESC, created_at, rowid
+                LIMIT 1
+            """).fetchone()
+            if not row:
+                conn.rollback()
+                return None
+            conn.execute("""
+                UPDATE sync_jobs
+                SET status = 'running', owner_pid = ?, owner_token = ?, attempts = attempts + 1,
+                    started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                WHERE sync_id = ?
+            """, (os.getpid(), self.token, row[0]))
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # המסד נעול ע"י תהליך אחר - ננסה שוב בסבב הבא
+            conn.rollback()
+            self.log(f"⚠️ לא ניתן לקחת עבודה מהתור: {e}", "WARNING")
+            return None
+        finally:
+            conn.close()
+        return self.get_job(row[0])
+
+    def finish_job(self, sync_id: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """סיום עבודה - completed עם תוצאה או error"""
+        conn = get_connection(self.db_path)
+        try:
+            conn.execute("""
+                UPDATE sync_jobs
+                SET status = ?, result = ?, error = ?, owner_pid = NULL, owner_token = NULL, completed_at = CURRENT_TIMESTAMP
+                WHERE sync_id = ?
+            """, ("error" if error else "completed", _json_or_none(result), error, sync_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+        # עבודה שחיכתה לפריט הזה יכולה לרוץ עכשיו
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _worker_loop(self):
+        while not self._stop_event.is_set():
+            job = self.claim_next_job()
+            if not job:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            try:
+                result = self.run_job(job)
+                self.finish_job(job["sync_id"], result=result)
+            except Exception as e:
+                self.log(f"❌ עבודת סינכרון {job['sync_id']} נכשלה: {e}", "ERROR")
+                self.finish_job(job["sync_id"], error=str(e))
@@ -4,19 +4,31 @@
 מנהל סינכרון ממוקד של WhatsApp ליומן Google
 """
 
-import sqlite3
 import os
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 from green_api_client import GreenAPIClient
 from simple_timebro_calendar import SimpleTimeBroCalendar
 from credential_manager import GreenAPICredentials
+from rate_limiter import get_green_api_rate_limiter
+from db_connections import get_connection
+from db_migrations import migrate_database
+from messages_store import insert_messages
+from sync_events import get_sync_event_bus
+from sync_jobs import SyncJobQueue
+from concurrent.futures import ThreadPoolExecutor
 import threading
-import time
 
 class SyncManager:
-    def __init__(self):
+    # מספר מזהים מקסימלי בשאילתת IN אחת של get_sync_statuses
+    STATUS_LOOKUP_CHUNK = 500
+    
+    def __init__(self, start_job_queue: bool = True):
+        """
+        Args:
+            start_job_queue: הפעלת ה-workers של תור העבודות (False בהרצה חד-פעמית, למשל מ-cron)
+        """
         self.contacts_db = "whatsapp_contacts_groups.db"
         self.groups_db = "whatsapp_contacts_groups.db"
         self.messages_db = "whatsapp_messages_webjs.db"
@@ -53,11 +65,35 @@ class SyncManager:
         if not self.id_instance or not self.api_token:
             raise ValueError("Green API credentials not found")
         
-        self.green_api_client = GreenAPIClient(self.id_instance, self.api_token)
+        # כל הקריאות ל-Green API עוברות דרך מגביל קצב משותף (token bucket)
+        self.rate_limiter = get_green_api_rate_limiter()
+        self.green_api_client = GreenAPIClient(self.id_instance, self.api_token,
+                                               rate_limiter=self.rate_limiter)
         self.calendar_system = SimpleTimeBroCalendar()
         
-        # סטטוס סינכרון פעיל
+        # מספר סינכרונים מקבילים ב-sync_all_marked
+        self.max_workers = max(1, int(os.getenv("SYNC_MAX_WORKERS", "4")))
+        
+        # סכמה, אינדקסים ומפתח ייחודי להודעות - קבצי migrations/ שרצים פעם אחת לכל מסד
+        migrate_database(self.messages_db, self.log)
+        migrate_database(self.contacts_db, self.log)
+        migrate_database(self.calendar_db, self.log)
+        
+        # סטטוס סינכרון פעיל - כל שינוי מתפרסם גם בערוץ האירועים (/api/sync/events)
         self.active_syncs = {}
+        self._state_lock = threading.Lock()
+        self.events = get_sync_event_bus()
+        
+        # נעילה לכל צ'אט - אותו פריט לא מסונכרן פעמיים במקביל (עבודה בודדת מול "סנכרן הכל")
+        self._item_locks = {}
+        self._item_locks_guard = threading.Lock()
+        
+        # סינכרונים אסינכרוניים עוברים בתור שנשמר במסד, עם מספר קבוע של workers;
+        # עבודות שנקטעו בהפעלה הקודמת חוזרות לתור וממשיכות מה-checkpoint
+        self.jobs = SyncJobQueue(self._run_job, self.calendar_db,
+                                 workers=int(os.getenv("SYNC_JOB_WORKERS", "2")), log=self.log)
+        if start_job_queue:
+            self.jobs.start()
         
     def log(self, message, level="INFO"):
         """לוגים"""
@@ -122,7 +158,7 @@ class SyncManager:
                 }
 
             # בדיקה חכמה: האם כבר יש הודעות במסד הנתונים לטווח הזמן?
-            conn = sqlite3.connect(self.messages_db)
+            conn = get_connection(self.messages_db)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM messages
@@ -160,10 +196,7 @@ class SyncManager:
                 self.log(f"📡 מקבל הודעות מ-Green API עבור {whatsapp_id}...")
                 self.log(f"📅 טווח תאריכים: {start_dt.strftime('%d/%m/%Y')} - {end_dt.strftime('%d/%m/%Y')}")
 
-                # Delay קצר לפני כל קריאה ל-API
-                import time
-                time.sleep(2.0)  # Increased delay for better rate limiting
-
+                # קצב הקריאות נשלט ע"י מגביל הקצב של ה-client
                 messages = self.green_api_client.get_chat_history_by_date_range(whatsapp_id, start_dt, end_dt)
 
                 if isinstance(messages, dict) and "error" in messages:
@@ -241,18 +274,14 @@ class SyncManager:
             # בדיקת חיבור ל-Green API
             self.log("🔍 בודק חיבור ל-Green API...")
             
-            # Delay קצר לפני כל קריאה ל-API
-            import time
-            time.sleep(0.5)
-            
-            state = self.green_api_client.get_state_instance()
+            success, state = self.green_api_client.get_state_instance()
             self.log(f"📡 מצב Green API: {state}")
             
-            if state.get('stateInstance') != 'authorized':
-                self.log("❌ Green API לא מורשה", "ERROR")
+            if not success or state.get('stateInstance') != 'authorized':
+                self.log(f"❌ Green API לא מורשה: {state.get('error', 'לא ידוע')}", "ERROR")
                 return {
                     "success": False,
-                    "error": "Green API לא מורשה",
+                    "error": f"Green API לא מורשה: {state.get('error', 'לא ידוע')}",
                     "messages_found": 0,
                     "events_created": 0
                 }
@@ -309,8 +338,15 @@ class SyncManager:
                 "events_created": 0
             }
 
-    def sync_all_marked(self, start_date: str, end_date: str) -> Dict:
-        """סינכרון כל המסומנים ליומן"""
+    def sync_all_marked(self, start_date: str, end_date: str, sync_id: Optional[str] = None,
+                        checkpoint: Optional[Dict] = None) -> Dict:
+        """
+        סינכרון כל המסומנים ליומן
+        
+        Args:
+            sync_id: לדיווח התקדמות של סינכרון אסינכרוני
+            checkpoint: ההתקדמות שנשמרה בהרצה שנקטעה (completed_items וסיכומים)
+        """
         try:
             self.log("🔄 מתחיל סינכרון כל המסומנים ליומן")
             
@@ -333,41 +369,50 @@ class SyncManager:
                 "total_events": 0
             }
             
-            # סינכרון אנשי קשר
-            for i, contact_id in enumerate(marked_contacts):
-                self.log(f"👤 מסנכרן איש קשר: {contact_id} ({i+1}/{len(marked_contacts)})")
-                contact_result = self.sync_contact_messages(contact_id, start_date, end_date)
-                results["contacts_results"].append(contact_result)
-                if contact_result["success"]:
-                    results["total_messages"] += contact_result["messages_saved"]
-                    results["total_events"] += contact_result["events_created"]
-                    self.log(f"✅ איש קשר {contact_id} סונכרן בהצלחה: {contact_result['messages_saved']} הודעות, {contact_result['events_created']} אירועים")
-                else:
-                    self.log(f"❌ שגיאה בסינכרון איש קשר {contact_id}: {contact_result.get('error', 'לא ידוע')}")
-                
-                # Delay בין סינכרונים של אנשי קשר שונים (חוץ מהאחרון)
-                if i < len(marked_contacts) - 1:
-                    import time
-                    self.log(f"⏳ ממתין 2 שניות לפני הסינכרון הבא... ({len(marked_contacts) - i - 1} נותרו)")
-                    time.sleep(2.0)  # 2 שניות delay בין אנשי קשר
-            
-            # סינכרון קבוצות
-            for i, group_id in enumerate(marked_groups):
-                self.log(f"👥 מסנכרן קבוצה: {group_id} ({i+1}/{len(marked_groups)})")
-                group_result = self.sync_group_messages(group_id, start_date, end_date)
-                results["groups_results"].append(group_result)
-                if group_result["success"]:
-                    results["total_messages"] += group_result["messages_saved"]
-                    results["total_events"] += group_result["events_created"]
-                    self.log(f"✅ קבוצה {group_id} סונכרנה בהצלחה: {group_result['messages_saved']} הודעות, {group_result['events_created']} אירועים")
-                else:
-                    self.log(f"❌ שגיאה בסינכרון קבוצה {group_id}: {group_result.get('error', 'לא ידוע')}")
+            # המשך מ-checkpoint של הרצה שנקטעה - פריטים שכבר סונכרנו מדולגים
+            checkpoint = dict(checkpoint or {})
+            completed_items = set(checkpoint.get("completed_items", []))
+            results["total_messages"] = checkpoint.get("total_messages", 0)
+            results["total_events"] = checkpoint.get("total_events", 0)
+            
+            items = [("contact", contact_id) for contact_id in marked_contacts] + \
+                    [("group", group_id) for group_id in marked_groups]
+            pending = [(item_type, item_id) for item_type, item_id in items
+                       if f"{item_type}:{item_id}" not in completed_items]
+            total_items = len(items)
+            done = total_items - len(pending)
+            if done:
+                self.log(f"⏩ ממשיך מ-checkpoint: {done} פריטים כבר סונכרנו")
+            
+            # סינכרון מקבילי - ה-workers חולקים את מגביל הקצב של Green API,
+            # כך שזמן הריצה תלוי במכסת ה-API ולא במספר הפריטים
+            self.log(f"⚙️ מסנכרן עם {self.max_workers} workers מקבילים")
+            self._report_progress(sync_id, done=done, total=total_items)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._sync_item, item_type, item_id, start_date, end_date)
+                    for item_type, item_id in pending
+                ]
                 
-                # Delay בין סינכרונים של קבוצות שונות (חוץ מהאחרונה)
-                if i < len(marked_groups) - 1:
-                    import time
-                    self.log(f"⏳ ממתין 2 שניות לפני הסינכרון הבא... ({len(marked_groups) - i - 1} נותרו)")
-                    time.sleep(2.0)  # 2 שניות delay בין קבוצות
+                # איסוף תוצאות (לפי סדר ההגשה - אנשי קשר ואז קבוצות)
+                for (item_type, item_id), future in zip(pending, futures):
+                    item_result = future.result()
+                    done += 1
+                    label = "איש קשר" if item_type == "contact" else "קבוצה"
+                    results["contacts_results" if item_type == "contact" else "groups_results"].append(item_result)
+                    if item_result["success"]:
+                        results["total_messages"] += item_result["messages_saved"]
+                        results["total_events"] += item_result["events_created"]
+                        self.log(f"✅ {label} {item_id} סונכרן בהצלחה ({done}/{total_items}): {item_result['messages_saved']} הודעות, {item_result['events_created']} אירועים")
+                    else:
+                        self.log(f"❌ שגיאה בסינכרון {label} {item_id}: {item_result.get('error', 'לא ידוע')}")
+                    
+                    completed_items.add(f"{item_type}:{item_id}")
+                    self._report_progress(sync_id, checkpoint={
+                        "completed_items": sorted(completed_items),
+                        "total_messages": results["total_messages"],
+                        "total_events": results["total_events"]
+                    }, done=done, total=total_items, current_item=item_id)
             
             self.log(f"✅ סינכרון כללי הושלם: {results['total_messages']} הודעות, {results['total_events']} אירועים", "SUCCESS")
             return results
@@ -381,52 +426,51 @@ class SyncManager:
                 "total_events": 0
             }
 
+    def _item_lock(self, item_type: str, item_id: str) -> threading.Lock:
+        """הנעילה של פריט (נוצרת בפעם הראשונה)"""
+        with self._item_locks_guard:
+            return self._item_locks.setdefault((item_type, str(item_id)), threading.Lock())
+
+    def _sync_item(self, item_type: str, item_id: str, start_date: str, end_date: str) -> Dict:
+        """סינכרון איש קשר/קבוצה תחת נעילת הפריט"""
+        with self._item_lock(item_type, item_id):
+            if item_type == "contact":
+                return self.sync_contact_messages(item_id, start_date, end_date)
+            return self.sync_group_messages(item_id, start_date, end_date)
+
     def _save_messages_to_db(self, messages: List[Dict], chat_id: str) -> int:
-        """שמירת הודעות למסד הנתונים"""
+        """שמירת הודעות למסד הנתונים - הכנסה מרוכזת בטרנזקציה אחת"""
         try:
-            conn = sqlite3.connect(self.messages_db)
-            cursor = conn.cursor()
+            # שם איש הקשר זהה לכל הודעות הצ'אט - שליפה אחת בלבד
+            contact_name = self._get_contact_name(chat_id)
+            created_at = datetime.now().isoformat()
             
-            saved_count = 0
+            rows = []
             for message in messages:
                 try:
-                    # בדיקה אם ההודעה כבר קיימת
-                    message_id = message.get('id') or message.get('messageId')
-                    cursor.execute("""
-                        SELECT id FROM messages 
-                        WHERE id = ? AND chat_id = ?
-                    """, (message_id, chat_id))
-                    
-                    if cursor.fetchone():
-                        continue  # הודעה כבר קיימת
-                    
-                    # קבלת שם איש הקשר מ-contacts.db
-                    contact_name = self._get_contact_name(chat_id)
-                    
-                    # שמירת הודעה חדשה
-                    cursor.execute("""
-                        INSERT INTO messages 
-                        (id, chat_id, contact_number, contact_name, message_body, 
-                         message_type, timestamp, is_from_me, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
+                    message_id = message.get('id') or message.get('idMessage') or message.get('messageId')
+                    rows.append((
                         message_id,
                         chat_id,
                         chat_id,  # contact_number
-                        contact_name,  # contact_name
+                        contact_name,
                         message.get('textMessage') or message.get('body') or message.get('text') or message.get('message'),
                         message.get('typeMessage') or message.get('type') or 'text',
                         int((message.get('timestamp') or message.get('time') or 0) * 1000),
                         message.get('type') == 'outgoing',  # fromMe
-                        datetime.now().isoformat()
+                        created_at
                     ))
-                    saved_count += 1
-                    
                 except Exception as e:
-                    self.log(f"⚠️ שגיאה בשמירת הודעה: {e}", "WARNING")
+                    self.log(f"⚠️ שגיאה בהכנת הודעה לשמירה: {e}", "WARNING")
                     continue
             
-            conn.commit()
+            if not rows:
+                return 0
+            
+            conn = get_connection(self.messages_db)
+            
+            # הודעות קיימות מדולגות ע"י המפתח הייחודי (id, chat_id)
+            saved_count = insert_messages(conn, rows)
             conn.close()
             
             return saved_count
@@ -438,7 +482,7 @@ class SyncManager:
     def _get_whatsapp_id_for_contact(self, contact_id: str) -> str:
         """קבלת whatsapp_id לפי contact_id"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -462,7 +506,7 @@ class SyncManager:
     def _get_contact_name(self, chat_id):
         """קבלת שם איש הקשר מ-contacts.db"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
             # חיפוש לפי מספר טלפון
@@ -505,7 +549,7 @@ class SyncManager:
             self.log(f"📱 משתמש ב-whatsapp_id: {whatsapp_id}")
 
             # בדיקה אם יש הודעות במסד הנתונים (משתמש ב-whatsapp_id!)
-            conn = sqlite3.connect(self.messages_db)
+            conn = get_connection(self.messages_db)
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -539,7 +583,7 @@ class SyncManager:
         """סימון איש קשר/קבוצה לכלול ביומן"""
         try:
             if is_contact:
-                conn = sqlite3.connect(self.contacts_db)
+                conn = get_connection(self.contacts_db)
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE contacts 
@@ -547,7 +591,7 @@ class SyncManager:
                     WHERE whatsapp_id = ?
                 """, (item_id,))
             else:
-                conn = sqlite3.connect(self.groups_db)
+                conn = get_connection(self.groups_db)
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE groups 
@@ -564,39 +608,38 @@ class SyncManager:
     def _update_sync_status(self, item_id: str, item_type: str, success: bool, messages_count: int = 0, events_count: int = 0):
         """עדכון סטטוס סינכרון"""
         try:
-            # יצירת טבלת סטטוס סינכרון אם לא קיימת
-            conn = sqlite3.connect(self.calendar_db)
+            conn = get_connection(self.calendar_db)
             cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sync_status (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item_id TEXT NOT NULL,
-                    item_type TEXT NOT NULL,
-                    last_sync DATETIME,
-                    success BOOLEAN,
-                    messages_count INTEGER,
-                    events_count INTEGER,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
             
-            # עדכון/הוספת סטטוס
+            # שורה אחת לכל פריט - המפתח הייחודי (item_id, item_type) מה-migration
+            # גורם ל-INSERT OR REPLACE להחליף את הסטטוס הקודם במקום להוסיף שורה
+            # (last_sync באותו פורמט כמו CURRENT_TIMESTAMP)
+            last_sync = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
             cursor.execute("""
                 INSERT OR REPLACE INTO sync_status 
                 (item_id, item_type, last_sync, success, messages_count, events_count, created_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (item_id, item_type, success, messages_count, events_count))
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, (str(item_id), item_type, last_sync, success, messages_count, events_count))
             
             conn.commit()
             conn.close()
             
+            self.events.publish("item", {
+                "item_id": str(item_id),
+                "item_type": item_type,
+                "last_sync": last_sync,
+                "success": bool(success),
+                "messages_count": messages_count or 0,
+                "events_count": events_count or 0
+            })
+            
         except Exception as e:
             self.log(f"⚠️ שגיאה בעדכון סטטוס סינכרון: {e}", "WARNING")
 
     def _get_marked_contacts(self) -> List[str]:
         """קבלת רשימת אנשי קשר מסומנים ליומן"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT contact_id FROM contacts 
@@ -612,7 +655,7 @@ class SyncManager:
     def _get_marked_groups(self) -> List[str]:
         """קבלת רשימת קבוצות מסומנות ליומן"""
         try:
-            conn = sqlite3.connect(self.groups_db)
+            conn = get_connection(self.groups_db)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT group_id FROM groups 
@@ -628,7 +671,7 @@ class SyncManager:
     def get_sync_status(self, item_id: str) -> Dict:
         """קבלת סטטוס סינכרון של פריט"""
         try:
-            conn = sqlite3.connect(self.calendar_db)
+            conn = get_connection(self.calendar_db)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT last_sync, success, messages_count, events_count
@@ -665,50 +708,152 @@ class SyncManager:
                 "events_count": 0
             }
 
-    def start_async_sync(self, sync_type: str, item_id: str, start_date: str, end_date: str) -> str:
-        """התחלת סינכרון אסינכרוני"""
-        sync_id = f"{sync_type}_{item_id}_{int(time.time())}"
+    def get_sync_statuses(self, item_ids: List[str], item_type: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        סטטוס סינכרון של הרבה פריטים בשאילתה אחת (במקום get_sync_status לכל שורה בטבלה)
         
-        def sync_worker():
-            try:
-                if sync_type == "contact":
-                    result = self.sync_contact_messages(item_id, start_date, end_date)
-                elif sync_type == "group":
-                    result = self.sync_group_messages(item_id, start_date, end_date)
-                elif sync_type == "all":
-                    result = self.sync_all_marked(start_date, end_date)
-                else:
-                    result = {"success": False, "error": "סוג סינכרון לא ידוע"}
-                
-                self.active_syncs[sync_id] = {
-                    "status": "completed",
-                    "result": result,
-                    "completed_at": datetime.now().isoformat()
-                }
+        Args:
+            item_ids: מזהי הפריטים
+            item_type: contact / group - כשידוע, החיפוש משתמש במפתח (item_id, item_type) המלא
+        
+        Returns:
+            מילון item_id -> סטטוס; פריט שלא סונכרן מעולם מקבל סטטוס ריק
+        """
+        item_ids = list(dict.fromkeys(str(item_id) for item_id in item_ids))
+        statuses = {item_id: {
+            "last_sync": None,
+            "success": False,
+            "messages_count": 0,
+            "events_count": 0
+        } for item_id in item_ids}
+        
+        try:
+            conn = get_connection(self.calendar_db, read_only=True)
+            cursor = conn.cursor()
+            type_filter = " AND item_type = ?" if item_type else ""
+            
+            # מנות קטנות מהמגבלה של SQLite על מספר הפרמטרים בשאילתה
+            for start in range(0, len(item_ids), self.STATUS_LOOKUP_CHUNK):
+                chunk = item_ids[start:start + self.STATUS_LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT item_id, last_sync, success, messages_count, events_count
+                    FROM sync_status
+                    WHERE item_id IN ({placeholders}){type_filter}
+                    ORDER BY last_sync
+                """, chunk + ([item_type] if item_type else []))
                 
-            except Exception as e:
-                self.active_syncs[sync_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "completed_at": datetime.now().isoformat()
-                }
+                # בלי item_type יכולות להיות שתי שורות (איש קשר וקבוצה) - האחרונה גוברת
+                for row in cursor.fetchall():
+                    statuses[row[0]] = {
+                        "last_sync": row[1],
+                        "success": bool(row[2]),
+                        "messages_count": row[3] or 0,
+                        "events_count": row[4] or 0
+                    }
+            
+            conn.close()
+        except Exception as e:
+            self.log(f"❌ שגיאה בקבלת סטטוס סינכרון: {e}", "ERROR")
+        
+        return statuses
+
+    def start_async_sync(self, sync_type: str, item_id: str, start_date: str, end_date: str,
+                         priority: Optional[int] = None) -> str:
+        """
+        הוספת סינכרון לתור העבודות
+        
+        בקשה זהה לסינכרון שעדיין ממתין או רץ מחזירה את ה-sync_id הקיים
+        """
+        if sync_type not in ("contact", "group", "all"):
+            raise ValueError(f"סוג סינכרון לא ידוע: {sync_type}")
         
-        # התחלת הסינכרון ברקע
-        thread = threading.Thread(target=sync_worker)
-        thread.daemon = True
-        thread.start()
+        sync_id, created = self.jobs.enqueue(sync_type, item_id, start_date, end_date, priority)
+        if not created:
+            self.log(f"ℹ️ סינכרון זהה כבר בתור: {sync_id}")
+            return sync_id
         
-        self.active_syncs[sync_id] = {
-            "status": "running",
-            "started_at": datetime.now().isoformat(),
-            "sync_type": sync_type,
-            "item_id": item_id,
-            "start_date": start_date,
-            "end_date": end_date
-        }
+        # worker יכול לקחת את העבודה לפני שהגענו לכאן - "queued" לא דורס "running"
+        with self._state_lock:
+            if sync_id not in self.active_syncs:
+                self._set_sync_state(sync_id, {
+                    "status": "queued",
+                    "queued_at": datetime.now().isoformat(),
+                    "sync_type": sync_type,
+                    "item_id": item_id,
+                    "start_date": start_date,
+                    "end_date": end_date
+                })
         
         return sync_id
+    
+    def _run_job(self, job: Dict) -> Dict:
+        """הרצת עבודה מהתור (נקרא מ-worker של SyncJobQueue)"""
+        sync_id = job["sync_id"]
+        with self._state_lock:
+            self._set_sync_state(sync_id, {
+                "status": "running",
+                "started_at": datetime.now().isoformat(),
+                "sync_type": job["sync_type"],
+                "item_id": job["item_id"],
+                "start_date": job["start_date"],
+                "end_date": job["end_date"],
+                **(job["progress"] or {})
+            })
+        
+        try:
+            if job["sync_type"] == "all":
+                result = self.sync_all_marked(job["start_date"], job["end_date"], sync_id=sync_id,
+                                              checkpoint=job["checkpoint"])
+            else:
+                result = self._sync_item(job["sync_type"], job["item_id"], job["start_date"], job["end_date"])
+            
+            self._set_sync_state(sync_id, {
+                "status": "completed",
+                "result": result,
+                "completed_at": datetime.now().isoformat()
+            })
+            return result
+            
+        except Exception as e:
+            self._set_sync_state(sync_id, {
+                "status": "error",
+                "error": str(e),
+                "completed_at": datetime.now().isoformat()
+            })
+            raise
+    
+    def _set_sync_state(self, sync_id: str, state: Dict):
+        """עדכון מצב סינכרון אסינכרוני ופרסום אירוע sync"""
+        self.active_syncs[sync_id] = state
+        self.events.publish("sync", {"sync_id": sync_id, **state})
+    
+    def _report_progress(self, sync_id: Optional[str], checkpoint: Optional[Dict] = None, **progress):
+        """
+        עדכון התקדמות (done/total/current_item) של סינכרון שרץ
+        
+        ההתקדמות וה-checkpoint נשמרים גם בתור העבודות, לחידוש אחרי הפעלה מחדש
+        """
+        state = self.active_syncs.get(sync_id) if sync_id else None
+        if not state or state.get("status") != "running":
+            return
+        self._set_sync_state(sync_id, {**state, **progress})
+        if self.jobs:
+            self.jobs.save_progress(sync_id, progress, checkpoint)
 
     def get_sync_progress(self, sync_id: str) -> Dict:
-        """קבלת התקדמות סינכרון"""
-        return self.active_syncs.get(sync_id, {"status": "not_found"})
+        """קבלת התקדמות סינכרון (גם של עבודה מהפעלה קודמת של השרת)"""
+        state = self.active_syncs.get(sync_id)
+        job = self.jobs.get_job(sync_id) if self.jobs and (not state or state["status"] == "queued") else None
+        
+        if state:
+            if job and job["status"] == "queued":
+                state = {**state, "queue_position": self.jobs.queue_position(sync_id)}
+            return state
+        if not job:
+            return {"status": "not_found"}
+        
+        state = {key: job[key] for key in ("status", "sync_type", "item_id", "start_date", "end_date",
+                                           "started_at", "completed_at", "result", "error")
+                 if job[key] is not None}
+        return {**state, **(job["progress"] or {})}
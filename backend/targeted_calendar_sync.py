@@ -9,7 +9,9 @@ import json
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict
+from operator import itemgetter
 from timebro_calendar import TimeBroCalendar
+from conversation_sessions import split_conversation_sessions
 from contacts_list import CONTACTS_CONFIG
 
 class TargetedCalendarSync:
@@ -241,31 +243,8 @@ class TargetedCalendarSync:
         if not messages:
             return []
             
-        sessions = []
-        current_session = []
-        
-        sorted_messages = sorted(messages, key=lambda x: x['timestamp'])
-        
-        for msg in sorted_messages:
-            if not current_session:
-                current_session = [msg]
-            else:
-                last_time = current_session[-1]['datetime']
-                current_time = msg['datetime']
-                time_gap = current_time - last_time
-                
-                # הפסקה של 4 שעות תתחיל מפגש חדש
-                if time_gap > timedelta(hours=4):
-                    if current_session:
-                        sessions.append(current_session)
-                        current_session = [msg]
-                else:
-                    current_session.append(msg)
-                    
-        if current_session:
-            sessions.append(current_session)
-            
-        return sessions
+        # הפסקה של 4 שעות תתחיל מפגש חדש
+        return split_conversation_sessions(messages, itemgetter('timestamp'), gap_minutes=240)
         
     def format_full_conversation(self, messages):
         """יצירת תוכן השיחה המלא"""
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת סינון ההודעות המאושרות ב-SQLite (iter_messages_for_date_range) על חיבור מהמאגר
+"""
+
+import os
+import tempfile
+from datetime import datetime
+from contact_matcher import ApprovedContactMatcher
+from db_connections import get_connection
+from db_migrations import CONTACTS_DB, MESSAGES_DB, migrate_database
+from simple_timebro_calendar import SimpleTimeBroCalendar
+
+def _calendar(tmp_dir):
+    """SimpleTimeBroCalendar בלי Google - רק החלק של שליפת ההודעות"""
+    calendar = SimpleTimeBroCalendar.__new__(SimpleTimeBroCalendar)
+    calendar.db_main = os.path.join(tmp_dir, MESSAGES_DB)
+    calendar.db_contacts = os.path.join(tmp_dir, CONTACTS_DB)
+    calendar.contact_matcher = ApprovedContactMatcher(set())
+    calendar.log = lambda message, level="INFO": None
+    return calendar
+
+def test_marked_chat_filter_survives_repeated_calls():
+    """
+    צ'אט מסומן לפי מזהה (בלי שם מאושר) מוחזר בכל קריאה -
+    contacts_db מנותק בסוף כל קריאה, כך שהחיבור שחוזר למאגר נקי לקריאה הבאה
+    """
+    print("🔧 בודק סינון הודעות לפי צ'אטים מסומנים...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        migrate_database(calendar.db_main, lambda _: None)
+        migrate_database(calendar.db_contacts, lambda _: None)
+
+        conn = get_connection(calendar.db_contacts)
+        conn.execute("INSERT INTO contacts (whatsapp_id, name, type, include_in_timebro) "
+                     "VALUES ('972501234567@c.us', 'לקוח', 'contact', 1)")
+        conn.commit()
+        conn.close()
+
+        timestamp = int(datetime(2025, 1, 15, 10, 0).timestamp() * 1000)
+        conn = get_connection(calendar.db_main)
+        conn.execute("INSERT INTO messages (id, chat_id, contact_number, contact_name, message_body, timestamp, is_from_me) "
+                     "VALUES ('m1', '972501234567@c.us', '972501234567', 'שם אחר', 'שלום', ?, 0)", (timestamp,))
+        conn.execute("INSERT INTO messages (id, chat_id, contact_number, contact_name, message_body, timestamp, is_from_me) "
+                     "VALUES ('m2', '15550000000@c.us', '15550000000', 'זר', 'היי', ?, 0)", (timestamp,))
+        conn.commit()
+        conn.close()
+
+        start, end = datetime(2025, 1, 1), datetime(2025, 1, 31)
+        for _ in range(3):
+            messages = list(calendar.iter_messages_for_date_range(start, end))
+            assert [(m[0], m[2]) for m in messages] == [('שם אחר', 'שלום')]
+
+            conn = get_connection(calendar.db_main)
+            attached = [row[1] for row in conn.execute("PRAGMA database_list")]
+            assert not conn.in_transaction
+            conn.close()
+            assert 'contacts_db' not in attached
+    print("✅ הסינון לפי מזהה פועל בכל קריאה")
+
+if __name__ == "__main__":
+    test_marked_chat_filter_survives_repeated_calls()
+    print("🎉 כל הבדיקות עברו")
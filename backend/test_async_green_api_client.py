@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת הלקוח האסינכרוני של Green API (ללא רשת)
+"""
+
+import asyncio
+import json
+import httpx
+from async_green_api_client import AsyncGreenAPIClient
+
+def test_concurrent_histories_respect_semaphore():
+    """כמה צ'אטים נשלפים במקביל, אבל לא יותר מ-max_concurrency בו זמנית"""
+    print("🔧 בודק שליפה מקבילית...")
+
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        chat_id = json.loads(request.content)["chatId"]
+        return httpx.Response(200, json=[{"idMessage": chat_id}])
+
+    async def run():
+        async with AsyncGreenAPIClient("1101", "token", max_concurrency=3,
+                                       transport=httpx.MockTransport(handler)) as client:
+            return await client.get_chat_histories([f"{n}@c.us" for n in range(10)], count=5)
+
+    results = asyncio.run(run())
+    assert list(results) == [f"{n}@c.us" for n in range(10)]
+    assert all(success for success, _ in results.values())
+    assert results["4@c.us"][1] == [{"idMessage": "4@c.us"}]
+    assert 1 < peak <= 3, peak
+    print(f"✅ 10 צ'אטים, לכל היותר {peak} בקשות במקביל")
+
+def test_retry_and_errors():
+    """429 נשלח שוב, 401 מחזיר שגיאה באותו פורמט של GreenAPIClient"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        if "getStateInstance" in request.url.path and len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if "getContacts" in request.url.path:
+            return httpx.Response(401)
+        return httpx.Response(200, json={"stateInstance": "authorized"})
+
+    async def run():
+        async with AsyncGreenAPIClient("1101", "token", backoff_base=0.001,
+                                       transport=httpx.MockTransport(handler)) as client:
+            return await client.get_state_instance(), await client.get_contacts()
+
+    (ok, state), (contacts_ok, error) = asyncio.run(run())
+    assert ok and state == {"stateInstance": "authorized"}
+    assert not contacts_ok and error["error"].startswith("Unauthorized")
+    assert len(calls) == 3
+    print("✅ retry ושגיאות עובדים")
+
+if __name__ == "__main__":
+    test_concurrent_histories_respect_semaphore()
+    test_retry_and_errors()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת יצירת אירועי יומן ב-batch (create_calendar_events_batch) מול Google Calendar מדומה
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from db_connections import get_connection
+from db_migrations import CALENDAR_DB, CONTACTS_DB, migrate_database
+from simple_timebro_calendar import SimpleTimeBroCalendar
+
+class FakeBatch:
+    """batch מדומה - fail_after: כמה בקשות מצליחות לפני שהשליחה נכשלת"""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, body in self.requests:
+            if self.service.fail_after is not None and len(self.service.created) >= self.service.fail_after:
+                raise ConnectionError("connection reset")
+            self.service.created.append(body)
+            self.callback(request_id, {"id": f"g{len(self.service.created)}"}, None)
+
+class FakeCalendarService:
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.created = []
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        return body
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+def _calendar(tmp_dir):
+    """SimpleTimeBroCalendar בלי Google - רק יצירת האירועים והמסד המקומי"""
+    calendar = SimpleTimeBroCalendar.__new__(SimpleTimeBroCalendar)
+    calendar.db_calendar = os.path.join(tmp_dir, CALENDAR_DB)
+    calendar.db_contacts = os.path.join(tmp_dir, CONTACTS_DB)
+    calendar.timebro_calendar_id = "timebro@group.calendar.google.com"
+    calendar._reconciled_ranges = []
+    calendar._event_index_lock = threading.Lock()
+    calendar.log = lambda message, level="INFO": None
+    migrate_database(calendar.db_contacts, lambda _: None)
+    calendar.init_database()
+    return calendar
+
+def _conversation(start):
+    messages = [{"datetime": start, "content": "שלום", "is_from_me": False, "contact_name": "לקוח"}]
+    return {"start_time": start, "end_time": start + timedelta(minutes=20), "messages": messages}
+
+def _saved_event_ids(calendar):
+    conn = get_connection(calendar.db_calendar)
+    rows = conn.execute("SELECT google_event_id FROM simple_calendar_events ORDER BY id").fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+def test_duplicate_conversation_in_batch_created_once():
+    """אותה שיחה פעמיים באותה קריאה (לפני שהאינדקס המקומי התעדכן) יוצרת אירוע אחד"""
+    print("🔧 בודק כפילויות בתוך batch...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        service = FakeCalendarService()
+        start = datetime(2025, 1, 15, 10, 0)
+        conversations = [("לקוח", _conversation(start)), ("לקוח", _conversation(start)),
+                         ("לקוח", _conversation(start + timedelta(hours=3)))]
+
+        assert calendar.create_calendar_events_batch(conversations, service) == 2
+        assert len(service.created) == 2
+        assert _saved_event_ids(calendar) == ["g1", "g2"]
+
+        # קריאה חוזרת - האירועים כבר באינדקס המקומי
+        assert calendar.create_calendar_events_batch(conversations, service) == 0
+    print("✅ כל שיחה נוצרה פעם אחת")
+
+def test_failed_batch_keeps_created_events():
+    """batch שנכשל באמצע - האירועים שכבר נוצרו נשמרים ולא נוצרים שוב בקריאה הבאה"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        service = FakeCalendarService(fail_after=2)
+        start = datetime(2025, 1, 15, 8, 0)
+        conversations = [("לקוח", _conversation(start + timedelta(hours=3 * i))) for i in range(4)]
+
+        assert calendar.create_calendar_events_batch(conversations, service) == 2
+        assert _saved_event_ids(calendar) == ["g1", "g2"]
+
+        service.fail_after = None
+        assert calendar.create_calendar_events_batch(conversations, service) == 2
+        assert len(service.created) == 4
+        assert _saved_event_ids(calendar) == ["g1", "g2", "g3", "g4"]
+
+if __name__ == "__main__":
+    test_duplicate_conversation_in_batch_created_once()
+    test_failed_batch_keeps_created_events()
+    print("🎉 כל הבדיקות עברו")
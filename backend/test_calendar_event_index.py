@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת האינדקס המקומי של אירועי היומן (calendar_event_index) - יישור מול events.list מדומה,
+טביעות אצבע ובדיקת כפילות (_event_exists) בלי קריאה ל-Google
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from db_migrations import CALENDAR_DB, CALENDAR_SCHEMA, migrate_database
+from simple_timebro_calendar import CALENDAR_TIMEZONE, EVENT_INDEX_RECONCILE_SECONDS, SimpleTimeBroCalendar
+
+class FakeListRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+class FakeEventsService:
+    """events().list מדומה - מחזיר את האירועים בעמודים של page_size עם nextPageToken"""
+
+    def __init__(self, events, page_size=2):
+        self.events_by_id = {event["id"]: event for event in events}
+        self.page_size = page_size
+        self.list_calls = []
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, timeMin, timeMax, singleEvents, maxResults, pageToken=None):
+        self.list_calls.append(pageToken)
+        items = list(self.events_by_id.values())
+        offset = int(pageToken or 0)
+        response = {"items": items[offset:offset + self.page_size]}
+        if offset + self.page_size < len(items):
+            response["nextPageToken"] = str(offset + self.page_size)
+        return FakeListRequest(response)
+
+def _event(event_id, title, start, end):
+    return {"id": event_id, "summary": title,
+            "start": {"dateTime": start}, "end": {"dateTime": end}}
+
+def _calendar(tmp_dir):
+    """SimpleTimeBroCalendar בלי Google - רק האינדקס המקומי"""
+    calendar = SimpleTimeBroCalendar.__new__(SimpleTimeBroCalendar)
+    calendar.db_calendar = os.path.join(tmp_dir, CALENDAR_DB)
+    calendar.timebro_calendar_id = "timebro@group.calendar.google.com"
+    calendar._reconciled_ranges = []
+    calendar._event_index_lock = threading.Lock()
+    calendar.log = lambda message, level="INFO": None
+    migrate_database(calendar.db_calendar, lambda _: None, schema=CALENDAR_SCHEMA)
+    return calendar
+
+RANGE_START = datetime(2025, 1, 15, 0, 0)
+RANGE_END = datetime(2025, 1, 16, 0, 0)
+
+def test_reconcile_replaces_range():
+    """יישור קורא את כל העמודים ומחליף את הטווח - אירוע שנמחק ב-Google יוצא מהאינדקס"""
+    print("🔧 בודק יישור אינדקס מול Google...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        service = FakeEventsService([
+            _event("e1", "לקוח א", "2025-01-15T10:00:00+02:00", "2025-01-15T10:30:00+02:00"),
+            _event("e2", "לקוח ב", "2025-01-15T11:00:00+02:00", "2025-01-15T11:30:00+02:00"),
+            _event("e3", "לקוח ג", "2025-01-15T12:00:00+02:00", "2025-01-15T12:30:00+02:00"),
+        ])
+
+        assert calendar.reconcile_event_index(service, RANGE_START, RANGE_END)
+        assert service.list_calls == [None, "2"]
+        assert calendar._event_exists(service, "לקוח ג", datetime(2025, 1, 15, 12, 0), datetime(2025, 1, 15, 12, 30))
+
+        del service.events_by_id["e3"]
+        assert calendar.reconcile_event_index(service, RANGE_START, RANGE_END, force=True)
+        assert not calendar._event_exists(service, "לקוח ג", datetime(2025, 1, 15, 12, 0), datetime(2025, 1, 15, 12, 30))
+        assert calendar._event_exists(service, "לקוח א", datetime(2025, 1, 15, 10, 0), datetime(2025, 1, 15, 10, 30))
+    print("✅ הטווח הוחלף והאירוע שנמחק הוסר")
+
+def test_reconcile_throttled_per_range():
+    """טווח שיושר לא נקרא שוב עד שעוברות EVENT_INDEX_RECONCILE_SECONDS, אלא עם force=True"""
+    print("🔧 בודק הגבלת תדירות היישור...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        service = FakeEventsService([
+            _event("e1", "לקוח א", "2025-01-15T10:00:00+02:00", "2025-01-15T10:30:00+02:00"),
+        ])
+
+        assert calendar.reconcile_event_index(service, RANGE_START, RANGE_END)
+        assert len(service.list_calls) == 1
+
+        # אותו טווח ותת-טווח שלו - בלי קריאה נוספת
+        assert calendar.reconcile_event_index(service, RANGE_START, RANGE_END)
+        assert calendar.reconcile_event_index(service, datetime(2025, 1, 15, 9, 0), datetime(2025, 1, 15, 18, 0))
+        assert len(service.list_calls) == 1
+
+        # force עוקף את ההגבלה
+        assert calendar.reconcile_event_index(service, RANGE_START, RANGE_END, force=True)
+        assert len(service.list_calls) == 2
+
+        # טווח רחב יותר לא מכוסה
+        assert calendar.reconcile_event_index(service, RANGE_START, datetime(2025, 1, 17, 0, 0))
+        assert len(service.list_calls) == 3
+
+        # אחרי EVENT_INDEX_RECONCILE_SECONDS הטווח נקרא שוב
+        calendar._reconciled_ranges = [
+            (start, end, checked_at - EVENT_INDEX_RECONCILE_SECONDS)
+            for start, end, checked_at in calendar._reconciled_ranges
+        ]
+        assert calendar.reconcile_event_index(service, RANGE_START, RANGE_END)
+        assert len(service.list_calls) == 4
+    print("✅ היישור מוגבל לפי טווח")
+
+def test_event_exists_matches():
+    """התאמה מדויקת לפי טביעת אצבע, או אותה כותרת עם זמנים חופפים"""
+    print("🔧 בודק בדיקת כפילות באינדקס...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        start, end = datetime(2025, 1, 15, 10, 0), datetime(2025, 1, 15, 10, 30)
+        calendar._index_event("לקוח א", start, end, "g1")
+
+        # טביעת אצבע זהה
+        assert calendar._event_exists(None, "לקוח א", start, end)
+
+        # אותה כותרת, זמנים חופפים
+        assert calendar._event_exists(None, "לקוח א", datetime(2025, 1, 15, 10, 15), datetime(2025, 1, 15, 11, 0))
+
+        # כותרת אחרת או זמנים שאינם חופפים
+        assert not calendar._event_exists(None, "לקוח ב", start, end)
+        assert not calendar._event_exists(None, "לקוח א", end, datetime(2025, 1, 15, 11, 0))
+    print("✅ הכפילויות זוהו")
+
+def test_fingerprint_normalizes_timezones():
+    """זמן עם timezone וזמן מקומי ללא timezone של אותו רגע נותנים אותה טביעת אצבע"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar = _calendar(tmp_dir)
+        naive_start, naive_end = datetime(2025, 1, 15, 10, 0), datetime(2025, 1, 15, 10, 30)
+        fingerprint = calendar._event_fingerprint("לקוח א", naive_start, naive_end)
+
+        assert calendar._event_fingerprint(
+            "לקוח א", naive_start.replace(tzinfo=CALENDAR_TIMEZONE), naive_end.replace(tzinfo=CALENDAR_TIMEZONE)
+        ) == fingerprint
+        assert calendar._event_fingerprint(
+            "לקוח א", datetime(2025, 1, 15, 8, 0, tzinfo=timezone.utc), "2025-01-15T08:30:00Z"
+        ) == fingerprint
+        assert calendar._event_fingerprint(
+            "לקוח א", "2025-01-15T10:00:00.250000+02:00", naive_end
+        ) == fingerprint
+        assert calendar._event_fingerprint("לקוח ב", naive_start, naive_end) != fingerprint
+
+        # אירוע שנוצר מקומית נמצא כשמגיע מ-Google עם timezone
+        calendar._index_event("לקוח א", naive_start, naive_end, "g1")
+        assert calendar._event_exists(None, "לקוח א", "2025-01-15T08:00:00Z", "2025-01-15T08:30:00Z")
+
+if __name__ == "__main__":
+    test_reconcile_replaces_range()
+    test_reconcile_throttled_per_range()
+    test_event_exists_matches()
+    test_fingerprint_normalizes_timezones()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מראת היומן המקומית (סנכרון מצטבר עם syncToken)
+"""
+
+import os
+import tempfile
+from calendar_mirror import CalendarMirror
+
+class FakeEventsApi:
+    """מדמה את events().list של Google - מחזיר שינויים לפי syncToken"""
+
+    def __init__(self):
+        self.calls = []
+        self.responses = {}
+
+    def list(self, **params):
+        self.calls.append(params)
+        response = self.responses[params.get('syncToken')]
+        return type('Request', (), {'execute': lambda _self: response})()
+
+class FakeService:
+    def __init__(self):
+        self.api = FakeEventsApi()
+
+    def events(self):
+        return self.api
+
+def _event(event_id, summary, start, end, status='confirmed'):
+    return {
+        'id': event_id,
+        'summary': summary,
+        'status': status,
+        'start': {'dateTime': start},
+        'end': {'dateTime': end}
+    }
+
+def _all_day_event(event_id, day, next_day):
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'status': 'confirmed',
+        'start': {'date': day},
+        'end': {'date': next_day}
+    }
+
+def test_full_then_incremental_sync():
+    """סנכרון ראשון מלא, השני מצטבר ומוחק אירועים שבוטלו"""
+    print("🔧 בודק סנכרון מלא ומצטבר...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'calendar.db')
+        service = FakeService()
+        service.api.responses[None] = {
+            'items': [
+                _event('a', '💬 A', '2025-08-01T10:00:00+03:00', '2025-08-01T10:30:00+03:00'),
+                _event('b', '💬 B', '2025-08-02T10:00:00+03:00', '2025-08-02T10:30:00+03:00'),
+            ],
+            'nextSyncToken': 'token-1'
+        }
+        service.api.responses['token-1'] = {
+            'items': [
+                _event('a', '💬 A', '2025-08-01T10:00:00+03:00', '2025-08-01T10:30:00+03:00', status='cancelled'),
+                _event('c', '💬 C', '2025-08-03T10:00:00+03:00', '2025-08-03T10:30:00+03:00'),
+            ],
+            'nextSyncToken': 'token-2'
+        }
+
+        mirror = CalendarMirror(service, 'cal', db_path, log=lambda *args: None)
+
+        stats = mirror.sync()
+        assert stats['full_sync'] and stats['updated'] == 2
+        assert [e['id'] for e in mirror.get_events()] == ['a', 'b']
+
+        stats = mirror.sync()
+        assert not stats['full_sync']
+        assert service.api.calls[-1]['syncToken'] == 'token-1'
+        assert [e['id'] for e in mirror.get_events()] == ['b', 'c']
+
+        # סינון לפי טווח עם אותה סמנטיקה של timeMin/timeMax
+        events = mirror.get_events('2025-08-02T00:00:00+03:00', '2025-08-02T23:59:59+03:00')
+        assert [e['id'] for e in events] == ['b']
+
+        mirror.forget_events(['b'])
+        assert [e['id'] for e in mirror.get_events()] == ['c']
+
+    print("✅ סנכרון מצטבר עובד")
+
+def test_all_day_events_use_calendar_timezone():
+    """אירוע יום שלם מתחיל בחצות בשעון היומן - סינון טווח מקומי לא תופס את היום הקודם"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = FakeService()
+        service.api.responses[None] = {
+            'items': [
+                _all_day_event('aug-1', '2025-08-01', '2025-08-02'),
+                _all_day_event('aug-2', '2025-08-02', '2025-08-03'),
+                _event('timed', '💬 T', '2025-08-02T00:30:00+03:00', '2025-08-02T01:00:00+03:00'),
+            ],
+            'nextSyncToken': 'token-1'
+        }
+        mirror = CalendarMirror(service, 'cal', os.path.join(tmp, 'calendar.db'), log=lambda *args: None)
+        mirror.sync()
+
+        assert CalendarMirror._normalize_time('2025-08-02') == '2025-08-01T21:00:00'
+        assert CalendarMirror._normalize_time('2025-01-02') == '2025-01-01T22:00:00'  # שעון חורף
+        events = mirror.get_events('2025-08-02T00:00:00+03:00', '2025-08-02T23:59:59+03:00')
+        assert [e['id'] for e in events] == ['aug-2', 'timed']
+
+if __name__ == "__main__":
+    test_full_then_incremental_sync()
+    test_all_day_events_use_calendar_timezone()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מוני אירועי היומן (calendar_event_daily_counts) שמתעדכנים ע"י triggers
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from calendar_stats import read_calendar_event_stats, recompute_calendar_event_counts
+from db_connections import get_connection
+from db_migrations import CALENDAR_DB, migrate_database
+
+NOW = datetime(2025, 9, 15, 12, 0)
+
+def _expected(conn):
+    """הספירות בדרך הישנה - COUNT(*) על calendar_events (לפי ימים שלמים)"""
+    def count(query, *params):
+        return conn.execute(query, params).fetchone()[0]
+    since = (NOW - timedelta(days=30)).date().isoformat()
+    return {
+        'total_calendar_events': count("SELECT COUNT(*) FROM calendar_events"),
+        'recent_calendar_events': count("SELECT COUNT(*) FROM calendar_events WHERE date(created_at) >= ?", since),
+        'august_2025_events': count("SELECT COUNT(*) FROM calendar_events WHERE created_at >= '2025-08-01'"),
+    }
+
+def _insert(conn, title, created_at):
+    conn.execute("INSERT INTO calendar_events (title, created_at) VALUES (?, ?)", (title, created_at))
+
+def test_legacy_events_are_counted_and_triggers_keep_counts():
+    """אירועים שקיימים לפני המיגרציה נספרים, והוספה/עדכון/מחיקה מעדכנים את המונים"""
+    print("🔧 בודק מוני אירועי יומן...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CALENDAR_DB)
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE calendar_events (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, "
+                     "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO calendar_events (title, created_at) VALUES ('ישן', '2025-07-01 10:00:00')")
+        conn.execute("INSERT INTO calendar_events (title, created_at) VALUES ('אוגוסט', '2025-08-20 10:00:00')")
+        conn.commit()
+        conn.close()
+
+        migrate_database(db_path, lambda _: None)
+        conn = get_connection(db_path)
+        assert read_calendar_event_stats(conn, NOW) == _expected(conn)
+        assert read_calendar_event_stats(conn, NOW)['total_calendar_events'] == 2
+
+        _insert(conn, 'חדש', '2025-09-10 09:00:00')
+        _insert(conn, 'חדש 2', '2025-09-10 18:00:00.123456')
+        _insert(conn, 'בלי תאריך', None)
+        conn.commit()
+        assert read_calendar_event_stats(conn, NOW) == _expected(conn)
+        assert read_calendar_event_stats(conn, NOW)['recent_calendar_events'] == 3
+
+        conn.execute("UPDATE calendar_events SET created_at = '2025-09-01 08:00:00' WHERE title = 'ישן'")
+        conn.execute("DELETE FROM calendar_events WHERE title = 'חדש'")
+        conn.commit()
+        assert read_calendar_event_stats(conn, NOW) == _expected(conn)
+        conn.close()
+    print("✅ המונים תואמים לספירה מלאה")
+
+def test_recompute_fixes_drift():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CALENDAR_DB)
+        migrate_database(db_path, lambda _: None)
+        conn = get_connection(db_path)
+        _insert(conn, 'א', '2025-09-10 09:00:00')
+        conn.execute("UPDATE calendar_event_daily_counts SET events = 7")
+        conn.commit()
+        conn.close()
+
+        fixed = []
+        stats = recompute_calendar_event_counts(db_path, log=fixed.append)
+        assert stats['total_calendar_events'] == 1 and stats['august_2025_events'] == 1
+        assert fixed
+
+if __name__ == "__main__":
+    test_legacy_events_are_counted_and_triggers_keep_counts()
+    test_recompute_fixes_drift()
+    print("🎉 כל הבדיקות עברו")
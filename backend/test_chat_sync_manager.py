@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת ChatSyncManager - סינכרון צ'אט דרך get_chat_history_paginated ו-parse_message
+"""
+
+import os
+import tempfile
+from chat_sync_manager import ChatSyncManager
+from green_api_client import GreenAPIClient
+
+class FakeHistoryClient(GreenAPIClient):
+    """GreenAPIClient שמחזיר היסטוריה מרשימה בזיכרון במקום קריאת HTTP"""
+
+    def __init__(self, history, fail_from_page=None):
+        super().__init__("1101000000", "token")
+        self.history = history  # מהחדשה לישנה, כמו ב-Green API
+        self.requested_counts = []
+        self.fail_from_page = fail_from_page
+
+    def get_chat_history(self, chat_id, count=100):
+        self.requested_counts.append(count)
+        if self.fail_from_page is not None and len(self.requested_counts) >= self.fail_from_page:
+            return False, {"error": "HTTP 500"}
+        return True, self.history[:count]
+
+def _message(index, chat_id="972501234567@c.us"):
+    return {
+        "type": "incoming",
+        "idMessage": f"M{index}",
+        "timestamp": 1700000000 + index * 60,
+        "typeMessage": "textMessage",
+        "chatId": chat_id,
+        "senderId": chat_id,
+        "textMessage": f"הודעה {index}",
+    }
+
+def test_sync_chat_through_paginated_history():
+    """צ'אט אחד נמשך בעמודים גדלים ונשמר כולו, וה-high-water mark מצביע על ההודעה החדשה"""
+    print("🔧 בודק סינכרון צ'אט דרך ChatSyncManager...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = FakeHistoryClient([_message(i) for i in range(24, -1, -1)])
+        manager = ChatSyncManager(os.path.join(tmp_dir, "whatsapp_chats.db"),
+                                  os.path.join(tmp_dir, "media"), api_client=client)
+        try:
+            result = manager.sync_chat_history("972501234567@c.us", page_size=10)
+            assert result["success"], result
+            assert result["messages_synced"] == 25
+            assert client.requested_counts == [10, 20, 40]
+
+            db_chat_id = result["db_chat_id"]
+            assert len(manager.db.get_message_ids_for_chat(db_chat_id)) == 25
+            assert manager.db.get_high_water_mark(db_chat_id)["last_message_id"] == "M24"
+        finally:
+            manager.close()
+    print("✅ הצ'אט סונכרן")
+
+def test_partial_fetch_keeps_high_water_mark():
+    """עמוד שנכשל באמצע הדפדוף - ההודעות שהגיעו נשמרות, אבל ה-high-water mark לא מתקדם"""
+    print("🔧 בודק שליפה חלקית...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history = [_message(i) for i in range(24, -1, -1)]
+        client = FakeHistoryClient(history, fail_from_page=2)
+        manager = ChatSyncManager(os.path.join(tmp_dir, "whatsapp_chats.db"),
+                                  os.path.join(tmp_dir, "media"), api_client=client)
+        try:
+            result = manager.sync_chat_history("972501234567@c.us", page_size=10)
+            assert result["success"], result
+            assert not result["history_complete"]
+            assert result["messages_synced"] == 10
+            db_chat_id = result["db_chat_id"]
+            assert manager.db.get_high_water_mark(db_chat_id) is None
+
+            # הסינכרון הבא משלים את ההודעות הישנות שלא הגיעו
+            manager.api_client = FakeHistoryClient(history)
+            result = manager.sync_chat_history("972501234567@c.us", page_size=10)
+            assert result["history_complete"]
+            assert result["messages_synced"] == 15
+            assert manager.db.get_high_water_mark(db_chat_id)["last_message_id"] == "M24"
+
+            # כשל כבר בעמוד הראשון הוא שגיאת סינכרון
+            manager.api_client = FakeHistoryClient(history, fail_from_page=1)
+            assert not manager.sync_chat_history("972501234567@c.us", page_size=10)["success"]
+        finally:
+            manager.close()
+    print("✅ שליפה חלקית לא מקדמת את ה-high-water mark")
+
+if __name__ == "__main__":
+    test_sync_chat_through_paginated_history()
+    test_partial_fetch_keeps_high_water_mark()
+    print("🎉 כל הבדיקות עברו")
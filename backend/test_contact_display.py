@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת דגל is_displayable של אנשי קשר (חישוב בזמן כתיבה, מיגרציה ו-backfill)
+"""
+
+import os
+import sqlite3
+import tempfile
+from contact_display import backfill_displayable, is_displayable_contact
+from db_migrations import CONTACTS_DB, migrate_database
+
+# (name, push_name, מוצג?)
+CASES = [
+    ("דני כהן", "", 1),
+    ("972501234567", "", 0),
+    ("972501234567", "Dani", 1),
+    ("אב", None, 0),
+    ("  אב  ", None, 0),
+    ("A1B", None, 1),
+    ("", "", 0),
+    (None, None, 0),
+]
+
+def test_python_flag():
+    for name, push_name, expected in CASES:
+        assert is_displayable_contact(name, push_name) == expected, (name, push_name)
+
+def test_migration_backfill_matches_python():
+    """המיגרציה מחשבת לשורות קיימות את אותו ערך כמו הקוד בזמן הכתיבה"""
+    print("🔧 בודק backfill במיגרציה...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE contacts (contact_id INTEGER PRIMARY KEY, phone_number TEXT, whatsapp_id TEXT, type TEXT, "
+                     "name TEXT, push_name TEXT, include_in_timebro BOOLEAN)")
+        conn.execute("CREATE TABLE groups (group_id INTEGER PRIMARY KEY, whatsapp_group_id TEXT, subject TEXT, "
+                     "description TEXT, include_in_timebro BOOLEAN)")
+        conn.executemany("INSERT INTO contacts (name, push_name) VALUES (?, ?)",
+                         [(name, push_name) for name, push_name, _ in CASES])
+        conn.commit()
+        conn.close()
+
+        assert migrate_database(db_path, lambda _: None, schema="whatsapp_contacts_groups") > 0
+        conn = sqlite3.connect(db_path)
+        flags = [row[0] for row in conn.execute("SELECT is_displayable FROM contacts ORDER BY contact_id")]
+        conn.close()
+        assert flags == [expected for _, _, expected in CASES]
+    print("✅ הדגל מולא לכל השורות הקיימות")
+
+def test_backfill_fixes_renamed_contacts():
+    """שינוי שם ע"י סקריפט חיצוני מתוקן ב-backfill_displayable"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CONTACTS_DB)
+        migrate_database(db_path, lambda _: None)
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO contacts (whatsapp_id, name, is_displayable) VALUES ('1@c.us', 'דני כהן', 1)")
+        conn.execute("INSERT INTO contacts (whatsapp_id, name, is_displayable) VALUES ('2@c.us', 'רותי', 1)")
+        conn.execute("UPDATE contacts SET name = '0501234567' WHERE whatsapp_id = '1@c.us'")
+        conn.commit()
+        conn.close()
+
+        assert backfill_displayable(db_path, lambda _: None) == 1
+        assert backfill_displayable(db_path, lambda _: None) == 0
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT whatsapp_id FROM contacts WHERE is_displayable = 1").fetchall()
+        conn.close()
+        assert rows == [("2@c.us",)]
+
+if __name__ == "__main__":
+    test_python_flag()
+    test_migration_backfill_matches_python()
+    test_backfill_fixes_renamed_contacts()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת התאמת אנשי קשר מאושרים מול הבדיקה המקורית (שלושה מעברים על כל הרשימה)
+"""
+
+import random
+from contact_matcher import ApprovedContactMatcher
+
+def reference_is_approved(approved_contacts, contact_name):
+    """הבדיקה המקורית של SimpleTimeBroCalendar.is_approved_contact"""
+    if not contact_name or len(contact_name.strip()) < 2:
+        return False
+
+    contact_clean = contact_name.strip().lower()
+
+    for approved in approved_contacts:
+        if contact_clean == approved.strip().lower():
+            return True
+
+    for approved in approved_contacts:
+        approved_clean = approved.strip().lower()
+        if approved_clean in contact_clean or contact_clean in approved_clean:
+            if min(len(approved_clean), len(contact_clean)) >= 4:
+                return True
+
+    contact_words = contact_clean.split()
+    for approved in approved_contacts:
+        for contact_word in contact_words:
+            for approved_word in approved.strip().lower().split():
+                if len(contact_word) >= 3 and len(approved_word) >= 3 and contact_word == approved_word:
+                    return True
+
+    return False
+
+def test_known_names():
+    """דוגמאות מוכרות"""
+    approved = {"מייק ביקוב", "Arcserver Team", "  Dana Levi ", "ab"}
+    matcher = ApprovedContactMatcher(approved)
+
+    assert matcher.is_approved("מייק ביקוב")
+    assert matcher.is_approved("arcserver team")
+    assert matcher.is_approved("Arcserver Team - Support")   # מאושר מוכל בשם
+    assert matcher.is_approved("Arcs")                       # השם מוכל במאושר
+    assert matcher.is_approved("Levi Cohen")                  # מילה משותפת
+    assert matcher.is_approved("ab")                          # התאמה מדויקת
+    assert not matcher.is_approved("abc")                     # קצר מדי להתאמה חלקית
+    assert not matcher.is_approved("Dan")
+    assert not matcher.is_approved(None)
+    assert not matcher.is_approved(" ")
+    print("✅ דוגמאות מוכרות עובדות")
+
+def test_matches_reference_implementation():
+    """השוואה אקראית מול הבדיקה המקורית"""
+    print("🔧 משווה מול הבדיקה המקורית...")
+
+    rng = random.Random(1234)
+    alphabet = "abcde אבג"
+
+    def random_name():
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+
+    for _ in range(50):
+        approved = {random_name() for _ in range(rng.randint(0, 15))}
+        matcher = ApprovedContactMatcher(approved)
+        for _ in range(100):
+            name = random_name()
+            assert matcher.is_approved(name) == reference_is_approved(approved, name), (approved, name)
+
+    print("✅ התוצאות זהות לבדיקה המקורית")
+
+if __name__ == "__main__":
+    test_known_names()
+    test_matches_reference_implementation()
+    print("🎉 כל הבדיקות עברו")
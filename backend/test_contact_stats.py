@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מוני הסטטיסטיקות (contact_stats) שמתעדכנים ע"י triggers
+"""
+
+import os
+import tempfile
+from contact_stats import read_contact_stats, recompute_contact_stats
+from db_connections import get_connection
+from db_migrations import CONTACTS_DB, migrate_database
+
+def _expected(conn):
+    """הספירות בדרך הישנה - COUNT(*) על הטבלאות"""
+    def count(query):
+        return conn.execute(query).fetchone()[0]
+    return {
+        'total_contacts': count("SELECT COUNT(*) FROM contacts WHERE type = 'contact'"),
+        'contacts_in_calendar': count("SELECT COUNT(*) FROM contacts WHERE type = 'contact' AND include_in_timebro = 1"),
+        'total_groups': count("SELECT COUNT(*) FROM contacts WHERE type = 'group'"),
+        'israeli_contacts': count("SELECT COUNT(*) FROM contacts WHERE type = 'contact' AND phone_number LIKE '972%'"),
+        'groups_in_calendar': count("SELECT COUNT(*) FROM groups WHERE include_in_timebro = 1"),
+    }
+
+def test_triggers_keep_counters_current():
+    """אחרי הוספה, עדכון, מחיקה ו-INSERT OR REPLACE המונים שווים ל-COUNT(*)"""
+    print("🔧 בודק מוני סטטיסטיקה...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CONTACTS_DB)
+        migrate_database(db_path, lambda _: None)
+        conn = get_connection(db_path)
+
+        conn.execute("INSERT INTO contacts (whatsapp_id, phone_number, type, include_in_timebro) "
+                     "VALUES ('1@c.us', '972501234567', 'contact', 1)")
+        conn.execute("INSERT INTO contacts (whatsapp_id, phone_number, type) VALUES ('2@c.us', '15551234567', 'contact')")
+        conn.execute("INSERT INTO contacts (whatsapp_id, phone_number, type) VALUES ('3@c.us', NULL, 'group')")
+        conn.execute("INSERT INTO groups (whatsapp_group_id, subject, include_in_timebro) VALUES ('1@g.us', 'א', 1)")
+        conn.execute("INSERT INTO groups (whatsapp_group_id, subject, include_in_timebro) VALUES ('2@g.us', 'ב', 0)")
+        conn.commit()
+        assert read_contact_stats(conn) == _expected(conn)
+        assert read_contact_stats(conn)['israeli_contacts'] == 1
+
+        conn.execute("UPDATE contacts SET include_in_timebro = 1, phone_number = '972521111111' WHERE whatsapp_id = '2@c.us'")
+        conn.execute("UPDATE contacts SET type = 'contact' WHERE whatsapp_id = '3@c.us'")
+        conn.execute("UPDATE groups SET include_in_timebro = 1 WHERE whatsapp_group_id = '2@g.us'")
+        conn.commit()
+        assert read_contact_stats(conn) == _expected(conn)
+
+        conn.execute("INSERT OR REPLACE INTO contacts (whatsapp_id, phone_number, type) "
+                     "VALUES ('1@c.us', '972501234567', 'contact')")
+        conn.execute("DELETE FROM groups WHERE whatsapp_group_id = '1@g.us'")
+        conn.execute("DELETE FROM contacts WHERE whatsapp_id = '3@c.us'")
+        conn.commit()
+        assert read_contact_stats(conn) == _expected(conn)
+        assert read_contact_stats(conn)['contacts_in_calendar'] == 1
+        conn.close()
+    print("✅ המונים תואמים לספירה מלאה")
+
+def test_recompute_fixes_drift():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CONTACTS_DB)
+        migrate_database(db_path, lambda _: None)
+        conn = get_connection(db_path)
+        conn.execute("INSERT INTO contacts (whatsapp_id, type) VALUES ('1@c.us', 'contact')")
+        conn.execute("UPDATE contact_stats SET value = 42 WHERE stat_key = 'total_contacts'")
+        conn.commit()
+        conn.close()
+
+        messages = []
+        assert recompute_contact_stats(db_path, messages.append)['total_contacts'] == 1
+        assert len(messages) == 1
+
+def test_dashboard_statistics_are_cached():
+    """get_statistics מחזיר את המונים, ומחשב מחדש רק אחרי עדכון דרך הממשק או פקיעת המטמון"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            from web_interface import DatabaseManager
+            manager = DatabaseManager()
+            conn = get_connection(manager.contacts_db)
+            conn.execute("INSERT INTO contacts (contact_id, whatsapp_id, phone_number, type) "
+                         "VALUES (1, '1@c.us', '972501234567', 'contact')")
+            conn.commit()
+            conn.close()
+
+            stats = manager.get_statistics()
+            assert stats['total_contacts'] == 1 and stats['contacts_in_calendar'] == 0
+
+            manager.update_contact_calendar_status(1, True)
+            stats = manager.get_statistics()
+            assert stats['contacts_in_calendar'] == 1
+            stats['contacts_in_calendar'] = 99
+            assert manager.get_statistics()['contacts_in_calendar'] == 1
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_triggers_keep_counters_current()
+    test_recompute_fixes_drift()
+    test_dashboard_statistics_are_cached()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת חלוקת ההודעות למפגשי שיחה
+"""
+
+from operator import itemgetter
+from conversation_sessions import iter_conversation_sessions, split_conversation_sessions
+
+def reference_sessions(messages, gap_minutes):
+    """הלוגיקה המקורית של identify_conversation_sessions"""
+    sessions = []
+    current_session = []
+    for msg in sorted(messages, key=lambda x: x['timestamp']):
+        if current_session and msg['timestamp'] - current_session[-1]['timestamp'] > gap_minutes * 60:
+            sessions.append(current_session)
+            current_session = []
+        current_session.append(msg)
+    if current_session:
+        sessions.append(current_session)
+    return sessions
+
+def test_split_matches_original_logic():
+    """אותה חלוקה כמו הלוגיקה המקורית, כולל הפסקה של בדיוק gap"""
+    print("🔧 בודק חלוקה למפגשים...")
+
+    offsets = [0, 10, 70, 130, 131, 400, 400, 520, 1000]
+    messages = [{'timestamp': 1_700_000_000 + minutes * 60, 'n': n} for n, minutes in enumerate(offsets)]
+
+    for gap in (60, 120, 240):
+        shuffled = list(reversed(messages))
+        sessions = split_conversation_sessions(shuffled, itemgetter('timestamp'), gap_minutes=gap)
+        assert sessions == reference_sessions(shuffled, gap), gap
+
+    sessions = split_conversation_sessions(messages, itemgetter('timestamp'), gap_minutes=60)
+    assert [[m['n'] for m in s] for s in sessions] == [[0, 1, 2, 3, 4], [5, 6], [7], [8]]
+    print("✅ החלוקה זהה ללוגיקה המקורית")
+
+def test_interleaved_chats_stream_lazily():
+    """צ'אטים משולבים ממוינים לפי זמן - מפגש נסגר ברגע שעבר gap, בלי לחכות לסוף"""
+    print("🔧 בודק חלוקה לפי צ'אט...")
+
+    rows = [
+        ('a', 0), ('b', 5), ('a', 30), ('b', 50),
+        ('c', 200), ('a', 210), ('c', 220),
+        ('b', 1000),
+    ]
+    consumed = []
+
+    def stream():
+        for chat, minutes in rows:
+            consumed.append(chat)
+            yield (chat, minutes * 60)
+
+    sessions = iter_conversation_sessions(
+        stream(), timestamp_of=itemgetter(1), gap_minutes=60,
+        chat_of=itemgetter(0), min_duration_minutes=5
+    )
+
+    first = next(sessions)
+    # המפגש הראשון יוצא לפני שכל ההודעות נקראו
+    assert len(consumed) < len(rows)
+    assert first.chat == 'a' and len(first) == 2
+
+    rest = list(sessions)
+    summary = [(s.chat, [m[1] // 60 for m in s]) for s in [first] + rest]
+    assert sorted(summary) == sorted([
+        ('a', [0, 30]), ('b', [5, 50]), ('c', [200, 220]), ('a', [210]), ('b', [1000])
+    ])
+
+    # משך מינימלי - מפגש של הודעה אחת מקבל 5 דקות
+    single = next(s for s in rest if s.chat == 'b' and len(s) == 1)
+    assert single.end_timestamp - single.start_timestamp == 300
+    assert (single.end_time - single.start_time).total_seconds() == 300
+    print("✅ מפגשים לפי צ'אט נוצרים בהדרגה")
+
+if __name__ == "__main__":
+    test_split_matches_original_logic()
+    test_interleaved_chats_stream_lazily()
+    print("🎉 כל הבדיקות עברו")
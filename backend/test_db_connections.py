@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מאגר חיבורי SQLite המשותף
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+from db_connections import ConnectionPool
+
+def test_pragmas_and_reuse():
+    """חיבור חדש מקבל WAL ו-pragmas, ו-close() מחזיר אותו למאגר"""
+    print("🔧 בודק pragmas ושימוש חוזר...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "test.db")
+        pool = ConnectionPool()
+
+        conn = pool.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        raw = conn._conn
+        conn.close()
+
+        again = pool.connect(db_path)
+        assert again._conn is raw
+        again.close()
+        pool.close_all()
+    print("✅ החיבור נפתח פעם אחת ומוחזר למאגר")
+
+def test_close_rolls_back_and_nested_reuse():
+    """close() מבטל טרנזקציה פתוחה; קריאה מקוננת באותו thread מקבלת את אותו חיבור"""
+    print("🔧 בודק rollback וקינון...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "test.db")
+        pool = ConnectionPool()
+
+        conn = pool.connect(db_path)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+
+        conn.row_factory = sqlite3.Row
+        nested = pool.connect(db_path)
+        assert nested._conn is conn._conn
+        nested.close()
+        # הקריאה המקוננת לא סגרה את החיבור של הקורא החיצוני
+        conn.execute("INSERT INTO t VALUES (1)")
+        assert conn.execute("SELECT x FROM t").fetchone()["x"] == 1
+        conn.close()  # בלי commit
+
+        conn = pool.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+        conn.close()
+
+        try:
+            conn.execute("SELECT 1")
+            assert False, "closed wrapper should not be usable"
+        except sqlite3.ProgrammingError:
+            pass
+        pool.close_all()
+    print("✅ טרנזקציה פתוחה בוטלה ו-row_factory אופס")
+
+def test_read_only_connections():
+    """חיבור קריאה בלבד לא יכול לכתוב ולא ננעל ע"י כותב פעיל"""
+    print("🔧 בודק חיבורי קריאה בלבד...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "test.db")
+        pool = ConnectionPool()
+
+        writer = pool.connect(db_path)
+        writer.execute("CREATE TABLE t (x INTEGER)")
+        writer.execute("INSERT INTO t VALUES (1)")
+        writer.commit()
+        writer.execute("INSERT INTO t VALUES (2)")  # טרנזקציה פתוחה
+
+        results = []
+
+        def read():
+            reader = pool.connect(db_path, read_only=True)
+            results.append(reader.execute("SELECT COUNT(*) FROM t").fetchone()[0])
+            try:
+                reader.execute("INSERT INTO t VALUES (3)")
+                results.append("wrote")
+            except sqlite3.OperationalError:
+                results.append("read-only")
+            reader.close()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        assert results == [1, "read-only"]
+
+        writer.close()
+        pool.close_all()
+    print("✅ הקורא רואה את המצב האחרון שבוצע לו commit בלי להמתין")
+
+if __name__ == "__main__":
+    test_pragmas_and_reuse()
+    test_close_rolls_back_and_nested_reuse()
+    test_read_only_connections()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מנוע המיגרציות (קבצי migrations/) ותוכניות השאילתה (EXPLAIN QUERY PLAN) של השאילתות החמות
+"""
+
+import os
+import sqlite3
+import tempfile
+from db_migrations import (MESSAGES_DB, CONTACTS_DB, CONTACTS_SCHEMA, CALENDAR_DB, CALENDAR_SCHEMA,
+                           CHATS_SCHEMA, load_migrations, migrate_database, split_statements)
+
+def _plan(db_path, query, params):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    conn.close()
+    return " | ".join(row[-1] for row in rows)
+
+def _columns(db_path, table):
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    conn.close()
+    return columns
+
+def test_migrations_run_once():
+    """כל קובץ מיגרציה רץ פעם אחת והגרסה נשמרת ב-user_version"""
+    print("🔧 בודק הרצת מיגרציות...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        messages_db = os.path.join(tmp_dir, MESSAGES_DB)
+        applied = []
+        migrations = load_migrations("whatsapp_messages_webjs")
+        latest = migrations[-1][0]
+
+        assert migrate_database(messages_db, applied.append) == latest
+        assert len(applied) == len(migrations)
+        assert migrate_database(messages_db, applied.append) == latest
+        assert len(applied) == len(migrations)
+    print("✅ המיגרציות רצו פעם אחת")
+
+def test_legacy_contacts_database_is_upgraded():
+    """מסד קיים שנוצר ע"י קוד ישן (עם עמודה שנוספה בזמן ריצה) משודרג בלי שגיאות"""
+    print("🔧 בודק שדרוג מסד קיים...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        contacts_db = os.path.join(tmp_dir, "legacy.db")
+        conn = sqlite3.connect(contacts_db)
+        conn.execute("CREATE TABLE contacts (contact_id INTEGER PRIMARY KEY, phone_number TEXT, whatsapp_id TEXT, type TEXT, "
+                     "name TEXT, push_name TEXT, include_in_timebro BOOLEAN, google_contact_name TEXT)")
+        conn.execute("CREATE TABLE groups (group_id INTEGER PRIMARY KEY, whatsapp_group_id TEXT, subject TEXT, "
+                     "description TEXT, include_in_timebro BOOLEAN)")
+        conn.execute("INSERT INTO contacts (name, google_contact_name) VALUES ('דני', 'Danny')")
+        conn.commit()
+        conn.close()
+
+        latest = load_migrations(CONTACTS_SCHEMA)[-1][0]
+        assert migrate_database(contacts_db, lambda _: None, schema=CONTACTS_SCHEMA) == latest
+        assert {"company_name", "google_contact_name", "whatsapp_personal_name"} <= _columns(contacts_db, "contacts")
+        assert "company_name" in _columns(contacts_db, "groups")
+
+        conn = sqlite3.connect(contacts_db)
+        assert conn.execute("SELECT google_contact_name FROM contacts").fetchone() == ("Danny",)
+        conn.close()
+    print("✅ המסד הישן שודרג והנתונים נשמרו")
+
+def test_failed_migration_rolls_back():
+    """מיגרציה שנכשלה באמצע לא משאירה שינויים חלקיים"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        contacts_db = os.path.join(tmp_dir, CONTACTS_DB)
+        conn = sqlite3.connect(contacts_db)
+        # groups כ-view - יצירת האינדקס עליו נכשלת באמצע המיגרציה הראשונה
+        conn.execute("CREATE VIEW groups AS SELECT 1 AS group_id")
+        conn.commit()
+        conn.close()
+
+        assert migrate_database(contacts_db, lambda _: None) == -1
+        conn = sqlite3.connect(contacts_db)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'contacts'").fetchone() is None
+        conn.close()
+    print("✅ מיגרציה שנכשלה בוטלה במלואה")
+
+def test_calendar_tables_are_migrated():
+    """טבלאות היומן שנוצרו inline בגרסאות קודמות - מסד קיים ממשיך לגרסה האחרונה בלי שגיאה"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_db = os.path.join(tmp_dir, CALENDAR_DB)
+        conn = sqlite3.connect(calendar_db)
+        conn.execute("CREATE TABLE simple_calendar_events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "contact_name TEXT NOT NULL, start_datetime TEXT NOT NULL, end_datetime TEXT NOT NULL)")
+        conn.execute("CREATE TABLE calendar_mirror_state (calendar_id TEXT PRIMARY KEY, sync_token TEXT, "
+                     "last_full_sync DATETIME, last_sync DATETIME)")
+        conn.commit()
+        conn.close()
+
+        latest = load_migrations(CALENDAR_SCHEMA)[-1][0]
+        assert migrate_database(calendar_db, lambda _: None) == latest
+        conn = sqlite3.connect(calendar_db)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        assert {"simple_calendar_events", "calendar_event_index",
+                "calendar_mirror_events", "calendar_mirror_state"} <= tables
+
+        # מסד בשם אחר עם schema מפורש (CalendarMirror, SyncJobQueue)
+        mirror_db = os.path.join(tmp_dir, "mirror.db")
+        assert migrate_database(mirror_db, lambda _: None, schema=CALENDAR_SCHEMA) == latest
+        assert "event_json" in _columns(mirror_db, "calendar_mirror_events")
+
+def test_chat_database_with_duplicate_messages_is_upgraded():
+    """מסד צ'אטים קיים עם הודעות כפולות - הכפילויות נמחקות והאינדקס הייחודי נוצר"""
+    print("🔧 בודק שדרוג מסד צ'אטים עם כפילויות...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chats_db = os.path.join(tmp_dir, "whatsapp_chats.db")
+        migrations = load_migrations(CHATS_SCHEMA)
+        # הסכמה הישנה - כמו 0001 אבל בלי האינדקס הייחודי
+        conn = sqlite3.connect(chats_db)
+        for statement in split_statements(migrations[0][2]):
+            if "UNIQUE INDEX" not in statement and not statement.startswith("DELETE"):
+                conn.execute(statement)
+        conn.execute("INSERT INTO chats (whatsapp_chat_id, chat_type, created_at, updated_at) "
+                     "VALUES ('972501234567@c.us', 'private', '2025-01-01', '2025-01-01')")
+        conn.executemany("INSERT INTO messages (whatsapp_message_id, chat_id, content, timestamp, created_at, updated_at) "
+                         "VALUES (?, 1, ?, ?3, ?3, ?3)", [
+            ("M1", "ראשונה", "2025-01-01T10:00:00"),
+            ("M1", "כפולה", "2025-01-01T10:00:00"),
+            ("M2", "שנייה", "2025-01-01T10:01:00"),
+            (None, "בלי מזהה", "2025-01-01T10:02:00"),
+            (None, "בלי מזהה", "2025-01-01T10:02:00"),
+        ])
+        conn.commit()
+        conn.close()
+
+        assert migrate_database(chats_db, lambda _: None, schema=CHATS_SCHEMA) == migrations[-1][0]
+        conn = sqlite3.connect(chats_db)
+        rows = conn.execute("SELECT whatsapp_message_id, content FROM messages ORDER BY message_id").fetchall()
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        assert rows == [("M1", "ראשונה"), ("M2", "שנייה"), (None, "בלי מזהה"), (None, "בלי מזהה")]
+        assert "chat_high_water_marks" in tables
+    print("✅ הכפילויות נמחקו והמסד שודרג")
+
+def test_split_statements_keeps_triggers():
+    statements = split_statements("""
+        -- הערה
+        CREATE TABLE t (x);
+        CREATE TRIGGER t_ai AFTER INSERT ON t BEGIN
+            INSERT INTO t VALUES (new.x);
+        END;
+    """)
+    assert len(statements) == 2 and statements[1].endswith("END;")
+
+def test_hot_queries_use_indexes():
+    """השאילתות החמות משתמשות באינדקסים ולא סורקות את כל הטבלה"""
+    print("🔧 בודק תוכניות שאילתה...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        messages_db = os.path.join(tmp_dir, MESSAGES_DB)
+        contacts_db = os.path.join(tmp_dir, CONTACTS_DB)
+        migrate_database(messages_db, lambda _: None)
+        migrate_database(contacts_db, lambda _: None)
+
+        plan = _plan(messages_db, """
+            SELECT COUNT(*) FROM messages
+            WHERE chat_id = ? AND timestamp BETWEEN ? AND ?
+        """, ("972500000000@c.us", 0, 1))
+        assert "idx_messages_chat_timestamp" in plan and "SCAN messages" not in plan, plan
+
+        plan = _plan(messages_db, """
+            SELECT DISTINCT contact_name FROM messages
+            WHERE timestamp >= ? AND timestamp <= ? AND contact_name IS NOT NULL
+        """, (0, 1))
+        assert "COVERING INDEX idx_messages_timestamp_contact" in plan, plan
+
+        plan = _plan(messages_db, """
+            SELECT contact_name, contact_number, message_body, timestamp, is_from_me, created_at
+            FROM messages
+            WHERE timestamp >= ? AND timestamp <= ? AND contact_name IS NOT NULL
+            ORDER BY timestamp ASC
+        """, (0, 1))
+        assert "idx_messages_timestamp_contact" in plan and "TEMP B-TREE" not in plan, plan
+
+        plan = _plan(contacts_db, """
+            SELECT company_name FROM contacts WHERE name = ?
+            UNION ALL
+            SELECT company_name FROM contacts WHERE push_name = ?
+            LIMIT 1
+        """, ("a", "a"))
+        assert "COVERING INDEX idx_contacts_name_company" in plan, plan
+        assert "COVERING INDEX idx_contacts_push_name_company" in plan, plan
+
+        plan = _plan(contacts_db, "SELECT company_name FROM groups WHERE subject = ? LIMIT 1", ("a",))
+        assert "COVERING INDEX idx_groups_subject_company" in plan, plan
+    print("✅ כל השאילתות משתמשות באינדקסים")
+
+if __name__ == "__main__":
+    test_migrations_run_once()
+    test_legacy_contacts_database_is_upgraded()
+    test_failed_migration_rolls_back()
+    test_calendar_tables_are_migrated()
+    test_chat_database_with_duplicate_messages_is_upgraded()
+    test_split_statements_keeps_triggers()
+    test_hot_queries_use_indexes()
+    print("🎉 כל הבדיקות עברו")
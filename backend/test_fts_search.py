@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת אינדקסי החיפוש (FTS5) של אנשי קשר, קבוצות והודעות
+"""
+
+import os
+import tempfile
+from db_connections import ConnectionPool
+from db_migrations import CONTACTS_DB, MESSAGES_DB, migrate_database
+from fts_search import fts_match_query
+
+def _match(conn, table, term, columns=None):
+    rows = conn.execute(f"SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rowid",
+                        (fts_match_query(term, columns),)).fetchall()
+    return [row[0] for row in rows]
+
+def test_match_query():
+    """ביטוי קצר מ-3 תווים חוזר ל-LIKE, ותווים מיוחדים מצוטטים"""
+    assert fts_match_query("דנ") is None
+    assert fts_match_query(' "a-b" ') == '"""a-b"""'
+    assert fts_match_query("abc", ("subject", "description")) == '{subject description} : "abc"'
+
+def test_contacts_index_follows_writes():
+    """ה-triggers מעדכנים את האינדקס בהוספה, עדכון, מחיקה ו-INSERT OR REPLACE"""
+    print("🔧 בודק סנכרון אינדקס אנשי הקשר...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        contacts_db = os.path.join(tmp_dir, CONTACTS_DB)
+        conn = ConnectionPool().connect(contacts_db)
+        # מסד קיים מלפני האינדקס
+        conn.execute("CREATE TABLE contacts (contact_id INTEGER PRIMARY KEY, whatsapp_id TEXT UNIQUE, type TEXT, "
+                     "phone_number TEXT, name TEXT, push_name TEXT, include_in_timebro BOOLEAN)")
+        conn.execute("CREATE TABLE groups (group_id INTEGER PRIMARY KEY, whatsapp_group_id TEXT, subject TEXT, "
+                     "description TEXT, include_in_timebro BOOLEAN)")
+        conn.execute("INSERT INTO contacts (contact_id, whatsapp_id, phone_number, name) "
+                     "VALUES (1, '972501234567@c.us', '972501234567', 'דני כהן')")
+        conn.commit()
+
+        # מיגרציה על מסד עם נתונים קיימים ממלאת את האינדקס (rebuild)
+        assert migrate_database(contacts_db, lambda _: None) > 0
+        assert _match(conn, "contacts_fts", "כהן") == [1]
+        assert _match(conn, "contacts_fts", "0123456") == [1]
+
+        conn.execute("INSERT INTO contacts (contact_id, whatsapp_id, phone_number, name, company_name) "
+                     "VALUES (2, '972529999999@c.us', '972529999999', 'רותי', 'Acme Ltd')")
+        conn.execute("UPDATE contacts SET name = 'דני לוי' WHERE contact_id = 1")
+        conn.commit()
+        assert _match(conn, "contacts_fts", "כהן") == []
+        assert _match(conn, "contacts_fts", "לוי") == [1]
+        assert _match(conn, "contacts_fts", "acme") == [2]
+
+        # INSERT OR REPLACE מוחק את השורה הישנה - עם recursive_triggers גם מהאינדקס
+        conn.execute("INSERT OR REPLACE INTO contacts (contact_id, whatsapp_id, phone_number, name) "
+                     "VALUES (3, '972529999999@c.us', '972529999999', 'רות')")
+        conn.commit()
+        assert _match(conn, "contacts_fts", "acme") == []
+        assert _match(conn, "contacts_fts", "9999999") == [3]
+
+        conn.execute("DELETE FROM contacts WHERE contact_id = 1")
+        conn.commit()
+        assert _match(conn, "contacts_fts", "לוי") == []
+        # integrity-check זורק שגיאה אם האינדקס לא תואם לטבלה
+        conn.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('integrity-check')")
+        conn.close()
+    print("✅ אינדקס אנשי הקשר מסונכרן")
+
+def test_groups_and_messages_search():
+    """חיפוש בקבוצות לפי עמודות ובתוכן הודעות"""
+    print("🔧 בודק חיפוש קבוצות והודעות...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        contacts_db = os.path.join(tmp_dir, CONTACTS_DB)
+        messages_db = os.path.join(tmp_dir, MESSAGES_DB)
+        migrate_database(contacts_db, lambda _: None)
+        migrate_database(messages_db, lambda _: None)
+        pool = ConnectionPool()
+
+        conn = pool.connect(contacts_db)
+        conn.execute("INSERT INTO groups (group_id, whatsapp_group_id, subject, description, company_name) "
+                     "VALUES (1, '1@g.us', 'צוות פיתוח', 'דיונים טכניים', 'Acme')")
+        conn.execute("INSERT INTO groups (group_id, whatsapp_group_id, subject, description, company_name) "
+                     "VALUES (2, '2@g.us', 'משפחה', NULL, 'פיתוח עסקי')")
+        conn.commit()
+        assert _match(conn, "groups_fts", "פיתוח") == [1, 2]
+        assert _match(conn, "groups_fts", "פיתוח", ("subject", "description")) == [1]
+        conn.close()
+
+        conn = pool.connect(messages_db)
+        conn.execute("INSERT INTO messages (id, chat_id, contact_name, message_body, timestamp) "
+                     "VALUES ('m1', '972501234567@c.us', 'דני', 'נפגש מחר בשעה 10', 1)")
+        conn.execute("INSERT INTO messages (id, chat_id, contact_name, message_body, timestamp) "
+                     "VALUES ('m2', '972501234567@c.us', 'דני', 'Meeting tomorrow', 2)")
+        conn.commit()
+        rows = conn.execute("SELECT m.id FROM messages m WHERE m.rowid IN "
+                            "(SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)",
+                            (fts_match_query("MEET"),)).fetchall()
+        assert rows == [("m2",)]
+        assert len(_match(conn, "messages_fts", "מחר")) == 1
+
+        conn.execute("UPDATE messages SET message_body = 'בוטל' WHERE id = 'm1'")
+        conn.commit()
+        assert _match(conn, "messages_fts", "מחר") == []
+        conn.close()
+        pool.close_all()
+    print("✅ חיפוש קבוצות והודעות עובד דרך האינדקס")
+
+if __name__ == "__main__":
+    test_match_query()
+    test_contacts_index_follows_writes()
+    test_groups_and_messages_search()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מדיניות ה-retry וה-session המשותף של GreenAPIClient (ללא רשת)
+"""
+
+import requests
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+from green_api_client import GreenAPIClient
+
+class ScriptedAdapter(HTTPAdapter):
+    """מחזיר תשובות מוכנות מראש במקום לפנות לשרת"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status, headers, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = body.encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+def _client(responses, max_retries=3):
+    client = GreenAPIClient("1101", "token", max_retries=max_retries, backoff_base=0.001)
+    adapter = ScriptedAdapter(responses)
+    client.session.mount("https://", adapter)
+    return client, adapter
+
+def test_retries_429_and_5xx():
+    """429 ו-5xx נשלחים שוב, עם כיבוד Retry-After"""
+    print("🔧 בודק retry...")
+
+    client, adapter = _client([
+        (429, {"Retry-After": "0"}, ""),
+        (503, {}, ""),
+        (200, {}, '{"stateInstance": "authorized"}'),
+    ])
+    success, response = client.get_state_instance()
+    assert success and response == {"stateInstance": "authorized"}
+    assert len(adapter.requests) == 3
+    print("✅ הבקשה הצליחה אחרי 2 ניסיונות חוזרים")
+
+def test_gives_up_after_max_retries():
+    client, adapter = _client([(500, {}, "boom")] * 3, max_retries=2)
+    success, response = client.get_chats()
+    assert not success and "HTTP error 500" in response["error"]
+    assert len(adapter.requests) == 3
+    print("✅ מספר הניסיונות מוגבל")
+
+def test_send_message_not_retried_on_server_error():
+    """שליחת הודעה לא נשלחת שוב אחרי 5xx - ההודעה אולי כבר נשלחה"""
+    client, adapter = _client([(502, {}, "bad gateway"), (200, {}, "{}")])
+    success, _ = client.send_message("972500000000@c.us", "hi")
+    assert not success
+    assert len(adapter.requests) == 1
+    print("✅ sendMessage לא חוזר על עצמו ב-5xx")
+
+def test_retry_after_header_parsing():
+    response = requests.Response()
+    response.headers["Retry-After"] = "7"
+    assert GreenAPIClient._retry_after_seconds(response) == 7.0
+    response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert GreenAPIClient._retry_after_seconds(response) == 0.0
+
+    client = GreenAPIClient("1101", "token", backoff_base=0.001)
+    response.headers["Retry-After"] = "2"
+    assert client._backoff_seconds(0, response) >= 2.0
+    print("✅ Retry-After מפוענח נכון")
+
+class FakeHistoryClient(GreenAPIClient):
+    """היסטוריה מדומה - getChatHistory מחזיר את count ההודעות האחרונות, מהחדשה לישנה"""
+
+    def __init__(self, timestamps, fail_from_page=None):
+        super().__init__("1101", "token")
+        self.history = [{"idMessage": str(ts), "timestamp": ts} for ts in sorted(timestamps, reverse=True)]
+        self.counts = []
+        self.fail_from_page = fail_from_page
+
+    def get_chat_history(self, chat_id, count=100):
+        self.counts.append(count)
+        if self.fail_from_page is not None and len(self.counts) >= self.fail_from_page:
+            return False, {"error": "HTTP 500"}
+        return True, self.history[:count]
+
+def test_paginated_history_stops_after_start_date():
+    """הדפדוף נעצר ברגע שעברנו את תחילת הטווח, בלי לאבד הודעות ישנות בצ'אט עמוס"""
+    print("🔧 בודק דפדוף בהיסטוריה...")
+
+    # צ'אט עמוס - 5000 הודעות, הטווח המבוקש מתחיל לפני ההודעה ה-1500 מהסוף
+    client = FakeHistoryClient(range(5000))
+    complete, messages = client.get_chat_history_paginated("1@c.us", since_timestamp=3500)
+    assert complete
+    assert client.counts == [100, 200, 400, 800, 1600]
+    assert min(m["timestamp"] for m in messages) < 3500
+
+    start, end = datetime.fromtimestamp(3500), datetime.fromtimestamp(4999)
+    in_range = client.get_chat_history_by_date_range("1@c.us", start, end)
+    assert len(in_range) == 1500
+
+    # צ'אט שקט - עמוד אחד מספיק
+    client = FakeHistoryClient(range(3))
+    assert client.get_chat_history_paginated("2@c.us") == (True, client.history)
+    assert client.counts == [100]
+
+    # מגבלת max_messages
+    client = FakeHistoryClient(range(5000))
+    complete, messages = client.get_chat_history_paginated("3@c.us", max_messages=250)
+    assert complete and len(messages) == 250
+    assert client.counts == [100, 200, 250]
+
+    # עצירה בהודעה שכבר סונכרנה (high-water mark)
+    client = FakeHistoryClient(range(5000))
+    client.get_chat_history_paginated("4@c.us", page_size=20, stop_at_message_id="4950")
+    assert client.counts == [20, 40, 80]
+    print("✅ הדפדוף מחזיר את כל הטווח ועוצר בזמן")
+
+def test_paginated_history_reports_failed_page():
+    """עמוד שנכשל באמצע הדפדוף מסומן כשליפה חלקית - לא כהיסטוריה המלאה"""
+    print("🔧 בודק כשל באמצע הדפדוף...")
+
+    client = FakeHistoryClient(range(5000), fail_from_page=3)
+    complete, messages = client.get_chat_history_paginated("1@c.us", since_timestamp=3500)
+    assert not complete
+    assert client.counts == [100, 200, 400]
+    assert len(messages) == 200
+
+    # טווח תאריכים שלא נשלף עד תחילתו מוחזר כשגיאה
+    client = FakeHistoryClient(range(5000), fail_from_page=3)
+    in_range = client.get_chat_history_by_date_range(
+        "1@c.us", datetime.fromtimestamp(3500), datetime.fromtimestamp(4999)
+    )
+    assert isinstance(in_range, dict) and "error" in in_range
+
+    # כשל כבר בעמוד הראשון
+    client = FakeHistoryClient(range(5000), fail_from_page=1)
+    assert client.get_chat_history_paginated("2@c.us") == (False, [])
+    print("✅ שליפה חלקית מסומנת complete=False")
+
+if __name__ == "__main__":
+    test_retries_429_and_5xx()
+    test_gives_up_after_max_retries()
+    test_send_message_not_retried_on_server_error()
+    test_retry_after_header_parsing()
+    test_paginated_history_stops_after_start_date()
+    test_paginated_history_reports_failed_page()
+    print("🎉 כל הבדיקות עברו")
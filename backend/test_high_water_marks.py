@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת סימון ההודעה האחרונה שסונכרנה לכל צ'אט (high-water mark)
+"""
+
+import os
+import tempfile
+from database_manager import DatabaseManager
+
+def _db_manager(db_path):
+    db = DatabaseManager(db_path)
+    assert db.create_or_update_chat("1@c.us", "private") == 1
+    assert db.create_or_update_chat("2@g.us", "group") == 2
+    return db
+
+def test_high_water_mark_only_moves_forward():
+    print("🔧 בודק high-water mark...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _db_manager(os.path.join(tmp, 'chats.db'))
+
+        assert db.get_high_water_mark(1) is None
+
+        db.update_high_water_mark(1, 1000, 'A')
+        db.update_high_water_mark(1, 2000, 'B')
+        db.update_high_water_mark(1, 1500, 'OLD')  # לא זז אחורה
+        mark = db.get_high_water_mark(1)
+        assert mark['last_message_timestamp'] == 2000
+        assert mark['last_message_id'] == 'B'
+
+        db.update_high_water_mark(2, 10, 'X')
+        assert db.get_high_water_mark(2)['last_message_id'] == 'X'
+        db.close()
+
+    print("✅ high-water mark מתקדם רק קדימה")
+
+if __name__ == "__main__":
+    test_high_water_mark_only_moves_forward()
+    print("🎉 כל הבדיקות עברו")
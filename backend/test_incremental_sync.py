@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת הסינכרון האינקרמנטלי - סינכרון שני נעצר ב-high-water mark ושומר רק הודעות חדשות
+"""
+
+import os
+import tempfile
+import time
+from chat_sync_manager import ChatSyncManager
+from incremental_sync import IncrementalSyncManager
+from test_chat_sync_manager import FakeHistoryClient
+
+CHAT_ID = "972501234567@c.us"
+
+def _message(index, now):
+    return {
+        "type": "incoming",
+        "idMessage": f"M{index}",
+        "timestamp": now - 3600 + index * 10,
+        "typeMessage": "textMessage",
+        "chatId": CHAT_ID,
+        "senderId": CHAT_ID,
+        "textMessage": f"הודעה {index}",
+    }
+
+def test_second_sync_stops_at_high_water_mark():
+    print("🔧 בודק סינכרון אינקרמנטלי...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # IncrementalSyncManager כותב קובצי לוג וסטטוס בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            now = int(time.time())
+            client = FakeHistoryClient([_message(i, now) for i in range(59, -1, -1)])
+            with ChatSyncManager("whatsapp_chats.db", "media", api_client=client) as manager:
+                first = manager.sync_chat_history(CHAT_ID, max_messages=200, page_size=10)
+                assert first["messages_synced"] == 60
+
+            # 3 הודעות חדשות מאז הסינכרון הראשון
+            client.history = [_message(i, now) for i in range(62, 59, -1)] + client.history
+            client.requested_counts = []
+
+            incremental = IncrementalSyncManager(api_client=client)
+            incremental.email_enabled = False
+            incremental.batch_delay = 0
+            summary = incremental.sync_incremental_updates()
+
+            assert summary["success"] and summary["successful_syncs"] == 1, summary
+            assert summary["new_messages"] == 3
+            # העמוד הראשון כבר מכיל את ההודעה המסומנת - לא ממשיכים אחורה
+            assert client.requested_counts == [incremental.history_page_size]
+
+            with ChatSyncManager("whatsapp_chats.db", "media", api_client=client) as manager:
+                db_chat_id = manager.sync_chat(CHAT_ID, contact_phone="972501234567")
+                assert len(manager.db.get_message_ids_for_chat(db_chat_id)) == 63
+                assert manager.db.get_high_water_mark(db_chat_id)["last_message_id"] == "M62"
+        finally:
+            os.chdir(cwd)
+    print("✅ נשמרו רק ההודעות החדשות")
+
+if __name__ == "__main__":
+    test_second_sync_stops_at_high_water_mark()
+    print("🎉 כל הבדיקות עברו")
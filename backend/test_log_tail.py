@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת קריאת סוף קבצי הלוג (log_tail) ו-/api/logs
+"""
+
+import os
+import tempfile
+from log_tail import LogTailIndex, read_last_lines
+
+def _write(path, text, mode='a'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+def test_read_last_lines_from_end():
+    """קריאה אחורה בבלוקים קטנים - שורות שלמות בלבד, בלי השורה שעדיין נכתבת"""
+    print("🔧 בודק קריאה מסוף הקובץ...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sync_manager.log")
+        _write(path, "".join(f"2025-09-29 20:30:{i:02d},000 - INFO - ✅ הודעה {i}\n" for i in range(50)), 'w')
+        _write(path, "\n2025-09-29 20:31:00,000 - INFO - חלקית")
+
+        lines, offset = read_last_lines(path, 3, block_size=16)
+        assert [line.rsplit(' ', 1)[1] for line in lines] == ["47", "48", "49"]
+        assert offset == os.path.getsize(path) - len("2025-09-29 20:31:00,000 - INFO - חלקית".encode('utf-8'))
+
+        all_lines, _ = read_last_lines(path, 1000, block_size=16)
+        assert len(all_lines) == 50 and all_lines[0].endswith("הודעה 0")
+
+        _write(path, "ללא ירידת שורה", 'w')
+        assert read_last_lines(path, 10) == ([], 0)
+    print("✅ נקראו רק השורות האחרונות")
+
+def test_index_reads_only_appended_lines():
+    """בדיקה חוזרת מפרסרת רק שורות חדשות; קובץ שקוצר או הוחלף נקרא מחדש"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "simple_timebro.log")
+        parsed = []
+
+        def parse(line):
+            parsed.append(line)
+            return {'message': line} if not line.startswith('#') else None
+
+        index = LogTailIndex(parse, max_lines=3)
+        assert index.tail(path) == []
+
+        _write(path, "a\nb\n# הערה\nc\nd\n")
+        assert [entry['message'] for entry in index.tail(path)] == ["c", "d"]
+        assert parsed == ["# הערה", "c", "d"]
+
+        parsed.clear()
+        assert len(index.tail(path)) == 2 and parsed == []
+
+        _write(path, "e\nf-חלקי")
+        assert [entry['message'] for entry in index.tail(path)] == ["c", "d", "e"]
+        _write(path, "\n")
+        assert [entry['message'] for entry in index.tail(path)] == ["d", "e", "f-חלקי"]
+        assert parsed == ["e", "f-חלקי"]
+
+        # rotation - קובץ חדש קצר יותר באותו שם
+        _write(path, "x\n", 'w')
+        assert [entry['message'] for entry in index.tail(path)] == ["x"]
+        os.remove(path)
+        assert index.tail(path) == []
+
+def test_logs_route_merges_files():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            from web_interface import app
+            _write("sync_manager.log", "2025-09-29 20:30:00,000 - INFO - 🔄 מתחיל סינכרון\n", 'w')
+            _write("arcserver_deletion.log", "2025-09-29 20:30:05,000 - ERROR - ❌ שגיאה\n", 'w')
+            client = app.test_client()
+            logs = client.get('/api/logs').get_json()['logs']
+            messages = [log['message'] for log in logs]
+            assert messages.index("❌ שגיאה") < messages.index("🔄 מתחיל סינכרון")
+
+            _write("sync_manager.log", "2025-09-29 20:30:10,000 - INFO - ✅ הסתיים\n")
+            logs = client.get('/api/logs').get_json()['logs']
+            messages = [log['message'] for log in logs]
+            assert messages.index("✅ הסתיים") < messages.index("❌ שגיאה")
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_read_last_lines_from_end()
+    test_index_reads_only_appended_lines()
+    test_logs_route_merges_files()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת קליטת הודעות מהתראות Green API (webhook ותור התראות) ללא רשת
+"""
+
+import os
+import sqlite3
+import tempfile
+import notification_ingestion
+from notification_ingestion import NotificationIngestionService
+
+def _notification(message_id, chat_id="972500000000@c.us", text="שלום", type_webhook="incomingMessageReceived"):
+    return {
+        "typeWebhook": type_webhook,
+        "idMessage": message_id,
+        "timestamp": 1_700_000_000,
+        "senderData": {"chatId": chat_id, "chatName": "דני", "sender": chat_id, "senderName": "דני"},
+        "messageData": {"typeMessage": "textMessage", "textMessageData": {"textMessage": text}},
+    }
+
+def _service(tmp_dir, **kwargs):
+    contacts_db = os.path.join(tmp_dir, "contacts.db")
+    conn = sqlite3.connect(contacts_db)
+    conn.execute("CREATE TABLE contacts (whatsapp_id TEXT, phone_number TEXT, name TEXT)")
+    conn.execute("CREATE TABLE groups (whatsapp_group_id TEXT, subject TEXT)")
+    conn.execute("INSERT INTO contacts VALUES ('972500000000@c.us', '972500000000', 'דני כהן')")
+    conn.commit()
+    conn.close()
+    return NotificationIngestionService(
+        messages_db=os.path.join(tmp_dir, "messages.db"), contacts_db=contacts_db, **kwargs
+    )
+
+def _saved(service):
+    conn = sqlite3.connect(service.messages_db)
+    rows = conn.execute("SELECT id, contact_name, message_body, timestamp, is_from_me FROM messages ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+def test_notification_to_row():
+    """המרת גוף webhook לשורה בטבלת messages"""
+    print("🔧 בודק המרת התראה...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = _service(tmp_dir)
+        row = service.notification_to_row(_notification("A1"))
+        assert row[0] == "A1" and row[1] == "972500000000@c.us"
+        assert row[3] == "דני כהן"  # השם מגיע ממסד אנשי הקשר
+        assert row[4] == "שלום" and row[6] == 1_700_000_000_000 and row[7] is False
+
+        outgoing = service.notification_to_row(_notification("A2", type_webhook="outgoingMessageReceived"))
+        assert outgoing[7] is True
+
+        assert service.notification_to_row({"typeWebhook": "stateInstanceChanged"}) is None
+    print("✅ ההתראה הומרה נכון")
+
+def test_micro_batch_flush_and_duplicates():
+    """הודעות נכתבות במקבץ, והתראה שחוזרת פעמיים נשמרת פעם אחת"""
+    print("🔧 בודק כתיבה במקבצים...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = _service(tmp_dir, batch_size=3)
+        service.add_notification(_notification("B1"))
+        service.add_notification(_notification("B2"))
+        assert not os.path.exists(service.messages_db)  # עדיין במקבץ
+
+        service.add_notification(_notification("B1"))  # מקבץ מלא - נכתב
+        assert [r[0] for r in _saved(service)] == ["B1", "B2"]
+
+        service.add_notification(_notification("B3"))
+        assert service.flush() == 1
+        assert service.stats["saved"] == 3
+    print("✅ המקבצים נכתבו בלי כפילויות")
+
+class FakeQueueClient:
+    """תור התראות מדומה - receiveNotification מחזיר את הראשונה עד שהיא נמחקת"""
+
+    def __init__(self, service, bodies):
+        self.service = service
+        self.queue = [{"receiptId": n, "body": body} for n, body in enumerate(bodies, 1)]
+        self.deleted = []
+
+    def receive_notification(self, receive_timeout=5):
+        if not self.queue:
+            self.service.stop()
+            return True, None
+        return True, self.queue[0]
+
+    def delete_notification(self, receipt_id):
+        # מחיקה רק אחרי שההודעה של ההתראה כבר שמורה במסד
+        body = next(n["body"] for n in self.queue if n["receiptId"] == receipt_id)
+        if body.get("typeWebhook") == "incomingMessageReceived":
+            assert body["idMessage"] in [r[0] for r in _saved(self.service)]
+        self.deleted.append(receipt_id)
+        self.queue = [n for n in self.queue if n["receiptId"] != receipt_id]
+        return True, {"result": True}
+
+def test_queue_mode():
+    """במצב תור כל התראה נמחקת רק אחרי שההודעה שלה נשמרה"""
+    print("🔧 בודק קליטה מתור ההתראות...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = _service(tmp_dir, flush_interval=60)
+        service.client = FakeQueueClient(service, [
+            _notification("C1"),
+            {"typeWebhook": "outgoingMessageStatus", "idMessage": "C1", "status": "read"},
+            _notification("C2", chat_id="120363000000@g.us", text="קבוצה"),
+        ])
+        service.run_forever()
+
+        assert service.client.deleted == [1, 2, 3]
+        saved = _saved(service)
+        assert [r[0] for r in saved] == ["C1", "C2"]
+        assert saved[1][1] == "דני"  # קבוצה לא מוכרת - שם מההתראה
+    print("✅ התור רוקן וההודעות נשמרו")
+
+def test_failed_write_keeps_notification_in_queue():
+    """כשהכתיבה נכשלת ההתראה לא נמחקת - היא מתקבלת שוב ונשמרת פעם אחת"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = _service(tmp_dir, flush_interval=60)
+        service.client = FakeQueueClient(service, [_notification("D1")])
+        original_insert = notification_ingestion.insert_messages
+        failures = []
+
+        def insert_once_failing(conn, rows):
+            if not failures:
+                failures.append(rows)
+                raise sqlite3.OperationalError("database is locked")
+            return original_insert(conn, rows)
+
+        notification_ingestion.insert_messages = insert_once_failing
+        try:
+            service.run_forever()
+        finally:
+            notification_ingestion.insert_messages = original_insert
+
+        assert len(failures) == 1
+        assert service.client.deleted == [1]
+        assert [r[0] for r in _saved(service)] == ["D1"]
+        assert service._pending == [] and service._pending_receipts == []
+
+def test_webhook_requires_token_and_saves_before_reply():
+    cwd = os.getcwd()
+    original_token = os.environ.pop("GREENAPI_WEBHOOK_TOKEN", None)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            import web_interface
+            try:
+                client = web_interface.app.test_client()
+                assert client.post('/api/webhook/green-api', json=_notification("E1")).status_code == 503
+
+                os.environ["GREENAPI_WEBHOOK_TOKEN"] = "secret"
+                assert client.post('/api/webhook/green-api', json=_notification("E1"),
+                                   headers={"Authorization": "Bearer wrong"}).status_code == 401
+                response = client.post('/api/webhook/green-api', json=_notification("E1"),
+                                       headers={"Authorization": "Bearer secret"})
+                assert response.status_code == 200
+
+                # ההודעה כבר במסד כשהתשובה חוזרת - בלי לחכות ל-flusher
+                conn = sqlite3.connect("whatsapp_messages_webjs.db")
+                assert conn.execute("SELECT id FROM messages").fetchall() == [("E1",)]
+                conn.close()
+            finally:
+                if web_interface.ingestion_service:
+                    web_interface.ingestion_service.stop()
+                    web_interface.ingestion_service = None
+        finally:
+            os.environ.pop("GREENAPI_WEBHOOK_TOKEN", None)
+            if original_token is not None:
+                os.environ["GREENAPI_WEBHOOK_TOKEN"] = original_token
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_notification_to_row()
+    test_micro_batch_flush_and_duplicates()
+    test_queue_mode()
+    test_failed_write_keeps_notification_in_queue()
+    test_webhook_requires_token_and_saves_before_reply()
+    print("🎉 כל הבדיקות עברו")
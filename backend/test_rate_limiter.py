@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת מגביל הקצב המשותף (token bucket)
+"""
+
+import threading
+import time
+from rate_limiter import TokenBucketRateLimiter
+
+def test_burst_then_throttle():
+    """בדיקה שה-burst מתאפשר מיד ושאחריו הקריאות מוגבלות לקצב"""
+    print("🔧 בודק burst ומגבלת קצב...")
+
+    limiter = TokenBucketRateLimiter(rate_per_second=20, capacity=5)
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    burst_time = time.monotonic() - start
+    assert burst_time < 0.05, f"burst איטי מדי: {burst_time:.3f}s"
+
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire()
+    throttled_time = time.monotonic() - start
+    # 10 טוקנים בקצב 20 לשנייה = כחצי שנייה
+    assert throttled_time >= 0.4, f"הקצב לא הוגבל: {throttled_time:.3f}s"
+
+    print(f"✅ burst: {burst_time:.3f}s, 10 קריאות נוספות: {throttled_time:.3f}s")
+
+def test_shared_between_threads():
+    """בדיקה שכמה threads חולקים את אותה מכסה"""
+    print("🔧 בודק שיתוף מכסה בין threads...")
+
+    limiter = TokenBucketRateLimiter(rate_per_second=50, capacity=1)
+    calls = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire()
+            with lock:
+                calls.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    assert len(calls) == 20
+    # 20 קריאות, טוקן אחד מיידי והשאר בקצב 50 לשנייה
+    assert elapsed >= 0.35, f"threads עקפו את המגביל: {elapsed:.3f}s"
+    print(f"✅ 20 קריאות מ-4 threads ב-{elapsed:.3f}s")
+
+def test_acquire_timeout():
+    """בדיקת timeout כשאין טוקנים"""
+    limiter = TokenBucketRateLimiter(rate_per_second=1, capacity=1)
+    assert limiter.acquire(timeout=0.01)
+    assert not limiter.acquire(timeout=0.05)
+    print("✅ timeout עובד")
+
+if __name__ == "__main__":
+    test_burst_then_throttle()
+    test_shared_between_threads()
+    test_acquire_timeout()
+    print("🎉 כל הבדיקות עברו")
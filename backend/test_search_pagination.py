@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת חלוקה לעמודים ב-SQL (UNION ALL + keyset) בחיפוש אנשי קשר וקבוצות שמסומנים ליומן
+"""
+
+import os
+import tempfile
+from db_connections import get_connection
+
+def _seed(db_path):
+    conn = get_connection(db_path)
+    for i in range(7):
+        conn.execute("INSERT INTO contacts (whatsapp_id, phone_number, name, type, include_in_timebro, is_displayable) "
+                     "VALUES (?, ?, ?, 'contact', 1, 1)", (f"{i}@c.us", f"97250000000{i}", f"איש קשר {6 - i}"))
+    conn.execute("INSERT INTO contacts (whatsapp_id, phone_number, name, type, include_in_timebro, is_displayable) "
+                 "VALUES ('x@c.us', '972509999999', 'לא ביומן', 'contact', 0, 1)")
+    for i in range(4):
+        conn.execute("INSERT INTO groups (whatsapp_group_id, subject, include_in_timebro) VALUES (?, ?, 1)",
+                     (f"{i}@g.us", f"קבוצה {i}"))
+    conn.commit()
+    conn.close()
+
+def test_calendar_only_keyset_pagination():
+    """מעבר עם cursor מחזיר את אותן שורות ובאותו סדר כמו OFFSET, בלי כפילויות"""
+    print("🔧 בודק חלוקה לעמודים...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            from web_interface import DatabaseManager
+            manager = DatabaseManager()
+            _seed(manager.contacts_db)
+
+            pages = [manager.search_contacts(include_calendar_only=True, page=page, per_page=4)
+                     for page in (1, 2, 3)]
+            by_offset = [(c['type'], c['name']) for result in pages for c in result['contacts']]
+            assert pages[0]['total'] == 11 and pages[0]['total_pages'] == 3
+            assert len(by_offset) == 11
+            # אנשי הקשר ממוינים לפי שם, ואחריהם הקבוצות
+            assert by_offset[0] == ('contact', 'איש קשר 0')
+            assert by_offset[6] == ('contact', 'איש קשר 6')
+            assert by_offset[7:] == [('group', f'קבוצה {i}') for i in range(4)]
+
+            by_cursor = []
+            result = manager.search_contacts(include_calendar_only=True, page=1, per_page=4)
+            while True:
+                by_cursor.extend((c['type'], c['name']) for c in result['contacts'])
+                if not result['next_cursor']:
+                    break
+                result = manager.search_contacts(include_calendar_only=True, per_page=4,
+                                                 after=result['next_cursor'])
+            assert by_cursor == by_offset
+
+            assert 'error' in manager.search_contacts(include_calendar_only=True, after='not-a-cursor')
+        finally:
+            os.chdir(cwd)
+    print("✅ העמודים זהים בשתי השיטות")
+
+def test_counts_are_cached_until_update():
+    """הספירה נשמרת במטמון ומתרעננת אחרי עדכון דרך הממשק"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            from web_interface import DatabaseManager
+            manager = DatabaseManager()
+            _seed(manager.contacts_db)
+            assert manager.search_contacts(include_calendar_only=True)['total'] == 11
+
+            # כתיבה ישירה (תהליך אחר) - הספירה מהמטמון עד שיפוג תוקפה
+            conn = get_connection(manager.contacts_db)
+            conn.execute("UPDATE groups SET include_in_timebro = 0 WHERE whatsapp_group_id = '0@g.us'")
+            conn.commit()
+            conn.close()
+            assert manager.search_contacts(include_calendar_only=True)['total'] == 11
+
+            # עדכון דרך הממשק מנקה את המטמון
+            result = manager.search_contacts(include_calendar_only=True)
+            group_id = next(c['contact_id'] for c in result['contacts'] if c['name'] == 'קבוצה 1')
+            manager.update_group_calendar_status(group_id, False)
+            assert manager.search_contacts(include_calendar_only=True)['total'] == 9
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_calendar_only_keyset_pagination()
+    test_counts_are_cached_until_update()
+    print("🎉 כל הבדיקות עברו")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת ערוץ אירועי הסינכרון (SSE) ופרסום האירועים מ-SyncManager
+"""
+
+import json
+import os
+import tempfile
+import threading
+from sync_events import SyncEventBus, format_sse
+from sync_manager import SyncManager
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+def test_publish_subscribe_and_replay():
+    """מנוי מקבל אירועים חדשים; מנוי עם Last-Event-ID מקבל גם את מה שפספס"""
+    print("🔧 בודק ערוץ אירועים...")
+    bus = SyncEventBus()
+    first = bus.publish("sync", {"sync_id": "a", "status": "running"})
+    live = bus.subscribe()
+    second = bus.publish("item", {"item_id": "7", "success": True})
+
+    assert live.get_nowait() == (second, "item", {"item_id": "7", "success": True})
+    resumed = bus.subscribe(last_event_id=first)
+    assert resumed.get_nowait()[0] == second
+    assert resumed.empty()
+
+    bus.unsubscribe(live)
+    bus.publish("sync", {"sync_id": "a", "status": "completed"})
+    assert live.empty()
+    assert _parse(format_sse((3, "sync", {"sync_id": "א"}))) == (3, "sync", {"sync_id": "א"})
+    print("✅ אירועים מגיעים ומושלמים אחרי התנתקות")
+
+def test_stream_sends_keepalive_and_events():
+    bus = SyncEventBus()
+    stream = bus.stream(keepalive_seconds=0.01)
+    assert next(stream).startswith("retry:")
+    assert next(stream) == ": keepalive\n\n"
+
+    threading.Timer(0.05, bus.publish, ("sync", {"sync_id": "b", "status": "running"})).start()
+    chunk = next(chunk for chunk in stream if not chunk.startswith(":"))
+    assert _parse(chunk)[1:] == ("sync", {"sync_id": "b", "status": "running"})
+    stream.close()
+    assert bus._subscribers == []
+
+def test_sync_manager_publishes_state_and_progress():
+    """שינויי מצב והתקדמות של סינכרון מתפרסמים כאירועי sync"""
+    manager = SyncManager.__new__(SyncManager)
+    manager.active_syncs = {}
+    manager.jobs = None
+    manager.events = SyncEventBus()
+    subscriber = manager.events.subscribe()
+
+    manager._set_sync_state("all_all_1", {"status": "running"})
+    manager._report_progress("all_all_1", done=1, total=4, current_item="972500000000@c.us")
+    manager._report_progress(None, done=2, total=4)  # סינכרון סינכרוני - אין מה לדווח
+    manager._set_sync_state("all_all_1", {"status": "completed", "result": {"success": True}})
+    manager._report_progress("all_all_1", done=4, total=4)  # אחרי הסיום לא דורסים את התוצאה
+
+    events = []
+    while not subscriber.empty():
+        events.append(subscriber.get_nowait()[2])
+    assert [e["status"] for e in events] == ["running", "running", "completed"]
+    assert events[1]["done"] == 1 and events[1]["sync_id"] == "all_all_1"
+    assert manager.get_sync_progress("all_all_1")["result"] == {"success": True}
+
+def test_sse_route_replays_missed_events():
+    """/api/sync/events מחזיר text/event-stream ומשלים אירועים לפי Last-Event-ID"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            from web_interface import app
+            from sync_events import get_sync_event_bus
+            bus = get_sync_event_bus()
+            before = bus.publish("sync", {"sync_id": "x", "status": "running"})
+            missed = bus.publish("sync", {"sync_id": "x", "status": "completed"})
+
+            response = app.test_client().get('/api/sync/events', headers={'Last-Event-ID': str(before)},
+                                              buffered=False)
+            assert response.mimetype == 'text/event-stream'
+            chunks = response.iter_encoded()
+            assert next(chunks).startswith(b"retry:")
+            event_id, event_type, data = _parse(next(chunks).decode('utf-8'))
+            assert (event_id, event_type, data["status"]) == (missed, "sync", "completed")
+            response.close()
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_publish_subscribe_and_replay()
+    test_stream_sends_keepalive_and_events()
+    test_sync_manager_publishes_state_and_progress()
+    test_sse_route_replays_missed_events()
+    print("🎉 כל הבדיקות עברו")
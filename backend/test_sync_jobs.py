@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת תור עבודות הסינכרון (sync_jobs) - כפילויות, עדיפויות, נעילה לפי פריט וחידוש אחרי הפעלה מחדש
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from db_connections import get_connection
+from db_migrations import CALENDAR_DB
+from sync_events import SyncEventBus
+from sync_jobs import MAX_JOB_ATTEMPTS, SyncJobQueue
+from sync_manager import SyncManager
+
+def _quiet(message, level="INFO"):
+    pass
+
+def _queue(tmp_dir, run_job=lambda job: {"success": True}, workers=2):
+    return SyncJobQueue(run_job, os.path.join(tmp_dir, CALENDAR_DB), workers=workers, log=_quiet,
+                        poll_interval=0.05)
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+def test_enqueue_dedupes_and_claims_by_priority():
+    """בקשה זהה מחזירה את אותה עבודה; פריט בודד קודם ל"סנכרן הכל"; פריט שרץ לא נלקח שוב"""
+    print("🔧 בודק תור עבודות...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = _queue(tmp_dir)
+        all_id, created = queue.enqueue("all", "all", "2025-01-01", "2025-01-31")
+        assert created
+        assert queue.enqueue("all", "all", "2025-01-01", "2025-01-31") == (all_id, False)
+        first_id, _ = queue.enqueue("contact", 7, "2025-01-01", "2025-01-31")
+        second_id, created = queue.enqueue("contact", "7", "2025-02-01", "2025-02-28")
+        assert created and second_id != first_id
+        assert queue.queue_position(all_id) == 2
+
+        assert queue.claim_next_job()["sync_id"] == first_id
+        # אותו איש קשר עם תאריכים אחרים ממתין עד שהסינכרון הנוכחי שלו יסתיים
+        assert queue.claim_next_job()["sync_id"] == all_id
+        assert queue.claim_next_job() is None
+
+        queue.finish_job(first_id, result={"success": True, "messages_saved": 3})
+        job = queue.claim_next_job()
+        assert job["sync_id"] == second_id and job["attempts"] == 1
+        assert queue.get_job(first_id)["result"] == {"success": True, "messages_saved": 3}
+
+        # אחרי הסיום אפשר לבקש שוב את אותו סינכרון
+        assert queue.enqueue("contact", "7", "2025-01-01", "2025-01-31")[1]
+    print("✅ כפילויות ועדיפויות תקינות")
+
+def test_interrupted_jobs_are_requeued():
+    """עבודה שהתהליך שלה מת חוזרת לתור עם ה-checkpoint; עבודה שנקטעה שוב ושוב נכשלת"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = _queue(tmp_dir)
+        dead_id, _ = queue.enqueue("all", "all", "2025-01-01", "2025-01-31")
+        own_id, _ = queue.enqueue("group", "5", "2025-01-01", "2025-01-31")
+        alive_id, _ = queue.enqueue("contact", "1", "2025-01-01", "2025-01-31")
+        broken_id, _ = queue.enqueue("contact", "2", "2025-01-01", "2025-01-31")
+        for _ in range(4):
+            queue.claim_next_job()
+        queue.save_progress(dead_id, {"done": 1, "total": 3}, {"completed_items": ["contact:1"]})
+
+        conn = get_connection(queue.db_path)
+        conn.execute("UPDATE sync_jobs SET owner_pid = ? WHERE sync_id = ?", (_dead_pid(), dead_id))
+        conn.execute("UPDATE sync_jobs SET owner_pid = ? WHERE sync_id = ?", (os.getppid(), alive_id))
+        conn.execute("UPDATE sync_jobs SET owner_pid = NULL, attempts = ? WHERE sync_id = ?",
+                     (MAX_JOB_ATTEMPTS, broken_id))
+        conn.commit()
+        conn.close()
+
+        assert queue.recover_interrupted_jobs() == 2
+        assert queue.get_job(own_id)["status"] == "queued"
+        assert queue.get_job(alive_id)["status"] == "running"
+        assert queue.get_job(broken_id)["status"] == "error"
+        resumed = queue.get_job(dead_id)
+        assert resumed["status"] == "queued"
+        assert resumed["checkpoint"] == {"completed_items": ["contact:1"]}
+
+def test_second_queue_keeps_running_job():
+    """תור נוסף באותו תהליך לא מחזיר לתור עבודה שהתור הפעיל מריץ (אותו pid, owner_token אחר)"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        started, release = threading.Event(), threading.Event()
+
+        def run_job(job):
+            started.set()
+            release.wait(5)
+            return {"success": True}
+
+        queue = _queue(tmp_dir, run_job=run_job, workers=1)
+        queue.start()
+        try:
+            sync_id, _ = queue.enqueue("group", "9", "2025-01-01", "2025-01-31")
+            assert started.wait(5)
+            assert _queue(tmp_dir).recover_interrupted_jobs() == 0
+            assert queue.get_job(sync_id)["status"] == "running"
+            assert queue.get_job(sync_id)["attempts"] == 1
+        finally:
+            release.set()
+            queue.stop()
+        assert queue.get_job(sync_id)["status"] == "completed"
+
+def test_web_sync_manager_is_created_once():
+    """שתי בקשות ראשונות במקביל יוצרות SyncManager אחד"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            import web_interface
+            created = []
+
+            def slow_manager():
+                time.sleep(0.05)
+                created.append(object())
+                return created[-1]
+
+            original_class, original_manager = web_interface.SyncManager, web_interface.sync_manager
+            web_interface.SyncManager, web_interface.sync_manager = slow_manager, None
+            try:
+                results = []
+                threads = [threading.Thread(target=lambda: results.append(web_interface.get_sync_manager()))
+                           for _ in range(4)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                assert len(created) == 1
+                assert all(result is created[0] for result in results)
+            finally:
+                web_interface.SyncManager, web_interface.sync_manager = original_class, original_manager
+        finally:
+            os.chdir(cwd)
+
+def test_workers_run_jobs_in_background():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ran = []
+        queue = _queue(tmp_dir, run_job=lambda job: ran.append(job["item_id"]) or {"success": True})
+        queue.start()
+        try:
+            sync_id, _ = queue.enqueue("group", "9", "2025-01-01", "2025-01-31")
+            failing_id, _ = queue.enqueue("bogus", "1", "2025-01-01", "2025-01-31")
+            deadline = time.time() + 5
+            while time.time() < deadline and len(ran) < 2:
+                time.sleep(0.02)
+            time.sleep(0.1)
+        finally:
+            queue.stop()
+        assert sorted(ran) == ["1", "9"]
+        assert queue.get_job(sync_id)["status"] == "completed"
+        assert queue.get_job(failing_id)["status"] == "completed"
+
+def _manager(tmp_dir, synced):
+    """SyncManager בלי Green API - סינכרון פריט רק נרשם"""
+    manager = SyncManager.__new__(SyncManager)
+    manager.active_syncs = {}
+    manager._state_lock = threading.Lock()
+    manager._item_locks = {}
+    manager._item_locks_guard = threading.Lock()
+    manager.events = SyncEventBus()
+    manager.max_workers = 2
+    manager.log = _quiet
+    manager._get_marked_contacts = lambda: [1, 2, 3]
+    manager._get_marked_groups = lambda: [10]
+
+    def sync_item(item_id, start_date, end_date):
+        synced.append(item_id)
+        return {"success": True, "messages_saved": 1, "events_created": 0}
+    manager.sync_contact_messages = sync_item
+    manager.sync_group_messages = sync_item
+    manager.jobs = _queue(tmp_dir, run_job=manager._run_job, workers=1)
+    return manager
+
+def test_sync_all_resumes_from_checkpoint():
+    """"סנכרן הכל" שנקטע ממשיך מהפריט הבא, עם הסיכומים שנשמרו"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        synced = []
+        manager = _manager(tmp_dir, synced)
+        sync_id = manager.start_async_sync("all", "all", "2025-01-01", "2025-01-31")
+        assert manager.get_sync_progress(sync_id)["status"] == "queued"
+        assert manager.start_async_sync("all", "all", "2025-01-01", "2025-01-31") == sync_id
+
+        # ההרצה הקודמת הספיקה לסנכרן את איש קשר 1 לפני שהשרת הופעל מחדש
+        job = manager.jobs.claim_next_job()
+        manager.jobs.save_progress(sync_id, {"done": 1, "total": 4},
+                                   {"completed_items": ["contact:1"], "total_messages": 5, "total_events": 2})
+        conn = get_connection(manager.jobs.db_path)
+        conn.execute("UPDATE sync_jobs SET owner_pid = ? WHERE sync_id = ?", (_dead_pid(), job["sync_id"]))
+        conn.commit()
+        conn.close()
+        manager.active_syncs = {}
+
+        manager.jobs.start()
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline and manager.jobs.get_job(sync_id)["status"] != "completed":
+                time.sleep(0.02)
+        finally:
+            manager.jobs.stop()
+
+        assert synced == [2, 3, 10]
+        result = manager.get_sync_progress(sync_id)["result"]
+        assert result["total_messages"] == 8 and result["total_events"] == 2
+        stored = manager.jobs.get_job(sync_id)
+        assert stored["progress"]["done"] == 4
+        assert stored["checkpoint"]["completed_items"] == ["contact:1", "contact:2", "contact:3", "group:10"]
+
+        # גם אחרי הפעלה מחדש (בלי מצב בזיכרון) הסטטוס נקרא מהתור
+        manager.active_syncs = {}
+        assert manager.get_sync_progress(sync_id)["status"] == "completed"
+        assert manager.get_sync_progress(sync_id)["done"] == 4
+
+if __name__ == "__main__":
+    test_enqueue_dedupes_and_claims_by_priority()
+    test_interrupted_jobs_are_requeued()
+    test_second_queue_keeps_running_job()
+    test_web_sync_manager_is_created_once()
+    test_workers_run_jobs_in_background()
+    test_sync_all_resumes_from_checkpoint()
+    print("🎉 כל הבדיקות עברו")
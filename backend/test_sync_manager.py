@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת SyncManager - סינכרון קבוצה מול Green API מדומה ושמירת היסטוריה מרוכזת ב-_save_messages_to_db
+"""
+
+import os
+import tempfile
+from db_connections import get_connection
+from db_migrations import CONTACTS_DB, MESSAGES_DB, migrate_database
+from sync_manager import SyncManager
+
+class FakeGreenAPIClient:
+    """Green API מדומה - get_state_instance מחזיר (success, data) כמו GreenAPIClient"""
+
+    def __init__(self, state, messages=None):
+        self.state = state
+        self.messages = messages or []
+
+    def get_state_instance(self):
+        return self.state
+
+    def get_chat_history_by_date_range(self, chat_id, start_date, end_date):
+        return self.messages
+
+def _manager(client):
+    """SyncManager בלי הרשאות Green API ובלי מסדי נתונים - השמירה והיומן מדומים"""
+    manager = SyncManager.__new__(SyncManager)
+    manager.green_api_client = client
+    manager.log = lambda message, level="INFO": None
+    manager.saved = []
+    manager._save_messages_to_db = lambda messages, chat_id: manager.saved.extend(messages) or len(messages)
+    manager._create_calendar_events = lambda chat_id, start_dt, end_dt: 1
+    manager._mark_for_calendar = lambda chat_id, is_contact=True: None
+    manager._update_sync_status = lambda *args: None
+    return manager
+
+def test_group_sync_unpacks_instance_state():
+    """get_state_instance מחזיר tuple - סינכרון קבוצה מצליח כשהמופע מורשה ונכשל עם השגיאה כשלא"""
+    print("🔧 בודק סינכרון קבוצה...")
+    messages = [{"idMessage": "G1", "timestamp": 1700000000, "textMessage": "שלום"}]
+    manager = _manager(FakeGreenAPIClient((True, {"stateInstance": "authorized"}), messages))
+    result = manager.sync_group_messages("120363000000000000@g.us", "2025-01-01", "2025-01-31")
+    assert result["success"], result
+    assert result["messages_saved"] == 1
+    assert manager.saved == messages
+
+    manager = _manager(FakeGreenAPIClient((False, {"error": "HTTP 401"})))
+    result = manager.sync_group_messages("120363000000000000@g.us", "2025-01-01", "2025-01-31")
+    assert not result["success"]
+    assert "HTTP 401" in result["error"]
+    assert manager.saved == []
+    print("✅ סינכרון הקבוצה בודק את מצב המופע")
+
+def test_save_messages_batches_history_items():
+    """
+    פריטי היסטוריה של Green API נשמרים במקבץ אחד: שם איש הקשר נשלף פעם אחת לצ'אט,
+    המזהה נלקח מ-idMessage, הזמן מומר למילישניות והספירה כוללת רק הודעות חדשות
+    """
+    print("🔧 בודק שמירת הודעות מרוכזת...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = SyncManager.__new__(SyncManager)
+        manager.log = lambda message, level="INFO": None
+        manager.messages_db = os.path.join(tmp_dir, MESSAGES_DB)
+        manager.contacts_db = os.path.join(tmp_dir, CONTACTS_DB)
+        migrate_database(manager.messages_db, manager.log)
+        migrate_database(manager.contacts_db, manager.log)
+
+        chat_id = "972501234567@c.us"
+        conn = get_connection(manager.contacts_db)
+        conn.execute("INSERT INTO contacts (whatsapp_id, name, type) VALUES (?, 'לקוח', 'contact')", (chat_id,))
+        conn.commit()
+        conn.close()
+
+        name_lookups = []
+        lookup_contact_name = manager._get_contact_name
+        manager._get_contact_name = lambda chat: name_lookups.append(chat) or lookup_contact_name(chat)
+
+        first = [
+            {"idMessage": "A1", "timestamp": 1700000000, "textMessage": "שלום", "type": "incoming"},
+            {"idMessage": "A2", "time": 1700000060, "textMessage": "מה נשמע", "type": "outgoing"},
+        ]
+        second = first + [
+            {"idMessage": "A3", "timestamp": 1700000120, "typeMessage": "imageMessage", "type": "incoming"},
+        ]
+        assert manager._save_messages_to_db(first, chat_id) == 2
+        assert manager._save_messages_to_db(second, chat_id) == 1
+        assert name_lookups == [chat_id, chat_id]
+
+        conn = get_connection(manager.messages_db, read_only=True)
+        rows = conn.execute("""
+            SELECT id, contact_name, message_body, message_type, timestamp, is_from_me
+            FROM messages WHERE chat_id = ? ORDER BY timestamp
+        """, (chat_id,)).fetchall()
+        conn.close()
+        assert [tuple(row) for row in rows] == [
+            ("A1", "לקוח", "שלום", "incoming", 1700000000000, 0),
+            ("A2", "לקוח", "מה נשמע", "outgoing", 1700000060000, 1),
+            ("A3", "לקוח", None, "imageMessage", 1700000120000, 0),
+        ]
+    print("✅ ההודעות נשמרו פעם אחת, עם זמן במילישניות")
+
+if __name__ == "__main__":
+    test_group_sync_unpacks_instance_state()
+    test_save_messages_batches_history_items()
+    print("🎉 כל הבדיקות עברו")
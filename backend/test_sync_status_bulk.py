@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בדיקת טבלת sync_status (שורה אחת לכל פריט) ושליפת סטטוס מרוכזת לעמוד שלם
+"""
+
+import os
+import sqlite3
+import tempfile
+from db_migrations import CALENDAR_DB, migrate_database
+from sync_events import SyncEventBus
+from sync_manager import SyncManager
+
+def _manager(db_path):
+    """SyncManager בלי הרשאות Green API - רק החלקים של סטטוס הסינכרון"""
+    manager = SyncManager.__new__(SyncManager)
+    manager.calendar_db = db_path
+    manager.events = SyncEventBus()
+    manager.log = lambda message, level="INFO": None
+    return manager
+
+def test_migration_keeps_latest_row_per_item():
+    """במסד ישן עם שורה לכל סינכרון - נשארת רק השורה האחרונה של כל פריט"""
+    print("🔧 בודק מיגרציית sync_status...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CALENDAR_DB)
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE sync_status (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, item_id TEXT NOT NULL, item_type TEXT NOT NULL,
+                last_sync DATETIME, success BOOLEAN, messages_count INTEGER, events_count INTEGER,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.executemany("INSERT INTO sync_status (item_id, item_type, last_sync, success, messages_count) "
+                         "VALUES (?, ?, ?, ?, ?)", [
+                             ("1", "contact", "2025-01-02 10:00:00", 1, 5),
+                             ("1", "contact", "2025-01-01 10:00:00", 0, 1),
+                             ("1", "contact", "2025-01-03 10:00:00", 1, 7),
+                             ("1", "group", "2025-01-01 10:00:00", 1, 2),
+                             ("2", "contact", "2025-01-01 10:00:00", 1, 3),
+                         ])
+        conn.commit()
+        conn.close()
+
+        assert migrate_database(db_path, lambda _: None) > 0
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT item_id, item_type, messages_count FROM sync_status "
+                            "ORDER BY item_id, item_type").fetchall()
+        conn.close()
+        assert rows == [("1", "contact", 7), ("1", "group", 2), ("2", "contact", 3)]
+    print("✅ נשארה שורה אחת לכל פריט")
+
+def test_bulk_lookup_uses_one_row_per_item():
+    """_update_sync_status מחליף את השורה הקיימת, ו-get_sync_statuses מחזיר את כל העמוד בבת אחת"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, CALENDAR_DB)
+        migrate_database(db_path, lambda _: None)
+        manager = _manager(db_path)
+        manager.STATUS_LOOKUP_CHUNK = 2
+
+        manager._update_sync_status(1, "contact", False, 1, 0)
+        manager._update_sync_status(1, "contact", True, 9, 2)
+        manager._update_sync_status("3", "contact", True, 4, 1)
+        manager._update_sync_status("1", "group", True, 6, 0)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM sync_status").fetchone()[0] == 3
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM sync_status WHERE item_id IN (?, ?) AND item_type = ?",
+            ("1", "3", "contact")))
+        conn.close()
+        assert "idx_sync_status_item" in plan, plan
+
+        statuses = manager.get_sync_statuses([1, "2", "3", "1"], "contact")
+        assert list(statuses) == ["1", "2", "3"]
+        assert statuses["1"]["success"] is True and statuses["1"]["messages_count"] == 9
+        assert statuses["2"] == {"last_sync": None, "success": False, "messages_count": 0, "events_count": 0}
+        assert statuses["3"]["events_count"] == 1
+        assert manager.get_sync_statuses(["1"], "group")["1"]["messages_count"] == 6
+        assert manager.get_sync_statuses([]) == {}
+
+def test_bulk_status_route_validates_input():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # web_interface יוצר קבצי לוג ו-credentials בתיקייה הנוכחית
+        os.chdir(tmp_dir)
+        try:
+            import web_interface
+            migrate_database(CALENDAR_DB, lambda _: None)
+            original = web_interface.sync_manager
+            web_interface.sync_manager = _manager(CALENDAR_DB)
+            web_interface.sync_manager._update_sync_status("5", "group", True, 2, 1)
+            try:
+                client = web_interface.app.test_client()
+                response = client.post('/api/sync/status/items',
+                                       json={"item_ids": ["5", "6"], "item_type": "group"})
+                statuses = response.get_json()["statuses"]
+                assert statuses["5"]["messages_count"] == 2 and statuses["6"]["last_sync"] is None
+
+                assert client.post('/api/sync/status/items', json={"item_ids": "5"}).status_code == 400
+                assert client.post('/api/sync/status/items',
+                                   json={"item_ids": ["5"], "item_type": "x"}).status_code == 400
+                too_many = ["1"] * (web_interface.MAX_BULK_STATUS_ITEMS + 1)
+                assert client.post('/api/sync/status/items', json={"item_ids": too_many}).status_code == 400
+            finally:
+                web_interface.sync_manager = original
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_migration_keeps_latest_row_per_item()
+    test_bulk_lookup_uses_one_row_per_item()
+    test_bulk_status_route_validates_input()
+    print("🎉 כל הבדיקות עברו")
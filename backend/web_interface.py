@@ -4,27 +4,29 @@
 ממשק Web לניהול טבלאות Contacts ו-Groups
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
-import sqlite3
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory
 import json
+import base64
+import hmac
+import threading
 import urllib.parse
 import time
 import logging
 from datetime import datetime
 import os
-import re
+from db_connections import get_connection
+from db_migrations import migrate_database
+from fts_search import fts_match_query
+from contact_stats import read_contact_stats
+from calendar_stats import read_calendar_event_stats
 from sync_manager import SyncManager
+from sync_events import get_sync_event_bus
+from log_tail import LogTailIndex
+from notification_ingestion import NotificationIngestionService
 from credential_manager import GreenAPICredentials
 from green_api_client import GreenAPITester
 from auth_manager import init_auth_manager, require_auth, get_current_user
 
-# Register REGEXP function for SQLite
-def regexp(pattern, string):
-    """Custom REGEXP function for SQLite"""
-    if string is None:
-        return False
-    return re.search(pattern, string) is not None
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,20 +40,77 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# מפתח המיון של איש קשר ברשימות החיפוש
+CONTACT_SORT_KEY = "COALESCE(NULLIF(name, ''), NULLIF(push_name, ''), NULLIF(phone_number, ''), '~')"
+
+def encode_page_cursor(sort_group, sort_key, row_id):
+    """cursor לעמוד הבא - מפתח המיון של השורה האחרונה בעמוד"""
+    raw = json.dumps([sort_group, sort_key, row_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_page_cursor(cursor_token):
+    """פענוח cursor שהוחזר בתשובה קודמת (ValueError אם הוא לא תקין)"""
+    try:
+        sort_group, sort_key, row_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode('ascii')))
+    except Exception:
+        raise ValueError('cursor לא תקין')
+    return int(sort_group), str(sort_key), int(row_id)
+
 class DatabaseManager:
+    # ספירת התוצאות נשמרת לזמן קצר - מעבר בין עמודים לא סופר מחדש את כל הטבלה
+    COUNT_CACHE_TTL = 30  # שניות
+    COUNT_CACHE_MAX_ENTRIES = 256
+    # לוח הבקרה מבקש סטטיסטיקות בכל טעינה - כל הבקשות בחלון הזה מקבלות את אותה תוצאה
+    STATS_CACHE_TTL = 10  # שניות
+    
     def __init__(self):
         self.contacts_db = "whatsapp_contacts_groups.db"
         self.groups_db = "whatsapp_contacts_groups.db"
         self.calendar_db = "timebro_calendar.db"
+        self.messages_db = "whatsapp_messages_webjs.db"
+        self._count_cache = {}
+        self._count_cache_lock = threading.Lock()
+        self._stats_cache = None  # (stats, זמן החישוב)
+        migrate_database(self.contacts_db)
+        migrate_database(self.messages_db)
+        migrate_database(self.calendar_db)
+    
+    def _cached_count(self, cursor, query, params):
+        """הרצת שאילתת ספירה, או החזרת התוצאה מהמטמון אם היא עדיין בתוקף"""
+        key = (query, tuple(params))
+        now = time.monotonic()
+        with self._count_cache_lock:
+            cached = self._count_cache.get(key)
+        if cached and now - cached[1] < self.COUNT_CACHE_TTL:
+            return cached[0]
+        
+        cursor.execute(query, params)
+        count = cursor.fetchone()[0]
+        
+        with self._count_cache_lock:
+            if len(self._count_cache) >= self.COUNT_CACHE_MAX_ENTRIES:
+                self._count_cache = {k: v for k, v in self._count_cache.items()
+                                     if now - v[1] < self.COUNT_CACHE_TTL}
+            self._count_cache[key] = (count, now)
+        return count
+    
+    def _invalidate_counts(self):
+        """ניקוי מטמון הספירות והסטטיסטיקות אחרי שינוי שמשפיע על תוצאות החיפוש"""
+        with self._count_cache_lock:
+            self._count_cache.clear()
+            self._stats_cache = None
     
     def search_contacts(self, search_term="", phone_filter="", date_from="", date_to="", 
                        include_calendar_only=False, israeli_only=False, business_only=False,
-                       personal_only=False, page=1, per_page=50):
-        """חיפוש אנשי קשר עם פילטרים"""
+                       personal_only=False, page=1, per_page=50, after=None):
+        """
+        חיפוש אנשי קשר עם פילטרים
+        
+        after: cursor מהתשובה הקודמת (next_cursor) - העמוד הבא נשלף לפי מפתח המיון
+        במקום OFFSET, כך שכל עמוד עולה כמו העמוד הראשון
+        """
         try:
-            conn = sqlite3.connect(self.contacts_db)
-            # Register custom REGEXP function
-            conn.create_function("REGEXP", 2, regexp)
+            conn = get_connection(self.contacts_db, read_only=True)
             cursor = conn.cursor()
             
             # בניית שאילתה
@@ -59,13 +118,27 @@ class DatabaseManager:
             params = []
             
             # פילטר בסיסי - הסתרת רשומות ריקות לחלוטין
-            # חייב להיות לפחות שם תקין (לא רק מספרים או תווים מיוחדים)
-            where_conditions.append("(name IS NOT NULL AND name != '' AND name NOT REGEXP '^[0-9]+$' AND LENGTH(TRIM(name)) > 2 OR push_name IS NOT NULL AND push_name != '')")
+            # חייב להיות לפחות שם תקין (לא רק מספרים) - הדגל מחושב בזמן הכתיבה (contact_display)
+            where_conditions.append("is_displayable = 1")
+            
+            # תנאי החיפוש לקבוצות (רק במצב include_calendar_only)
+            group_search_condition = ""
+            group_params = []
+            next_cursor = None
             
             if search_term:
-                # חיפוש גם לפי שם חברה
-                where_conditions.append("(name LIKE ? OR push_name LIKE ? OR phone_number LIKE ? OR company_name LIKE ?)")
-                params.extend([f"%{search_term}%", f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"])
+                # חיפוש גם לפי שם חברה - דרך אינדקס ה-FTS, LIKE רק לביטוי קצר מ-3 תווים
+                fts_query = fts_match_query(search_term)
+                if fts_query:
+                    where_conditions.append("contact_id IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)")
+                    params.append(fts_query)
+                    group_search_condition = " AND group_id IN (SELECT rowid FROM groups_fts WHERE groups_fts MATCH ?)"
+                    group_params = [fts_query]
+                else:
+                    where_conditions.append("(name LIKE ? OR push_name LIKE ? OR phone_number LIKE ? OR company_name LIKE ?)")
+                    params.extend([f"%{search_term}%", f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"])
+                    group_search_condition = " AND (subject LIKE ? OR description LIKE ? OR company_name LIKE ?)"
+                    group_params = [f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"]
             
             if phone_filter:
                 # חיפוש טלפון - עם ובלי קידומת מדינה
@@ -99,74 +172,54 @@ class DatabaseManager:
                     # חייב להיות שם אמיתי (לא ריק) ומספר טלפון
                     where_clause += " AND ((is_saved = 1 AND (name IS NOT NULL AND name != '' OR push_name IS NOT NULL AND push_name != '')) OR (google_contact_name IS NOT NULL AND google_contact_name != '')) AND phone_number IS NOT NULL AND phone_number != ''"
                 
-                # ספירת תוצאות - אנשי קשר
-                count_query_contacts = f"SELECT COUNT(*) FROM contacts WHERE {where_clause} AND include_in_timebro = 1 AND type = 'contact'"
-                cursor.execute(count_query_contacts, params)
-                contacts_count = cursor.fetchone()[0]
-                
-                # ספירת תוצאות - קבוצות
-                count_query_groups = f"SELECT COUNT(*) FROM groups WHERE include_in_timebro = 1"
-                if search_term:
-                    # חיפוש גם לפי שם חברה בקבוצות
-                    count_query_groups += " AND (subject LIKE ? OR description LIKE ? OR company_name LIKE ?)"
-                    group_params = [f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"]
-                else:
-                    group_params = []
-                cursor.execute(count_query_groups, group_params)
-                groups_count = cursor.fetchone()[0]
-                
-                total_results = contacts_count + groups_count
-                
-                # שאילתת נתונים - אנשי קשר
-                offset = (page - 1) * per_page
-                query_contacts = f"""
-                    SELECT contact_id, whatsapp_id, phone_number, 
-                           COALESCE(NULLIF(name, ''), NULLIF(push_name, ''), NULLIF(phone_number, ''), whatsapp_id) as name,
-                           push_name,
-                           is_business, is_saved, type, include_in_timebro, timebro_priority,
-                           created_at, updated_at, company_name, google_contact_name, whatsapp_personal_name
-                    FROM contacts 
-                    WHERE {where_clause} AND include_in_timebro = 1 AND type = 'contact'
-                    ORDER BY COALESCE(NULLIF(name, ''), NULLIF(push_name, ''), NULLIF(phone_number, ''), '~')
+                # ספירת תוצאות - אנשי קשר וקבוצות בשאילתה אחת (נשמרת במטמון)
+                count_query = f"""
+                    SELECT (SELECT COUNT(*) FROM contacts
+                            WHERE {where_clause} AND include_in_timebro = 1 AND type = 'contact')
+                         + (SELECT COUNT(*) FROM groups WHERE include_in_timebro = 1{group_search_condition})
                 """
+                total_results = self._cached_count(cursor, count_query, params + group_params)
                 
-                # שאילתת נתונים - קבוצות
-                query_groups = """
-                    SELECT group_id as contact_id, whatsapp_group_id as whatsapp_id, '' as phone_number,
-                           subject as name, '' as push_name,
-                           0 as is_business, 0 as is_saved, 'group' as type, 
-                           include_in_timebro, timebro_priority,
-                           created_at, updated_at, company_name, '' as google_contact_name, '' as whatsapp_personal_name
-                    FROM groups 
-                    WHERE include_in_timebro = 1
+                # שאילתת נתונים - אנשי הקשר ואחריהם הקבוצות, ממוינים ומחולקים לעמודים ב-SQL
+                query = f"""
+                    SELECT * FROM (
+                        SELECT contact_id, whatsapp_id, phone_number, 
+                               COALESCE(NULLIF(name, ''), NULLIF(push_name, ''), NULLIF(phone_number, ''), whatsapp_id) as name,
+                               push_name,
+                               is_business, is_saved, type, include_in_timebro, timebro_priority,
+                               created_at, updated_at, company_name, google_contact_name, whatsapp_personal_name,
+                               0 as sort_group, {CONTACT_SORT_KEY} as sort_key
+                        FROM contacts 
+                        WHERE {where_clause} AND include_in_timebro = 1 AND type = 'contact'
+                        UNION ALL
+                        SELECT group_id as contact_id, whatsapp_group_id as whatsapp_id, '' as phone_number,
+                               subject as name, '' as push_name,
+                               0 as is_business, 0 as is_saved, 'group' as type, 
+                               include_in_timebro, timebro_priority,
+                               created_at, updated_at, company_name, '' as google_contact_name, '' as whatsapp_personal_name,
+                               1 as sort_group, COALESCE(subject, '') as sort_key
+                        FROM groups 
+                        WHERE include_in_timebro = 1{group_search_condition}
+                    )
                 """
-                # הוספת תנאי חיפוש לקבוצות גם
-                if search_term:
-                    query_groups += " AND (subject LIKE ? OR description LIKE ? OR company_name LIKE ?)"
-                query_groups += " ORDER BY subject"
-                
-                # ביצוע השאילתות
-                cursor.execute(query_contacts, params)
-                contacts_results = cursor.fetchall()
+                query_params = params + group_params
                 
-                # הכנת פרמטרים לקבוצות
-                group_params = []
-                if search_term:
-                    group_params = [f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"]
-                
-                if search_term:
-                    cursor.execute(query_groups, group_params)
+                if after:
+                    # keyset - המשך אחרי השורה האחרונה של העמוד הקודם
+                    query += " WHERE (sort_group, sort_key, contact_id) > (?, ?, ?)"
+                    query_params.extend(decode_page_cursor(after))
+                    query += " ORDER BY sort_group, sort_key, contact_id LIMIT ?"
+                    query_params.append(per_page)
                 else:
-                    cursor.execute(query_groups)
-                groups_results = cursor.fetchall()
+                    query += " ORDER BY sort_group, sort_key, contact_id LIMIT ? OFFSET ?"
+                    query_params.extend([per_page, (page - 1) * per_page])
                 
-                # שילוב התוצאות
-                all_results = contacts_results + groups_results
+                cursor.execute(query, query_params)
+                results = cursor.fetchall()
                 
-                # pagination ידני
-                start_idx = (page - 1) * per_page
-                end_idx = start_idx + per_page
-                results = all_results[start_idx:end_idx]
+                if len(results) == per_page:
+                    last = results[-1]
+                    next_cursor = encode_page_cursor(last[-2], last[-1], last[0])
             else:
                 where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
                 
@@ -178,8 +231,7 @@ class DatabaseManager:
                 
                 # ספירת תוצאות
                 count_query = f"SELECT COUNT(*) FROM contacts WHERE {where_clause}"
-                cursor.execute(count_query, params)
-                total_results = cursor.fetchone()[0]
+                total_results = self._cached_count(cursor, count_query, params)
                 
                 # שאילתת נתונים עם pagination
                 offset = (page - 1) * per_page
@@ -191,7 +243,7 @@ class DatabaseManager:
                            created_at, updated_at, company_name, google_contact_name, whatsapp_personal_name
                     FROM contacts 
                     WHERE {where_clause}
-                    ORDER BY COALESCE(NULLIF(name, ''), NULLIF(push_name, ''), NULLIF(phone_number, ''), '~')
+                    ORDER BY {CONTACT_SORT_KEY}
                     LIMIT ? OFFSET ?
                 """
                 params.extend([per_page, offset])
@@ -216,7 +268,8 @@ class DatabaseManager:
                 'total': total_results,
                 'page': page,
                 'per_page': per_page,
-                'total_pages': (total_results + per_page - 1) // per_page
+                'total_pages': (total_results + per_page - 1) // per_page,
+                'next_cursor': next_cursor
             }
             
         except Exception as e:
@@ -226,7 +279,7 @@ class DatabaseManager:
                      include_calendar_only=False, page=1, per_page=50):
         """חיפוש קבוצות עם פילטרים"""
         try:
-            conn = sqlite3.connect(self.groups_db)
+            conn = get_connection(self.groups_db, read_only=True)
             cursor = conn.cursor()
             
             # בניית שאילתה
@@ -234,8 +287,13 @@ class DatabaseManager:
             params = []
             
             if search_term:
-                where_conditions.append("(subject LIKE ? OR description LIKE ?)")
-                params.extend([f"%{search_term}%", f"%{search_term}%"])
+                fts_query = fts_match_query(search_term, columns=("subject", "description"))
+                if fts_query:
+                    where_conditions.append("group_id IN (SELECT rowid FROM groups_fts WHERE groups_fts MATCH ?)")
+                    params.append(fts_query)
+                else:
+                    where_conditions.append("(subject LIKE ? OR description LIKE ?)")
+                    params.extend([f"%{search_term}%", f"%{search_term}%"])
             
             if date_from:
                 where_conditions.append("DATE(created_at) >= ?")
@@ -292,10 +350,61 @@ class DatabaseManager:
         except Exception as e:
             return {'error': str(e)}
     
+    def search_messages(self, search_term="", page=1, per_page=50):
+        """חיפוש בתוכן ההודעות (אינדקס messages_fts)"""
+        try:
+            conn = get_connection(self.messages_db, read_only=True)
+            cursor = conn.cursor()
+            
+            fts_query = fts_match_query(search_term)
+            if fts_query:
+                where_clause = "rowid IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)"
+                params = [fts_query]
+            elif search_term:
+                where_clause = "(message_body LIKE ? OR contact_name LIKE ?)"
+                params = [f"%{search_term}%", f"%{search_term}%"]
+            else:
+                where_clause = "1=1"
+                params = []
+            
+            # ספירת תוצאות
+            cursor.execute(f"SELECT COUNT(*) FROM messages WHERE {where_clause}", params)
+            total_results = cursor.fetchone()[0]
+            
+            # שאילתת נתונים עם pagination - ההודעות החדשות קודם
+            offset = (page - 1) * per_page
+            query = f"""
+                SELECT id, chat_id, contact_number, contact_name, message_body, message_type,
+                       timestamp, is_from_me
+                FROM messages
+                WHERE {where_clause}
+                ORDER BY timestamp DESC
+                LIMIT ? OFFSET ?
+            """
+            cursor.execute(query, params + [per_page, offset])
+            results = cursor.fetchall()
+            
+            columns = ['id', 'chat_id', 'contact_number', 'contact_name', 'message_body', 'message_type',
+                       'timestamp', 'is_from_me']
+            messages = [dict(zip(columns, row)) for row in results]
+            
+            conn.close()
+            
+            return {
+                'messages': messages,
+                'total': total_results,
+                'page': page,
+                'per_page': per_page,
+                'total_pages': (total_results + per_page - 1) // per_page
+            }
+            
+        except Exception as e:
+            return {'error': str(e)}
+    
     def update_contact_calendar_status(self, contact_id, add_to_calendar):
         """עדכון סטטוס include_in_timebro של איש קשר"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -306,6 +415,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             return {'success': True}
         except Exception as e:
@@ -314,7 +424,7 @@ class DatabaseManager:
     def update_contact_company_name(self, contact_id, company_name):
         """עדכון שם חברה של איש קשר"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -325,6 +435,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             return {'success': True}
         except Exception as e:
@@ -333,7 +444,7 @@ class DatabaseManager:
     def update_group_calendar_status(self, group_id, add_to_calendar):
         """עדכון סטטוס include_in_timebro של קבוצה"""
         try:
-            conn = sqlite3.connect(self.groups_db)
+            conn = get_connection(self.groups_db)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -344,6 +455,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             return {'success': True}
         except Exception as e:
@@ -352,7 +464,7 @@ class DatabaseManager:
     def update_group_company_name(self, group_id, company_name):
         """עדכון שם חברה של קבוצה"""
         try:
-            conn = sqlite3.connect(self.groups_db)
+            conn = get_connection(self.groups_db)
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -363,6 +475,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             return {'success': True}
         except Exception as e:
@@ -371,16 +484,9 @@ class DatabaseManager:
     def update_contact_google_contact_name(self, contact_id, google_contact_name):
         """עדכון שם Google Contact של איש קשר"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
-            # בדיקה אם השדה קיים, אם לא - נוסיף אותו
-            cursor.execute("PRAGMA table_info(contacts)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            if 'google_contact_name' not in columns:
-                cursor.execute("ALTER TABLE contacts ADD COLUMN google_contact_name TEXT")
-            
             cursor.execute("""
                 UPDATE contacts 
                 SET google_contact_name = ?, updated_at = CURRENT_TIMESTAMP
@@ -389,6 +495,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             return {'success': True, 'google_contact_name': google_contact_name}
         except Exception as e:
@@ -397,16 +504,9 @@ class DatabaseManager:
     def update_contact_whatsapp_name(self, contact_id, whatsapp_name):
         """עדכון שם וואטסאפ של איש קשר"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
-            # בדיקה אם השדה קיים, אם לא - נוסיף אותו
-            cursor.execute("PRAGMA table_info(contacts)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            if 'whatsapp_personal_name' not in columns:
-                cursor.execute("ALTER TABLE contacts ADD COLUMN whatsapp_personal_name TEXT")
-            
             cursor.execute("""
                 UPDATE contacts 
                 SET whatsapp_personal_name = ?, updated_at = CURRENT_TIMESTAMP
@@ -415,6 +515,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
 
             return {'success': True, 'whatsapp_name': whatsapp_name}
         except Exception as e:
@@ -423,7 +524,7 @@ class DatabaseManager:
     def add_contact_to_google(self, contact_id, name, phone, company, email):
         """הוספת איש קשר ל-Google Contacts"""
         try:
-            conn = sqlite3.connect(self.contacts_db)
+            conn = get_connection(self.contacts_db)
             cursor = conn.cursor()
             
             # עדכון השדות במסד הנתונים
@@ -437,6 +538,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             # כאן תהיה אינטגרציה עם Google Contacts API
             # כרגע זה רק סימולציה
@@ -453,7 +555,7 @@ class DatabaseManager:
     def delete_group(self, group_id):
         """מחיקת קבוצה מהמסד הנתונים"""
         try:
-            conn = sqlite3.connect(self.groups_db)
+            conn = get_connection(self.groups_db)
             cursor = conn.cursor()
             
             # בדיקה אם הקבוצה קיימת
@@ -469,45 +571,33 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_counts()
             
             return {'success': True, 'message': f'הקבוצה "{group[0]}" נמחקה בהצלחה'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
     def get_statistics(self):
-        """קבלת סטטיסטיקות כלליות"""
+        """קבלת סטטיסטיקות כלליות (מהמטמון אם חושבו בשניות האחרונות)"""
+        now = time.monotonic()
+        with self._count_cache_lock:
+            cached = self._stats_cache
+        if cached and now - cached[1] < self.STATS_CACHE_TTL:
+            return dict(cached[0])
+        
+        stats = self._compute_statistics()
+        with self._count_cache_lock:
+            self._stats_cache = (stats, now)
+        return dict(stats)
+    
+    def _compute_statistics(self):
+        """חישוב הסטטיסטיקות - מוני אנשי הקשר נשמרים בטבלת contact_stats"""
         stats = {}
         
         try:
-            conn = sqlite3.connect(self.contacts_db)
-            cursor = conn.cursor()
-            
-            # סטטיסטיקות אנשי קשר
-            cursor.execute("SELECT COUNT(*) FROM contacts WHERE type = 'contact'")
-            stats['total_contacts'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM contacts WHERE type = 'contact' AND include_in_timebro = 1")
-            stats['contacts_in_calendar'] = cursor.fetchone()[0]
-            
-            # סטטיסטיקות קבוצות
-            cursor.execute("SELECT COUNT(*) FROM contacts WHERE type = 'group'")
-            stats['total_groups'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM groups WHERE include_in_timebro = 1")
-            stats['groups_in_calendar'] = cursor.fetchone()[0]
-            
-            # בדיקה אם יש שדה is_israeli
-            cursor.execute("PRAGMA table_info(contacts)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            if 'is_israeli' in columns:
-                cursor.execute("SELECT COUNT(*) FROM contacts WHERE type = 'contact' AND is_israeli = 1")
-                stats['israeli_contacts'] = cursor.fetchone()[0]
-            else:
-                # חישוב ישראלים לפי קידומת 972
-                cursor.execute("SELECT COUNT(*) FROM contacts WHERE type = 'contact' AND phone_number LIKE '972%'")
-                stats['israeli_contacts'] = cursor.fetchone()[0]
-            
+            conn = get_connection(self.contacts_db, read_only=True)
+            # total_contacts, contacts_in_calendar, total_groups, groups_in_calendar, israeli_contacts (קידומת 972)
+            stats.update(read_contact_stats(conn))
             conn.close()
         except Exception as e:
             print(f"⚠️ שגיאה בסטטיסטיקות: {e}")
@@ -519,23 +609,12 @@ class DatabaseManager:
         
         # סטטיסטיקות סינכרון
         try:
-            calendar_conn = sqlite3.connect(self.calendar_db)
+            calendar_conn = get_connection(self.calendar_db, read_only=True)
             calendar_cursor = calendar_conn.cursor()
             
-            # ספירת אירועים שנוצרו
-            calendar_cursor.execute("SELECT COUNT(*) FROM calendar_events")
-            stats['total_calendar_events'] = calendar_cursor.fetchone()[0]
-            
-            # אירועים מהתקופה האחרונה (30 יום)
-            from datetime import datetime, timedelta
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            calendar_cursor.execute("SELECT COUNT(*) FROM calendar_events WHERE created_at >= ?", (thirty_days_ago,))
-            stats['recent_calendar_events'] = calendar_cursor.fetchone()[0]
-            
-            # אירועים מאוגוסט 2025
-            august_2025 = datetime(2025, 8, 1)
-            calendar_cursor.execute("SELECT COUNT(*) FROM calendar_events WHERE created_at >= ?", (august_2025,))
-            stats['august_2025_events'] = calendar_cursor.fetchone()[0]
+            # total_calendar_events, recent_calendar_events (30 יום), august_2025_events -
+            # מהספירה היומית שמתעדכנת ע"י triggers
+            stats.update(read_calendar_event_stats(calendar_conn))
             
             # בדיקת סטטוס סינכרון אחרון
             calendar_cursor.execute("SELECT last_sync, messages_count, events_count FROM sync_status ORDER BY last_sync DESC LIMIT 1")
@@ -564,20 +643,34 @@ class DatabaseManager:
 # יצירת מופע של מנהל הנתונים
 db_manager = DatabaseManager()
 
-# יצירת מופע של מנהל הסינכרון - רק כשצריך
+# מופע יחיד של מנהל הסינכרון - נוצר בעליית השרת, או בבקשה הראשונה אם לא הצליח
 sync_manager = None
+_sync_manager_lock = threading.Lock()
 
 def get_sync_manager():
-    """יצירת SyncManager רק כשצריך"""
+    """יצירת SyncManager רק כשצריך - פעם אחת בתהליך, גם כששתי בקשות מגיעות יחד"""
     global sync_manager
     if sync_manager is None:
-        try:
-            sync_manager = SyncManager()
-        except Exception as e:
-            print(f"⚠️ לא ניתן ליצור מנהל סינכרון: {e}")
-            return None
+        with _sync_manager_lock:
+            if sync_manager is None:
+                try:
+                    sync_manager = SyncManager()
+                except Exception as e:
+                    print(f"⚠️ לא ניתן ליצור מנהל סינכרון: {e}")
+                    return None
     return sync_manager
 
+# שירות קליטת ההודעות מ-webhook של Green API - נוצר בבקשה הראשונה
+ingestion_service = None
+
+def get_ingestion_service():
+    """יצירת NotificationIngestionService רק כשצריך"""
+    global ingestion_service
+    if ingestion_service is None:
+        ingestion_service = NotificationIngestionService()
+        ingestion_service.start_background_flusher()
+    return ingestion_service
+
 @app.route('/')
 def index():
     """עמוד ראשי"""
@@ -608,10 +701,11 @@ def api_search_contacts():
     personal_only = request.args.get('personal_only', 'false').lower() == 'true'
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 50))
+    after = request.args.get('after') or None
     
     result = db_manager.search_contacts(
         search_term, phone_filter, date_from, date_to, 
-        include_calendar_only, israeli_only, business_only, personal_only, page, per_page
+        include_calendar_only, israeli_only, business_only, personal_only, page, per_page, after
     )
     
     return jsonify(result)
@@ -633,6 +727,17 @@ def api_search_groups():
     
     return jsonify(result)
 
+@app.route('/api/search/messages')
+def api_search_messages():
+    """API לחיפוש בתוכן ההודעות"""
+    search_term = urllib.parse.unquote_plus(request.args.get('search', ''))
+    page = int(request.args.get('page', 1))
+    per_page = int(request.args.get('per_page', 50))
+    
+    result = db_manager.search_messages(search_term, page, per_page)
+    
+    return jsonify(result)
+
 @app.route('/api/update/contact/<contact_id>', methods=['POST'])
 def api_update_contact(contact_id):
     """API לעדכון סטטוס איש קשר"""
@@ -1031,6 +1136,26 @@ def api_sync_status(sync_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/sync/events')
+def api_sync_events():
+    """
+    זרם אירועי סינכרון (Server-Sent Events) - חיבור אחד לעמוד במקום בדיקה תקופתית
+    
+    אירועי sync: מצב והתקדמות של סינכרון אסינכרוני (sync_id, status, done/total, result)
+    אירועי item: סטטוס סינכרון חדש של איש קשר/קבוצה (item_id, last_sync, messages_count...)
+    """
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    return Response(
+        get_sync_event_bus().stream(last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/sync/status/item/<item_id>')
 def api_item_sync_status(item_id):
     """API לקבלת סטטוס סינכרון של פריט ספציפי"""
@@ -1044,6 +1169,60 @@ def api_item_sync_status(item_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# מספר פריטים מקסימלי בבקשת סטטוס מרוכזת (עמוד תוצאות מלא הוא 50-100)
+MAX_BULK_STATUS_ITEMS = 1000
+
+@app.route('/api/sync/status/items', methods=['POST'])
+def api_items_sync_status():
+    """API לקבלת סטטוס סינכרון של כל הפריטים בעמוד בבקשה אחת"""
+    data = request.get_json(silent=True) or {}
+    item_ids = data.get('item_ids')
+    item_type = data.get('item_type')
+    
+    if not isinstance(item_ids, list):
+        return jsonify({"error": "item_ids חייב להיות רשימה"}), 400
+    if len(item_ids) > MAX_BULK_STATUS_ITEMS:
+        return jsonify({"error": f"ניתן לבקש עד {MAX_BULK_STATUS_ITEMS} פריטים"}), 400
+    if item_type not in (None, 'contact', 'group'):
+        return jsonify({"error": "item_type לא תקין"}), 400
+    
+    sm = get_sync_manager()
+    if not sm:
+        return jsonify({"error": "מנהל סינכרון לא זמין"}), 500
+    
+    try:
+        return jsonify({"statuses": sm.get_sync_statuses(item_ids, item_type)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/webhook/green-api', methods=['POST'])
+def api_green_api_webhook():
+    """
+    קבלת התראות הודעה מ-Green API (webhook)
+
+    התשובה (200) נשלחת רק אחרי שההודעה נכתבה - על שגיאה Green API שולח את ההתראה שוב
+    """
+    webhook_token = os.getenv('GREENAPI_WEBHOOK_TOKEN')
+    if not webhook_token:
+        logger.warning("⚠️ התקבל webhook אבל GREENAPI_WEBHOOK_TOKEN לא מוגדר - נדחה")
+        return jsonify({"error": "Webhook not configured"}), 503
+    authorization = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {webhook_token}".encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    body = request.get_json(silent=True)
+    if not body:
+        return jsonify({"error": "גוף ההתראה חסר"}), 400
+
+    try:
+        service = get_ingestion_service()
+        saved = service.add_notification(body)
+        service.flush(raise_errors=True)
+        return jsonify({"success": True, "queued": saved})
+    except Exception as e:
+        logger.error(f"❌ שגיאה בקליטת webhook: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/delete/group/<group_id>', methods=['DELETE'])
 def api_delete_group(group_id):
     """מחיקת קבוצה מהוואטסאפ ומהמסד הנתונים"""
@@ -1052,7 +1231,7 @@ def api_delete_group(group_id):
     try:
         # קבלת פרטי הקבוצה מהמסד הנתונים
         logger.info(f"📊 מחפש פרטי קבוצה במסד הנתונים: {group_id}")
-        conn = sqlite3.connect(db_manager.groups_db)
+        conn = get_connection(db_manager.groups_db, read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT id, name FROM groups WHERE id = ?", (group_id,))
         group_info = cursor.fetchone()
@@ -1146,44 +1325,28 @@ def api_delete_group(group_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# קבצי הלוג שמוצגים בטאב הלוגים
+LOG_FILES = [
+    'group_deletion.log',
+    'arcserver_deletion.log',
+    'debug_group_deletion.log',
+    'simple_timebro.log',
+    'sync_manager.log'
+]
+
 @app.route('/api/logs')
 def api_get_logs():
     """קבלת לוגים של המערכת"""
     try:
-        import os
-        from datetime import datetime, timedelta
-        
-        # רשימת קבצי לוג לקריאה
-        log_files = [
-            'group_deletion.log',
-            'arcserver_deletion.log',
-            'debug_group_deletion.log',
-            'simple_timebro.log',
-            'sync_manager.log'
-        ]
-        
         all_logs = []
         
-        for log_file in log_files:
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        
-                    # קריאת 100 השורות האחרונות מכל קובץ
-                    recent_lines = lines[-100:] if len(lines) > 100 else lines
-                    
-                    for line in recent_lines:
-                        line = line.strip()
-                        if line:
-                            # ניסיון לפרסר את הלוג
-                            log_entry = parse_log_line(line)
-                            if log_entry:
-                                all_logs.append(log_entry)
-                                
-                except Exception as e:
-                    logger.warning(f"שגיאה בקריאת קובץ לוג {log_file}: {e}")
-                    continue
+        # 100 השורות האחרונות מכל קובץ - נקראות מסוף הקובץ, ובבדיקה הבאה רק מה שנוסף
+        for log_file in LOG_FILES:
+            try:
+                all_logs.extend(log_tail_index.tail(log_file))
+            except Exception as e:
+                logger.warning(f"שגיאה בקריאת קובץ לוג {log_file}: {e}")
+                continue
         
         # מיון לפי תאריך (הכי חדש ראשון)
         all_logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
@@ -1229,6 +1392,9 @@ def parse_log_line(line):
         logger.debug(f"שגיאה בפרסור שורת לוג: {e}")
         return None
 
+# offset ושורות אחרונות מפורסרות לכל קובץ לוג - משותף לכל הבקשות
+log_tail_index = LogTailIndex(parse_log_line, max_lines=100)
+
 if __name__ == '__main__':
     # יצירת תיקיית templates אם לא קיימת
     if not os.path.exists('templates'):
@@ -1236,6 +1402,12 @@ if __name__ == '__main__':
     if not os.path.exists('static'):
         os.makedirs('static')
     
+    debug = True
+    # תור הסינכרון עולה עם השרת - עבודות שנקטעו ממשיכות בלי לחכות לבקשת סינכרון.
+    # עם ה-reloader של debug רק תהליך הבן (WERKZEUG_RUN_MAIN) מגיש בקשות ומריץ את התור
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_sync_manager()
+    
     print("🌐 מפעיל שרת Web...")
     print("📱 ממשק זמין בכתובת: http://localhost:8080")
-    app.run(debug=True, host='0.0.0.0', port=8080)
+    app.run(debug=debug, host='0.0.0.0', port=8080)
@@ -13,6 +13,10 @@ import re
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 
+from contact_display import is_displayable_contact
+from db_connections import get_connection
+from db_migrations import CONTACTS_SCHEMA, migrate_database
+
 class WhatsAppContactsGroupsDatabase:
     def __init__(self, db_path: str = "whatsapp_contacts_groups.db"):
         self.db_path = db_path
@@ -103,94 +107,9 @@ class WhatsAppContactsGroupsDatabase:
         """יצירת מסד הנתונים עם הטבלאות הדרושות"""
         self.log("יוצר מסד נתונים עם טבלאות מתקדמות...")
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # טבלת אנשי קשר מתקדמת
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS contacts (
-                contact_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                phone_number VARCHAR(20),
-                whatsapp_id VARCHAR(100) UNIQUE,
-                remote_jid VARCHAR(100) UNIQUE,
-                name VARCHAR(255),
-                push_name VARCHAR(255),
-                profile_picture_url TEXT,
-                is_business BOOLEAN DEFAULT FALSE,
-                is_saved BOOLEAN DEFAULT FALSE,
-                type VARCHAR(50),
-                include_in_timebro BOOLEAN DEFAULT FALSE,
-                timebro_priority INTEGER DEFAULT 0,
-                company VARCHAR(255),
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # טבלת קבוצות מתקדמת  
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS groups (
-                group_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                whatsapp_group_id VARCHAR(100) UNIQUE NOT NULL,
-                subject VARCHAR(255),
-                description TEXT,
-                picture_url TEXT,
-                size INTEGER DEFAULT 0,
-                creation BIGINT,
-                subject_time BIGINT,
-                subject_owner VARCHAR(100),
-                owner VARCHAR(100),
-                is_community BOOLEAN DEFAULT FALSE,
-                is_community_announce BOOLEAN DEFAULT FALSE,
-                restrict BOOLEAN DEFAULT FALSE,
-                announce BOOLEAN DEFAULT FALSE,
-                linked_parent VARCHAR(100),
-                include_in_timebro BOOLEAN DEFAULT FALSE,
-                timebro_priority INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # טבלת מיפוי אנשי קשר לקבוצות
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS group_members (
-                member_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                group_id INTEGER NOT NULL,
-                contact_id INTEGER NOT NULL,
-                role VARCHAR(20) DEFAULT 'member',
-                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (group_id) REFERENCES groups(group_id),
-                FOREIGN KEY (contact_id) REFERENCES contacts(contact_id),
-                UNIQUE(group_id, contact_id)
-            )
-        ''')
-        
-        # טבלת הגדרות timebro
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS timebro_settings (
-                setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                contact_id INTEGER,
-                group_id INTEGER,
-                setting_name VARCHAR(100),
-                setting_value TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (contact_id) REFERENCES contacts(contact_id),
-                FOREIGN KEY (group_id) REFERENCES groups(group_id)
-            )
-        ''')
-        
-        # יצירת אינדקסים
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_contacts_phone ON contacts(phone_number)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_contacts_whatsapp_id ON contacts(whatsapp_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_contacts_timebro ON contacts(include_in_timebro)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_groups_whatsapp_id ON groups(whatsapp_group_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_groups_timebro ON groups(include_in_timebro)')
-        
-        conn.commit()
-        conn.close()
-        
+        # הטבלאות והאינדקסים מוגדרים ב-migrations/whatsapp_contacts_groups/
+        if migrate_database(self.db_path, self.log, schema=CONTACTS_SCHEMA) < 0:
+            raise sqlite3.DatabaseError(f"מיגרציה של {self.db_path} נכשלה")
         self.log("מסד הנתונים נוצר בהצלחה", "SUCCESS")
 
     def normalize_phone_number(self, phone: str) -> str:
@@ -236,7 +155,7 @@ class WhatsAppContactsGroupsDatabase:
             with open(file_path, 'r', encoding='utf-8') as f:
                 contacts_data = json.load(f)
             
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             processed_count = 0
@@ -254,8 +173,8 @@ class WhatsAppContactsGroupsDatabase:
                         INSERT OR REPLACE INTO contacts (
                             whatsapp_id, remote_jid, phone_number, name, push_name,
                             profile_picture_url, is_saved, type, include_in_timebro,
-                            timebro_priority, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            timebro_priority, is_displayable, updated_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         contact.get('id', ''),
                         contact.get('remoteJid', ''),
@@ -267,6 +186,7 @@ class WhatsAppContactsGroupsDatabase:
                         contact.get('type', 'contact'),
                         include_in_timebro,
                         priority,
+                        is_displayable_contact(name, contact.get('pushName', '')),
                         datetime.now().isoformat()
                     ))
                     
@@ -294,7 +214,7 @@ class WhatsAppContactsGroupsDatabase:
             with open(file_path, 'r', encoding='utf-8') as f:
                 groups_data = json.load(f)
             
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             processed_count = 0
@@ -515,7 +435,7 @@ class WhatsAppContactsGroupsDatabase:
         """עיבוד אנשי קשר מ-API לתוך המסד"""
         self.log("מעבד אנשי קשר מ-API...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         processed_count = 0
@@ -525,6 +445,8 @@ class WhatsAppContactsGroupsDatabase:
             try:
                 phone_number = self.extract_phone_from_remote_jid(contact.get('remoteJid', ''))
                 name = contact.get('pushName', '') or ''
+                # דגל התצוגה בחיפוש - מחושב כאן פעם אחת במקום בכל שאילתה
+                is_displayable = is_displayable_contact(name, contact.get('pushName', ''))
                 
                 # ⚠️ לא מסמנים אוטומטית! סימון רק דרך ממשק Web
                 include_in_timebro = 0  # תמיד 0 - סימון ידני בלבד
@@ -565,7 +487,8 @@ class WhatsAppContactsGroupsDatabase:
                         UPDATE contacts SET
                             remote_jid = ?, phone_number = ?, name = ?, push_name = ?,
                             profile_picture_url = ?, is_saved = ?, type = ?,
-                            include_in_timebro = ?, timebro_priority = ?, company_name = ?, updated_at = ?
+                            include_in_timebro = ?, timebro_priority = ?, company_name = ?,
+                            is_displayable = ?, updated_at = ?
                         WHERE whatsapp_id = ?
                     ''', (
                         contact.get('remoteJid', ''),
@@ -578,6 +501,7 @@ class WhatsAppContactsGroupsDatabase:
                         include_in_timebro,
                         priority,
                         final_company_name,
+                        is_displayable,
                         datetime.now().isoformat(),
                         contact.get('id', '')
                     ))
@@ -587,8 +511,8 @@ class WhatsAppContactsGroupsDatabase:
                         INSERT INTO contacts (
                             whatsapp_id, remote_jid, phone_number, name, push_name,
                             profile_picture_url, is_saved, type, include_in_timebro,
-                            timebro_priority, company_name, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            timebro_priority, company_name, is_displayable, updated_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         contact.get('id', ''),
                         contact.get('remoteJid', ''),
@@ -601,6 +525,7 @@ class WhatsAppContactsGroupsDatabase:
                         include_in_timebro,
                         priority,
                         new_company_name,
+                        is_displayable,
                         datetime.now().isoformat()
                     ))
                 
@@ -620,7 +545,7 @@ class WhatsAppContactsGroupsDatabase:
         """עיבוד קבוצות מ-API לתוך המסד"""
         self.log("מעבד קבוצות מ-API...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         processed_count = 0
@@ -754,7 +679,7 @@ class WhatsAppContactsGroupsDatabase:
         """קבלת רשימה מעודכנת של אנשי קשר וקבוצות בעדיפות"""
         self.log("יוצר רשימה מעודכנת לtimebro...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # אנשי קשר בעדיפות
@@ -805,7 +730,7 @@ class WhatsAppContactsGroupsDatabase:
 
     def generate_report(self) -> str:
         """יצירת דוח מקיף על מסד הנתונים"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # סטטיסטיקות כלליות
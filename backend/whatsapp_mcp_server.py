@@ -8,7 +8,6 @@ import os
 import sys
 import json
 import asyncio
-import requests
 from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
@@ -22,50 +21,47 @@ from mcp.types import Tool, TextContent
 from mcp.server.models import InitializationOptions
 from mcp import types
 
+from async_green_api_client import AsyncGreenAPIClient
+
 
 class GreenAPIClient:
-    """Client for interacting with Green API"""
+    """
+    Client for interacting with Green API - async, so tool calls don't block the event loop
+    
+    Wraps AsyncGreenAPIClient (whose methods return (success, data) tuples) and returns
+    the response dict, or {"error": ...}, as the MCP tools expect
+    """
     
     def __init__(self, id_instance: str, api_token: str, api_url: str = "https://api.green-api.com"):
+        self.api = AsyncGreenAPIClient(id_instance, api_token, api_url=api_url)
         self.id_instance = id_instance
         self.api_token = api_token
         self.api_url = api_url
-        self.base_url = f"{api_url}/waInstance{id_instance}"
     
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
+    async def _request(self, method: str, endpoint: str, data: Dict = None, idempotent: bool = True) -> Dict:
         """Make HTTP request to Green API"""
-        url = f"{self.base_url}/{endpoint}/{self.api_token}"
-        
-        try:
-            if method.upper() == "GET":
-                response = requests.get(url)
-            elif method.upper() == "POST":
-                response = requests.post(url, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Request failed: {str(e)}"}
+        success, result = await self.api._make_request(method, endpoint, data, idempotent=idempotent)
+        if not success:
+            return {"error": f"Request failed: {result.get('error')}"}
+        return result
     
-    def get_account_info(self) -> Dict:
+    async def get_account_info(self) -> Dict:
         """Get WhatsApp account information"""
-        return self._make_request("GET", "getSettings")
+        return await self._request("GET", "getSettings")
     
-    def get_state_instance(self) -> Dict:
+    async def get_state_instance(self) -> Dict:
         """Get current state of the WhatsApp instance"""
-        return self._make_request("GET", "getStateInstance")
+        return await self._request("GET", "getStateInstance")
     
-    def send_message(self, chat_id: str, message: str) -> Dict:
+    async def send_message(self, chat_id: str, message: str) -> Dict:
         """Send text message to a chat"""
         data = {
             "chatId": chat_id,
             "message": message
         }
-        return self._make_request("POST", "sendMessage", data)
+        return await self._request("POST", "sendMessage", data, idempotent=False)
     
-    def send_file_by_url(self, chat_id: str, url_file: str, filename: str, caption: str = "") -> Dict:
+    async def send_file_by_url(self, chat_id: str, url_file: str, filename: str, caption: str = "") -> Dict:
         """Send file by URL to a chat"""
         data = {
             "chatId": chat_id,
@@ -73,23 +69,23 @@ class GreenAPIClient:
             "fileName": filename,
             "caption": caption
         }
-        return self._make_request("POST", "sendFileByUrl", data)
+        return await self._request("POST", "sendFileByUrl", data, idempotent=False)
     
-    def get_contacts(self) -> Dict:
+    async def get_contacts(self) -> Dict:
         """Get list of contacts"""
-        return self._make_request("GET", "getContacts")
+        return await self._request("GET", "getContacts")
     
-    def get_chats(self) -> Dict:
+    async def get_chats(self) -> Dict:
         """Get list of chats"""
-        return self._make_request("GET", "getChats")
+        return await self._request("GET", "getChats")
     
-    def create_group(self, group_name: str, chat_ids: List[str]) -> Dict:
+    async def create_group(self, group_name: str, chat_ids: List[str]) -> Dict:
         """Create a new group"""
         data = {
             "groupName": group_name,
             "chatIds": chat_ids
         }
-        return self._make_request("POST", "createGroup", data)
+        return await self._request("POST", "createGroup", data, idempotent=False)
 
 
 # Initialize Green API client
@@ -218,7 +214,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
         chat_id = arguments["chat_id"]
         message = arguments["message"]
         
-        result = green_api.send_message(chat_id, message)
+        result = await green_api.send_message(chat_id, message)
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error sending message: {result['error']}")]
@@ -231,7 +227,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
         filename = arguments["filename"]
         caption = arguments.get("caption", "")
         
-        result = green_api.send_file_by_url(chat_id, file_url, filename, caption)
+        result = await green_api.send_file_by_url(chat_id, file_url, filename, caption)
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error sending file: {result['error']}")]
@@ -239,7 +235,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
             return [TextContent(type="text", text=f"File sent successfully. ID: {result.get('idMessage', 'N/A')}")]
     
     elif name == "get_whatsapp_account_info":
-        result = green_api.get_account_info()
+        result = await green_api.get_account_info()
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error getting account info: {result['error']}")]
@@ -247,7 +243,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
             return [TextContent(type="text", text=f"Account info: {json.dumps(result, indent=2)}")]
     
     elif name == "get_whatsapp_state":
-        result = green_api.get_state_instance()
+        result = await green_api.get_state_instance()
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error getting instance state: {result['error']}")]
@@ -255,7 +251,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
             return [TextContent(type="text", text=f"Instance state: {json.dumps(result, indent=2)}")]
     
     elif name == "get_whatsapp_contacts":
-        result = green_api.get_contacts()
+        result = await green_api.get_contacts()
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error getting contacts: {result['error']}")]
@@ -264,7 +260,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
             return [TextContent(type="text", text=f"Retrieved {contacts_count} contacts: {json.dumps(result[:10], indent=2)}{'...' if isinstance(result, list) and len(result) > 10 else ''}")]
     
     elif name == "get_whatsapp_chats":
-        result = green_api.get_chats()
+        result = await green_api.get_chats()
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error getting chats: {result['error']}")]
@@ -276,7 +272,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
         group_name = arguments["group_name"]
         chat_ids = arguments["chat_ids"]
         
-        result = green_api.create_group(group_name, chat_ids)
+        result = await green_api.create_group(group_name, chat_ids)
         
         if "error" in result:
             return [TextContent(type="text", text=f"Error creating group: {result['error']}")]